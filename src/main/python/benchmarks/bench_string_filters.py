@@ -0,0 +1,54 @@
+"""Compares the string filters : regex on every row (previous path) and StringMatch (distinct values in lower case,
+string comparisons when the pattern allows it). Run from src/main/python : python -m benchmarks.bench_string_filters"""
+import argparse
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from package.api.predicates import FoldedColumns, StringMatch
+import package.api.predicates as predicates
+
+PATTERNS = ("user1234_action70_error", "user12*", "*_ok", "*action5*", "us?r1*ok")
+
+
+def generate(rows, distinct, seed=0):
+    """Returns a df with a text column of rows values, among distinct ones"""
+    rng = np.random.default_rng(seed)
+    words = np.array([f"User{i}_Action{i % 97}_{'error' if i % 7 else 'ok'}" for i in range(distinct)], dtype=object)
+    return pd.DataFrame({"text": words[rng.integers(0, distinct, rows)]})
+
+
+def regex_mask(df, pattern):
+    """Previous path : the pattern converted to a regex, matched on every row"""
+    regex = pattern.replace("*", ".*").replace("?", ".?") + "$"
+    return df["text"].str.match(regex, case=False).to_numpy(dtype=bool, na_value=False)
+
+
+def timed(func, *args):
+    t0 = perf_counter()
+    result = func(*args)
+    return result, perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--distinct", type=int, default=100000)
+    args = parser.parse_args()
+
+    df = generate(args.rows, args.distinct)
+    print(f"{args.rows} rows, {args.distinct} distinct values")
+    print(f"{'pattern':<24}{'regex (s)':>12}{'1st (s)':>12}{'next (s)':>12}{'hits':>10}")
+    for pattern in PATTERNS:
+        predicates.FOLDED_COLUMNS = FoldedColumns()  # the 1st filter of a column folds it
+        expected, t_regex = timed(regex_mask, df, pattern)
+        predicate = StringMatch("text", pattern)
+        mask, t_first = timed(predicate.mask, df)
+        _, t_next = timed(predicate.mask, df)
+        assert (mask == expected).all(), pattern
+        print(f"{pattern:<24}{t_regex:>12.4f}{t_first:>12.4f}{t_next:>12.4f}{mask.sum():>10}")
+
+
+if __name__ == "__main__":
+    main()
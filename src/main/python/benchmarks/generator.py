@@ -0,0 +1,70 @@
+"""Deterministic csv files for the benchmarks, in the format of the tests : a title line, the header, then the rows
+separated by ;. The columns cycle through the kinds int, float (with missing values), cat (few distinct values),
+text (many distinct values) and date, and are named after their kind and position : int_0, float_1, cat_2 ..."""
+import pathlib
+
+import numpy as np
+import pandas as pd
+
+KINDS = ("int", "float", "cat", "text", "date")
+CHUNK_ROWS = 200000  # rows generated and written at once
+
+# name : (nb of files, rows per file, nb of columns, distinct values of the text columns, ratio of missing values)
+DATASETS = {
+    "tall": (1, 1000000, 8, 10000, 0.0),
+    "wide": (1, 20000, 400, 1000, 0.0),
+    "high_cardinality": (1, 500000, 5, None, 0.0),  # None : a distinct text per row
+    "mixed": (1, 300000, 15, 5000, 0.1),
+    "multi_file": (8, 125000, 8, 10000, 0.0),
+}
+
+
+def columns(nb):
+    return [f"{KINDS[i % len(KINDS)]}_{i}" for i in range(nb)]
+
+
+def generate_chunk(rng, start, nb_rows, nb_columns, distinct, missing):
+    """Returns the rows start to start + nb_rows of a dataset"""
+    data = {}
+    for i, column in enumerate(columns(nb_columns)):
+        kind = KINDS[i % len(KINDS)]
+        if kind == "int":
+            values = rng.integers(0, 1000000, nb_rows)
+        elif kind == "float":
+            values = np.round(rng.normal(500, 200, nb_rows), 3)
+        elif kind == "cat":
+            values = np.array([f"cat{j}" for j in range(20)], dtype=object)[rng.integers(0, 20, nb_rows)]
+        elif kind == "text":
+            codes = np.arange(start, start + nb_rows) if distinct is None else rng.integers(0, distinct, nb_rows)
+            values = pd.Series(codes).map(lambda code: f"user{code}_{'error' if code % 7 else 'ok'}").to_numpy()
+        else:
+            values = (np.datetime64("2020-01-01") + rng.integers(0, 2000, nb_rows)).astype(str)
+        if missing and kind != "int":
+            values = pd.Series(values).where(rng.random(nb_rows) >= missing).to_numpy()
+        data[column] = values
+    return pd.DataFrame(data)
+
+
+def generate(name, directory, scale=1.0, seed=0):
+    """Writes the files of a dataset in directory if they are not there yet, returns their paths. scale multiplies
+    the nb of rows"""
+    nb_files, nb_rows, nb_columns, distinct, missing = DATASETS[name]
+    nb_rows = max(int(nb_rows * scale), 1)
+    directory = pathlib.Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    files = []
+    for file_nb in range(nb_files):
+        path = directory / f"{name}_{nb_rows}_{seed}_{file_nb}.csv"
+        if not path.is_file():
+            rng = np.random.default_rng([seed, file_nb])
+            tmp_path = path.with_name(path.name + ".tmp")
+            with open(tmp_path, "w", newline="", encoding="latin_1") as handle:
+                handle.write(f"{name}\n")
+                for start in range(0, nb_rows, CHUNK_ROWS):
+                    chunk = generate_chunk(rng, start, min(CHUNK_ROWS, nb_rows - start), nb_columns, distinct,
+                                           missing)
+                    chunk.to_csv(handle, sep=";", index=False, header=not start, lineterminator="\n")
+            tmp_path.replace(path)
+        files.append(path)
+    return files
@@ -0,0 +1,62 @@
+"""Time to display the main window, from the start of the process : run in a new process, prints the times as json.
+Also lists the slow modules already imported when the window is shown : they should only be imported later.
+Run from src/main/python : python -m benchmarks.startup"""
+from time import perf_counter
+
+START = perf_counter()
+
+import json
+import os
+import pathlib
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+RESOURCES = pathlib.Path(__file__).resolve().parents[2] / "resources" / "base"
+DEFERRED_MODULES = ("pandas", "pyarrow", "yaml", "package.api.csv_set", "package.main_table", "package.about",
+                    "package.column_selector", "package.settings_editor")
+TIMEOUT = 10000  # ms to wait for the window to be painted
+
+
+class Context:
+    """Resources of the application, found where the fbs application context finds them when run from the sources"""
+
+    def get_resource(self, name):
+        return str(RESOURCES / name)
+
+
+def measure():
+    """Returns the times (s from the start of the process) when Qt and the main window are imported, when the window
+    is shown and when it is first painted, and the slow modules imported before it is shown"""
+    from PySide2 import QtCore, QtWidgets
+    times = {"qt": perf_counter() - START}
+
+    from package.main_window import MainWindow
+    times["import"] = perf_counter() - START
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    window = MainWindow(ctx=Context(), file_path_strs=None)
+    window.resize(1000, 700)
+    window.show()
+    times["window"] = perf_counter() - START
+    times["deferred_imported"] = [module for module in DEFERRED_MODULES if module in sys.modules]
+
+    class PaintFilter(QtCore.QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QtCore.QEvent.Paint and "paint" not in times:
+                times["paint"] = perf_counter() - START
+                app.quit()
+            return False
+
+    paint_filter = PaintFilter()
+    app.installEventFilter(paint_filter)
+    QtCore.QTimer.singleShot(TIMEOUT, app.quit)
+    app.exec_()
+    times.setdefault("paint", None)
+    return times
+
+
+if __name__ == "__main__":
+    print(json.dumps(measure()))
+    sys.stdout.flush()
+    os._exit(0)  # the teardown of the window and the preloading thread are not measured
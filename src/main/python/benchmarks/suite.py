@@ -0,0 +1,220 @@
+"""Benchmarks of the startup, and of the import, the filters, the sort and the rendering of the cells on the generated
+datasets.
+The results are written as json, and can be compared to the ones of a previous version.
+Run from src/main/python : python -m benchmarks.suite --output results.json [--compare previous.json]"""
+import argparse
+import json
+import os
+import pathlib
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from statistics import median
+from time import perf_counter
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+import pandas as pd
+from PySide2 import QtCore, QtGui, QtWidgets
+
+from benchmarks.generator import DATASETS, generate
+from package.api.config import Config
+from package.api.csv_set import CsvSet
+from package.api.filtering import FilterManager
+from package.main_table import MainTableModel
+
+FILTERS = {
+    "numeric": "int_0 > 500000",
+    "string": "cat_2 : cat1*",
+    "contains": "text_3 : *42*",
+    "expression": "float_1 < 300 or (cat_2 = cat3 and not text_3 : *ok)",
+}
+RENDER_SCROLLS = 100  # positions of the view whose cells are rendered
+RENDER_ROWS = 40  # rows displayed at each position
+RENDER_COLUMNS = 20  # columns displayed at each position
+THRESHOLD = 1.2  # ratio of the time to the previous one from which a benchmark is a regression
+MIN_DIFFERENCE = 0.005  # s slower than the previous time from which a benchmark is a regression (timer noise)
+
+
+def timed(func, repeat):
+    """Runs func repeat times, returns its run times"""
+    times = []
+    for _ in range(repeat):
+        t0 = perf_counter()
+        func()
+        times.append(perf_counter() - t0)
+    return times
+
+
+def new_csv_set():
+    config = Config()
+    config.csv_extension = "csv"
+    config.set_config(header=1, separator=";", max_lines="", hide_empty=False)
+    config.workers = os.cpu_count() or 1
+    config.cache_max_size = 0  # the files are parsed every time
+    return CsvSet(config=config)
+
+
+def bench_startup(repeat):
+    """Times the display of the main window, each time in a new process"""
+    results = {"startup_import": [], "startup_window": [], "startup_paint": []}
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-m", "benchmarks.startup"], capture_output=True, text=True,
+                                check=True, cwd=pathlib.Path(__file__).resolve().parent.parent).stdout
+        times = json.loads(output)
+        for bench in ("import", "window", "paint"):
+            results[f"startup_{bench}"].append(times[bench])
+    return results
+
+
+def stats(results):
+    return {bench: {"min": min(times), "median": median(times), "runs": times} for bench, times in results.items()}
+
+
+def bench_import(files, repeat):
+    return {"import": timed(lambda: new_csv_set().read_files([str(file) for file in files]), repeat)}
+
+
+def bench_filters(df, repeat):
+    """Times the first computation of each filter (add), toggling it off and on, and deleting it"""
+    results = {}
+    for name, text in FILTERS.items():
+        times = {"add": [], "toggle": [], "delete": []}
+        for _ in range(repeat):
+            filter_manager = FilterManager(QtGui.QIcon(), QtGui.QIcon())
+            model = MainTableModel(df, filter_manager)
+            filter_manager.set_model(model)
+            t0 = perf_counter()
+            btn = filter_manager.add(text, neg=False)
+            t1 = perf_counter()
+            filter_manager.toggle_filter(btn.text())
+            filter_manager.toggle_filter(btn.text())
+            t2 = perf_counter()
+            filter_manager.delete(btn.text())
+            t3 = perf_counter()
+            times["add"].append(t1 - t0)
+            times["toggle"].append(t2 - t1)
+            times["delete"].append(t3 - t2)
+        results.update({f"filter_{name}_{action}": values for action, values in times.items()})
+    return results
+
+
+def bench_sort(df, repeat):
+    """Times the first sort of a column of each kind, then the sort back to an order already computed"""
+    results = {}
+    for column in df.columns[:4]:
+        first, cached = [], []
+        for _ in range(repeat):
+            model = MainTableModel(df, FilterManager(QtGui.QIcon(), QtGui.QIcon()))
+            position = model.columns.index(column)
+            first += timed(lambda: model.sort(position, QtCore.Qt.DescendingOrder), 1)
+            model.sort(position, QtCore.Qt.AscendingOrder)
+            cached += timed(lambda: model.sort(position, QtCore.Qt.DescendingOrder), 1)
+        kind = column.split("_")[0]
+        results[f"sort_{kind}"] = first
+        results[f"sort_{kind}_cached"] = cached
+    return results
+
+
+def bench_render(df, repeat):
+    """Times the display values of the cells of the view at successive scroll positions, as the view asks them"""
+    rng = np.random.default_rng(0)
+    starts = rng.integers(0, max(df.shape[0] - RENDER_ROWS, 1), RENDER_SCROLLS)
+    nb_columns = min(RENDER_COLUMNS, df.shape[1])
+
+    def render(model):
+        for start in starts:
+            for row in range(start, min(start + RENDER_ROWS, df.shape[0])):
+                for column in range(nb_columns):
+                    model.data(model.index(row, column))
+
+    results = {"render": [], "render_cached": []}
+    for _ in range(repeat):
+        model = MainTableModel(df, FilterManager(QtGui.QIcon(), QtGui.QIcon()))
+        results["render"] += timed(lambda: render(model), 1)
+        results["render_cached"] += timed(lambda: render(model), 1)
+    return results
+
+
+def run(datasets, directory, scale, repeat):
+    """Returns the run times of the benchmarks, by dataset (startup for the ones not using a dataset)"""
+    results = {"startup": stats(bench_startup(repeat))}
+    for name in datasets:
+        files = generate(name, directory, scale)
+        print(f"{name} : {sum(file.stat().st_size for file in files) // 1000000} Mo", file=sys.stderr)
+        dataset_results = bench_import(files, repeat)
+        csv_set = new_csv_set()
+        csv_set.read_files([str(file) for file in files])
+        for bench in (bench_filters, bench_sort, bench_render):
+            dataset_results.update(bench(csv_set.df, repeat))
+        results[name] = stats(dataset_results)
+    return results
+
+
+def metadata(scale, repeat):
+    try:
+        revision = subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                                  cwd=pathlib.Path(__file__).resolve().parent).stdout.strip() or None
+    except OSError:
+        revision = None
+    return {"revision": revision, "date": datetime.now().isoformat(timespec="seconds"), "scale": scale,
+            "repeat": repeat, "python": platform.python_version(), "pandas": pd.__version__,
+            "numpy": np.__version__, "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def compare(previous, current, threshold=THRESHOLD, out=sys.stdout):
+    """Prints the min time of each benchmark in both results and their ratio, returns the nb of regressions"""
+    nb_regressions = 0
+    print(f"{'dataset':<18}{'benchmark':<32}{'previous':>10}{'current':>10}{'ratio':>8}", file=out)
+    for name, benches in current["results"].items():
+        for bench, times in benches.items():
+            before = previous["results"].get(name, {}).get(bench)
+            if before is None:
+                continue
+            ratio = times["min"] / before["min"] if before["min"] else float("inf")
+            flag = ""
+            if ratio > threshold and times["min"] - before["min"] > MIN_DIFFERENCE:
+                flag = "  regression"
+                nb_regressions += 1
+            print(f"{name:<18}{bench:<32}{before['min']:>10.4f}{times['min']:>10.4f}{ratio:>8.2f}{flag}", file=out)
+    return nb_regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--datasets", nargs="+", choices=list(DATASETS), default=list(DATASETS))
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies the nb of rows of the datasets")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--data-dir", default=str(pathlib.Path(tempfile.gettempdir()) / "csv-table-benchmarks"),
+                        help="directory of the generated files, kept between runs")
+    parser.add_argument("--output", help="json file of the results, stdout by default")
+    parser.add_argument("--compare", help="json file of previous results : exits with 1 if a benchmark is slower")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="ratio of the time to the previous one from which a benchmark is a regression")
+    args = parser.parse_args(argv)
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])  # for the widgets of the filters
+    current = {"meta": metadata(args.scale, args.repeat),
+               "results": run(args.datasets, args.data_dir, args.scale, args.repeat)}
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(current, handle, indent=2)
+    else:
+        json.dump(current, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as handle:
+            previous = json.load(handle)
+        # the comparison goes to stderr when the results are on stdout
+        nb_regressions = compare(previous, current, args.threshold, sys.stdout if args.output else sys.stderr)
+        return 1 if nb_regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
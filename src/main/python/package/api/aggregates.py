@@ -0,0 +1,136 @@
+"""Aggregates of the rows kept by the filters. They are cached by state of the filters mask, and updated from the
+rows added and removed when the mask changes a little (a filter toggled)"""
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+from package.api.trigram_index import factorize
+
+MAX_SUMMARIES = 16  # summaries kept, by state of the filters mask
+INCREMENTAL_RATIO = 0.5  # max ratio of rows changed (to the rows kept) to update the previous summary
+
+
+class ColumnAggregates:
+    """Count, sum, min and max of the values (not missing) of a numeric column"""
+
+    def __init__(self, count=0, total=0.0, minimum=np.nan, maximum=np.nan):
+        self.count = count
+        self.total = total
+        self.minimum = minimum
+        self.maximum = maximum
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else np.nan
+
+    @classmethod
+    def of(cls, values):
+        """Aggregates of values (float array, nan for missing)"""
+        count = np.count_nonzero(~np.isnan(values))
+        if not count:
+            return cls()
+        return cls(count, float(np.nansum(values)), float(np.nanmin(values)), float(np.nanmax(values)))
+
+
+class Summary:
+    """Aggregates of the rows of a mask state : nb of rows, aggregates by numeric column and nb of rows by value of
+    the group column"""
+
+    def __init__(self, nb_rows, columns, group_counts=None, group_values=None):
+        self.nb_rows = nb_rows
+        self.columns = columns  # ColumnAggregates by column
+        self.group_counts = group_counts  # nb of rows by code of the group column, the first one for no value
+        self._group_values = group_values
+
+    def top_groups(self, nb):
+        """Returns the nb values of the group column having the most rows, with their nb of rows"""
+        if self.group_counts is None:
+            return []
+        counts = self.group_counts[1:]
+        top = np.argsort(-counts, kind="stable")[:nb]
+        groups = [(self._group_values[i], int(counts[i])) for i in top if counts[i]]
+        if self.group_counts[0]:
+            groups.append(("", int(self.group_counts[0])))
+        return groups
+
+
+class Aggregator:
+    """Computes the summaries of the rows of a df kept by the successive filters masks"""
+
+    def __init__(self, df, columns, group_column=None):
+        self._df = df
+        self._columns = columns  # numeric columns aggregated
+        self._values = {}  # values of the columns as floats, converted on first use
+        self.group_column = group_column
+        self._group_codes, self._group_values = factorize(df[group_column]) if group_column else (None, None)
+
+        self._summaries = OrderedDict()  # by key of the mask
+        self._last_mask = None  # mask of the last summary returned, the next one is updated from it
+        self._last_summary = None
+
+    def summary(self, mask=None):
+        """Returns the summary of the rows kept by the mask (numpy bool array, None : all the rows)"""
+        if mask is None:
+            mask = np.ones(self._df.shape[0], dtype=bool)
+        key = hashlib.blake2b(np.packbits(mask).tobytes(), digest_size=16).digest()
+
+        summary = self._summaries.get(key)
+        if summary is not None:
+            self._summaries.move_to_end(key)
+        else:
+            summary = self._updated(mask) if self._last_summary is not None else None
+            if summary is None:
+                summary = self._computed(mask)
+            self._summaries[key] = summary
+            if len(self._summaries) > MAX_SUMMARIES:
+                self._summaries.popitem(last=False)
+
+        self._last_mask = mask.copy()
+        self._last_summary = summary
+        return summary
+
+    def _column_values(self, column):
+        values = self._values.get(column)
+        if values is None:
+            values = self._values[column] = self._df[column].to_numpy(dtype=float, na_value=np.nan)
+        return values
+
+    def _group_counts(self, rows):
+        """Nb of rows by code of the group column"""
+        return np.bincount(self._group_codes[rows] + 1, minlength=len(self._group_values) + 1)
+
+    def _computed(self, mask):
+        """Summary computed from all the rows kept"""
+        columns = {column: ColumnAggregates.of(self._column_values(column)[mask]) for column in self._columns}
+        group_counts = self._group_counts(mask) if self.group_column else None
+        return Summary(int(np.count_nonzero(mask)), columns, group_counts, self._group_values)
+
+    def _updated(self, mask):
+        """Summary updated from the last one with the rows added and removed, None if too many rows changed"""
+        added = mask & ~self._last_mask
+        removed = self._last_mask & ~mask
+        nb_rows = int(np.count_nonzero(mask))
+        if np.count_nonzero(added) + np.count_nonzero(removed) > INCREMENTAL_RATIO * max(nb_rows, 1):
+            return None
+
+        columns = {}
+        for column in self._columns:
+            values = self._column_values(column)
+            last = self._last_summary.columns[column]
+            plus, minus = ColumnAggregates.of(values[added]), ColumnAggregates.of(values[removed])
+            count = last.count + plus.count - minus.count
+            if not count:
+                columns[column] = ColumnAggregates()
+            elif minus.minimum <= last.minimum or minus.maximum >= last.maximum:
+                # an extreme value removed : the new extremes are only known from all the rows
+                columns[column] = ColumnAggregates.of(values[mask])
+            else:
+                columns[column] = ColumnAggregates(count, last.total + plus.total - minus.total,
+                                                   np.fmin(last.minimum, plus.minimum),
+                                                   np.fmax(last.maximum, plus.maximum))
+
+        group_counts = None
+        if self.group_column:
+            group_counts = self._last_summary.group_counts + self._group_counts(added) - self._group_counts(removed)
+        return Summary(nb_rows, columns, group_counts, self._group_values)
@@ -0,0 +1,102 @@
+"""Compressed csv files, decompressed while they are read. The compression is detected from the extension of the
+file, or from its first bytes (magic number) if the extension is not one of a compression"""
+import bz2
+import gzip
+import importlib.util
+import io
+import lzma
+import pathlib
+import zipfile
+
+from package.api.exceptions import CsvReadError
+
+SUFFIXES = {".gz": "gz", ".gzip": "gz", ".bz2": "bz2", ".xz": "xz", ".zip": "zip", ".zst": "zst", ".zstd": "zst"}
+MAGIC_NUMBERS = {b"\x1f\x8b": "gz", b"BZh": "bz2", b"\xfd7zXZ\x00": "xz", b"PK\x03\x04": "zip",
+                 b"\x28\xb5\x2f\xfd": "zst"}
+MAGIC_BYTES = max(len(magic) for magic in MAGIC_NUMBERS)
+DECOMPRESSED_BUFFER_BYTES = 256 * 1024  # decompressed at once, a read of the header only decompresses that much
+
+
+def compression_of(file):
+    """Returns the compression of a file (gz, bz2, xz, zip or zst), None if it is not compressed"""
+    compression = SUFFIXES.get(pathlib.Path(file).suffix.lower())
+    if compression:
+        return compression
+    try:
+        with open(file, "rb") as handle:
+            start = handle.read(MAGIC_BYTES)
+    except OSError:
+        return None
+    return next((compression for magic, compression in MAGIC_NUMBERS.items() if start.startswith(magic)), None)
+
+
+def extension_of(file):
+    """Returns the extension of a file, without its compression suffix : csv for data.csv.gz"""
+    path = pathlib.Path(file)
+    if path.suffix.lower() in SUFFIXES:
+        path = path.with_suffix("")
+    return path.suffix[1:]
+
+
+def decompressed(handle, compression, name=None):
+    """Returns a binary file reading the decompressed data of the binary file handle, that it closes when it is
+    closed. handle as is if compression is None. name : of the file, for the errors"""
+    if compression is None:
+        return handle
+    name = name or getattr(handle, "name", "")
+
+    if compression == "gz":
+        stream = gzip.GzipFile(fileobj=handle, mode="rb")
+    elif compression == "bz2":
+        stream = bz2.BZ2File(handle)
+    elif compression == "xz":
+        stream = lzma.LZMAFile(handle)
+    elif compression == "zip":
+        stream = _zip_member(handle, name)
+    elif compression == "zst":
+        if importlib.util.find_spec("zstandard") is None:
+            handle.close()
+            raise CsvReadError(f"Le module zstandard est nécessaire pour lire {name}")
+        import zstandard
+        stream = zstandard.ZstdDecompressor().stream_reader(handle, closefd=False)
+    else:
+        raise ValueError(f"Unknown compression {compression}")
+    return io.BufferedReader(_DecompressedReader(stream, handle), buffer_size=DECOMPRESSED_BUFFER_BYTES)
+
+
+def _zip_member(handle, name):
+    """Returns the only file of a zip archive, opened"""
+    try:
+        archive = zipfile.ZipFile(handle)
+    except zipfile.BadZipFile as e:
+        handle.close()
+        raise CsvReadError(f"Archive {name} illisible : {e}")
+    members = [info for info in archive.infolist() if not info.is_dir()]
+    if len(members) != 1:
+        archive.close()
+        handle.close()
+        raise CsvReadError(f"L'archive {name} doit contenir un seul fichier ({len(members)} trouvés)")
+    return archive.open(members[0])
+
+
+class _DecompressedReader(io.RawIOBase):
+    """Raw file reading a decompressing stream, closing the compressed file with it. Not seekable"""
+
+    def __init__(self, stream, handle):
+        super().__init__()
+        self._stream = stream
+        self._handle = handle
+
+    def close(self):
+        if not self.closed:
+            try:
+                self._stream.close()
+            finally:
+                self._handle.close()
+        super().close()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        return self._stream.readinto(buffer)
@@ -1,4 +1,4 @@
-import yaml
+import os
 import logging
 import pathlib
 
@@ -6,12 +6,25 @@ from package.api.exceptions import ConfigSettingError
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_OPEN_FILTERS = "Csv (*.csv *.csv.gz *.csv.bz2 *.csv.xz *.csv.zip *.csv.zst);;All (*.*)"
+LOAD_MODES = ("head", "tail", "range", "sample")  # first rows, last rows, rows from the first line, random rows
+
+
+def user_cache_dir():
+    """Returns the directory of the cache files of the user, outside of the application : in %LOCALAPPDATA% on
+    Windows, $XDG_CACHE_HOME or ~/.cache otherwise"""
+    base = os.environ.get("LOCALAPPDATA" if os.name == "nt" else "XDG_CACHE_HOME")
+    return str(pathlib.Path(base or pathlib.Path.home() / ".cache") / "CsvTable")
+
 
 class Config:
     def __init__(self):
         self._config_dir = pathlib.Path(__file__).resolve().parent.parent.parent / "config"
         self.open_file_dir = None  # directory for dialog to open new file
         self.open_file_filters = None
+        self.workers = None  # nb of files read in parallel (int)
+        self.cache_dir = None  # directory of the parsed files cache (str)
+        self.cache_max_size = None  # max size of the parsed files cache in bytes, 0 : disabled (int)
         self._gen_config_file = self._config_dir / "gen_config.yaml"
 
         self.csv_extension = None
@@ -21,12 +34,26 @@ class Config:
         self.m_header = None  # nb of lines to skip before header, after blank (if skipped) and commented
         self.m_separator = None  # separator in csv files (str)
         self.m_max_lines = None
+        self.m_load_mode = None  # rows read when there is a max of lines, one of LOAD_MODES
+        self.m_first_line = None  # first row read in "range" mode
+        self.m_streaming = None  # display the first rows while the rest is read
+        self.m_virtual = None  # index the file and only read the rows displayed (no max lines, no filter)
+        self.m_categorical = None  # dictionary-encode the text columns with few distinct values
+        self.m_downcast = None  # store the numeric columns with the smallest dtypes
         self.hide_empty = None
         self.hide_undesired = None
         self._undesired_columns = None  # set
 
         self.custom = None
 
+    @property
+    def categorical(self):
+        return self.m_categorical
+
+    @categorical.setter
+    def categorical(self, new):
+        self.m_categorical = bool(new)
+
     @property
     def comment(self):
         return self.m_comment or ""
@@ -41,6 +68,14 @@ class Config:
             raise ConfigSettingError("Le commentaire doit être un caractère unique")
         self.m_comment = new
 
+    @property
+    def downcast(self):
+        return self.m_downcast
+
+    @downcast.setter
+    def downcast(self, new):
+        self.m_downcast = bool(new)
+
     @property
     def encoding(self):
         return self.m_encoding
@@ -49,6 +84,22 @@ class Config:
     def encoding(self, new):
         self.m_encoding = new
 
+    @property
+    def first_line(self):
+        return self.m_first_line or ""
+
+    @first_line.setter
+    def first_line(self, new):
+        if not new:
+            self.m_first_line = 0
+            return
+        try:
+            self.m_first_line = int(new)
+        except ValueError:
+            raise ConfigSettingError("Ce champ doit être vide ou un nombre")
+        if self.m_first_line < 0:
+            raise ConfigSettingError("Ce champ doit être vide ou un nombre")
+
     @property
     def header(self):
         return self.m_header
@@ -63,6 +114,16 @@ class Config:
         except ValueError:
             raise ConfigSettingError("Ce champ doit être vide ou un nombre")
 
+    @property
+    def load_mode(self):
+        return self.m_load_mode
+
+    @load_mode.setter
+    def load_mode(self, new):
+        if new not in LOAD_MODES:
+            raise ConfigSettingError(f"Mode de chargement inconnu : {new}")
+        self.m_load_mode = new
+
     @property
     def max_lines(self):
         return self.m_max_lines or ""
@@ -98,6 +159,22 @@ class Config:
     def skip_blank_lines(self, new):
         self.m_skip_blank_lines = bool(new)
 
+    @property
+    def streaming(self):
+        return self.m_streaming
+
+    @streaming.setter
+    def streaming(self, new):
+        self.m_streaming = bool(new)
+
+    @property
+    def virtual(self):
+        return self.m_virtual
+
+    @virtual.setter
+    def virtual(self, new):
+        self.m_virtual = bool(new)
+
     @property
     def undesired_columns(self):
         return self._undesired_columns
@@ -110,6 +187,7 @@ class Config:
             logger.warning(f"Cannot convert {new} to set")
 
     def set_config(self, encoding="latin_1", comment="", skip_blank_lines=False, header=2, separator="", max_lines=5000,
+                   load_mode="head", first_line=0, streaming=False, virtual=False, categorical=False, downcast=False,
                    hide_empty=True, hide_undesired=False, undesired_columns=None):
 
         self.encoding = encoding
@@ -118,6 +196,12 @@ class Config:
         self.header = header
         self.separator = separator
         self.max_lines = max_lines
+        self.load_mode = load_mode
+        self.first_line = first_line
+        self.streaming = streaming
+        self.virtual = virtual
+        self.categorical = categorical
+        self.downcast = downcast
         self.hide_empty = hide_empty
         self.hide_undesired = hide_undesired
         self.undesired_columns = undesired_columns or set()
@@ -136,17 +220,29 @@ class Config:
     def load_gen_config(self):
         open_dir = None
         open_filters = None
+        workers = None
+        cache_dir = None
+        cache_size_mb = None
         self.custom = None
         if self._gen_config_file.is_file():
+            import yaml  # slow to import, only needed if there is a config file
+
             with open(self._gen_config_file, "r") as yaml_file:
                 d = yaml.safe_load(yaml_file)
                 if d:
                     open_dir = d.get("dir")
                     open_filters = d.get("filters")
+                    workers = d.get("workers")
+                    cache_dir = d.get("cache_dir")
+                    cache_size_mb = d.get("cache_size_mb")
                     self.custom = d.get("custom")
 
         self.open_file_dir = open_dir or str(pathlib.Path.home())
-        self.open_file_filters = ";;".join(open_filters) if open_filters else "Csv (*.csv);;All (*.*)"
+        self.open_file_filters = ";;".join(open_filters) if open_filters else DEFAULT_OPEN_FILTERS
+        self.workers = workers or os.cpu_count() or 1
+        # the cache is only used if its size is set in the config
+        self.cache_dir = cache_dir or str(pathlib.Path(user_cache_dir()) / "parse")
+        self.cache_max_size = int((cache_size_mb or 0) * 1000000)
 
     def load_csv_config(self, extension):
         """Loads the config for specified file extension"""
@@ -156,6 +252,8 @@ class Config:
         config_file = self._get_csv_config_file(check_exists=True)
 
         if config_file:
+            import yaml
+
             # load the config
             with open(config_file, "r") as yaml_file:
                 d = yaml.safe_load(yaml_file)
@@ -181,11 +279,19 @@ class Config:
                        "header": self.header,
                        "skip_blank_lines": self.skip_blank_lines,
                        "max_lines": self.max_lines,
+                       "load_mode": self.load_mode,
+                       "first_line": self.first_line,
+                       "streaming": self.streaming,
+                       "virtual": self.virtual,
+                       "categorical": self.categorical,
+                       "downcast": self.downcast,
                        "hide_empty": self.hide_empty,
                        "hide_undesired": self.hide_undesired}
 
         if self._undesired_columns:
             config_dict["undesired_columns"] = list(self._undesired_columns)
 
+        import yaml
+
         with open(config_file, "w") as yaml_file:
             yaml.safe_dump(config_dict, yaml_file, default_flow_style=False)
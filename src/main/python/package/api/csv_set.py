@@ -1,28 +1,54 @@
+import functools
+import io
 import logging
 import pathlib
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 import pandas as pd
-from pandas.api.types import is_numeric_dtype, is_string_dtype
+from pandas.api.types import is_string_dtype
 
-from package.api.exceptions import CsvReadError
-from package.api.utils import log_time_it
+from package.api.compression import compression_of, extension_of
+from package.api.dtypes import cast_like, optimize_dtypes, unify_text_columns
+from package.api.engines import PYTHON_ENGINE, select_engine
+from package.api.exceptions import CsvReadError, OperationCancelledError
+from package.api.line_index import LineIndex
+from package.api.parse_cache import ParseCache
+from package.api.progress import Progress
+from package.api.tracing import count, span
+from package.api.utils import log_time_it, split_columns
 from package.api.config import Config
 
 logger = logging.getLogger(__name__)
 
+FIRST_CHUNK_ROWS = 2000  # rows of the first chunk when streaming, the next ones are twice bigger
+MAX_CHUNK_ROWS = 500000
+NA_VALUES = ["", " ", "inv"]
+TAIL_BLOCK_BYTES = 1024 * 1024  # bytes read at once backwards from the end of a file, to find its last lines
+SAMPLE_SEED = 0  # the random sample of a file is always the same
+CATEGORY_MAX_RATIO = 0.5  # a text column is encoded if it has less distinct values than this ratio of its rows
+
 
 class CsvSet:
 
     def __init__(self, config: Config):
         self._config = config
         self._files = None  # paths to the csv files, directories and/or files (str tuple)
+        self._parse_cache = None  # ParseCache, created with the general config
 
         # generated
+        self._parsed = None  # all the columns of the files, before hiding the empty and undesired ones (df)
+        self._parse_signature = None  # files and options self._parsed has been parsed with (list)
+        self._empty_columns = None  # columns of self._parsed with no value (set)
+        self._offsets = None  # size of the files when they were parsed, new lines are read from there (dict)
+        self._file_columns = {}  # columns of each file, to parse its new lines
         self.df = None  # full set of data (df)
+        self.line_index = None  # index of the file when it is read on demand (LineIndex)
         self._available_columns = None  # columns available (including the ones not imported)
         self.df_columns = None  # columns in the imported df
         self.numeric_columns = None
         self.string_columns = None
+        self.read_errors = None  # files that could not be read, with their error (dict)
 
     @property
     def available_columns(self):
@@ -33,7 +59,7 @@ class CsvSet:
     @property
     def extension(self):
         if self._files:
-            return self._files[0].suffix[1:]
+            return extension_of(self._files[0])
 
     @property
     def title(self):
@@ -47,8 +73,11 @@ class CsvSet:
     def __str__(self):
         return f"CSV_SET : files={self._files}\n"
 
-    def read_files(self, files=None, append=False):
-        """Reads csv files : new ones if arg files is provided, otherwise re-reads current ones"""
+    def read_files(self, files=None, append=False, progress=None):
+        """Reads csv files : new ones if arg files is provided, otherwise re-reads current ones.
+        The progress (optional) is updated during the read, and cancels it if it is cancelled"""
+        previous_files = self._files
+
         # updating self.files if new files are provided
         if files:
             valid_files = []
@@ -67,38 +96,486 @@ class CsvSet:
 
         # re new files if they provided, or just re-read current ones otherwise
         if self._files:
-            self.import_data()
+            try:
+                self.import_data(progress=progress)
+            except OperationCancelledError:
+                # back to the files still displayed
+                self._files = previous_files
+                if self._files and self.extension != self._config.csv_extension:
+                    self._config.load_csv_config(self.extension)
+                raise
+
+    def iter_chunks(self, file, nrows=None, progress=None):
+        """Yields the rows of a csv file by chunks, as they are imported (no undesired column, no NaN in the string
+        columns), without keeping them : the memory used is bounded by the size of a chunk. nrows : max of rows"""
+        for chunk in self._read_chunks(pathlib.Path(file), progress, nrows=nrows, na_values=NA_VALUES):
+            yield self._displayable(chunk)
+
+    def needs_parse(self):
+        """Returns True if the files have to be parsed again for the current config, False if hiding columns is
+        enough"""
+        return self._config.m_virtual or self._parsed is None or self._parse_signature != self._signature()
 
     @log_time_it
-    def import_data(self):
+    def import_data(self, progress=None):
         """Imports the data from csv files, raises ValueError"""
+        if self._config.m_virtual:
+            self._index_file(progress)
+            return
+        self.line_index = None
+
+        if self.needs_parse():
+            self._parse(progress)
+        self.project()
+
+    @log_time_it
+    def project(self):
+        """Hides the empty and undesired columns of the parsed data, according to the config"""
+        columns = [column for column in self._visible(self._parsed.columns)
+                   if not (self._config.hide_empty and column in self._empty_columns)]
+        self.df = self._parsed if len(columns) == self._parsed.shape[1] else self._parsed[columns]
+        self.df_columns = columns
+        self.numeric_columns, self.string_columns = split_columns(self.df)
+
+    @log_time_it
+    def _parse(self, progress=None):
+        """Parses all the columns of the files"""
+        read = functools.partial(self._read_cached, na_values=NA_VALUES, nrows=self._config.m_max_lines,
+                                 progress=progress)
+
+        # lines written while the files are parsed may be read twice when following them, but none is lost
+        sizes = {file: file.stat().st_size for file in self._files}
+        if progress:
+            progress.bytes_total = sum(sizes.values())
+
+        # the last rows and the random rows are only known at the end of the file
+        if self._config.m_streaming and progress and self._config.m_load_mode in ("head", "range"):
+            dfs = self._stream_all(na_values=NA_VALUES, nrows=self._config.m_max_lines, progress=progress)
+        else:
+            dfs = self._read_all(read, progress)
+
+        with span("concat", files=len(dfs)):
+            df = pd.concat(dfs, ignore_index=True, sort=False)
+            # chunks or files where a column is numeric and others where it is text
+            unify_text_columns(df)
+        count("rows parsed", df.shape[0])
+        count("bytes parsed", sum(sizes.values()))
+
+        with span("dtype scan"):
+            self._empty_columns = set(df.columns[df.isna().all()])
+            string_columns = split_columns(df)[1]
 
-        if self._config.hide_undesired:
-            def usecols(col):
-                return col not in self._config.undesired_columns
+        with span("fillna", columns=len(string_columns)):
+            for column in string_columns:
+                df[column] = df[column].fillna("")
+                if self._config.m_categorical:
+                    df[column] = self._encoded(df[column])
+
+        if self._config.m_downcast:
+            with span("downcast"):
+                optimize_dtypes(df)
+
+        self._parsed = df
+        self._parse_signature = self._signature()
+        # the lines appended to a compressed file cannot be read from an offset : it is not followed. Neither are the
+        # files whose rows have not been read up to their end (max of lines), their next rows would be skipped
+        if self._reached_end(df.shape[0]):
+            self._offsets = {file: size for file, size in sizes.items()
+                             if file not in self.read_errors and not compression_of(file)}
         else:
-            usecols = None
+            self._offsets = {}
+            logger.info("The files are not followed, only part of their rows have been read")
+        self._file_columns = {}
+
+    def _reached_end(self, nb_rows):
+        """Returns True if the rows of the files have been read up to their end, nb_rows having been read"""
+        max_lines = self._config.m_max_lines
+        return not max_lines or self._config.m_load_mode == "tail" or nb_rows < max_lines
+
+    def read_appended(self):
+        """Parses the lines appended to the files since they have been read (the files are followed as logs) and
+        adds them to the data. Returns the nb of rows added, raises CsvReadError if a file has been truncated"""
+        if self._parsed is None or not self._offsets:
+            return 0
+
+        dfs = []
+        for file, offset in self._offsets.items():
+            size = file.stat().st_size
+            if size < offset:
+                raise CsvReadError(f"Le fichier {file.name} a été tronqué")
+            if size == offset:
+                continue
+
+            with open(file, "rb") as f:
+                f.seek(offset)
+                data = f.read(size - offset)
+            # the last line is parsed once it is complete
+            end = data.rfind(b"\n") + 1
+            if end:
+                self._offsets[file] = offset + end
+                dfs.append(self._parse_lines(file, data[:end].lstrip(b"\r\n")))
+
+        df = pd.concat(dfs, ignore_index=True, sort=False) if dfs else None
+        if df is None or not df.shape[0]:
+            return 0
+
+        df = df.reindex(columns=self._parsed.columns)
+        # the parsed data is displayed, exported ... meanwhile : its new categories are set on a copy
+        parsed = self._parsed.copy(deep=False)
+        for column, dtype in zip(df.columns, self._parsed.dtypes):
+            if isinstance(dtype, pd.CategoricalDtype):
+                values = df[column].fillna("").astype(str)
+                new_categories = values[~values.isin(dtype.categories)].unique()
+                if len(new_categories):
+                    # sorted as the ones of the parse : the rows are sorted by the order of their categories
+                    categories = sorted(dtype.categories.union(new_categories))
+                    parsed[column] = parsed[column].cat.set_categories(categories)
+                df[column] = pd.Categorical(values, categories=parsed[column].cat.categories)
+            elif is_string_dtype(dtype):
+                df[column] = df[column].fillna("").astype(str)
+            else:
+                # downcast dtype
+                df[column] = cast_like(df[column], dtype)
+
+        self._parsed = pd.concat([parsed, df], ignore_index=True, sort=False)
+        self.project()
+        logger.info(f"{df.shape[0]} rows appended to the files")
+        return df.shape[0]
+
+    def _parse_lines(self, file, data):
+        """Parses lines of a file, without its header"""
+        columns = self._file_columns.get(file)
+        if columns is None:
+            columns = self._file_columns[file] = list(self._read_csv(file, nrows=0).columns)
+        kwargs = dict(header=None, names=columns, na_values=NA_VALUES)
+
+        engine = select_engine(self._config)
+        if engine is not PYTHON_ENGINE:
+            try:
+                return engine.read(io.BytesIO(data), self._config, **kwargs)
+            except Exception as e:
+                logger.warning(f"{engine.name} engine failed to read the new lines of {file} ({e}), "
+                               f"retrying with python engine")
+        return PYTHON_ENGINE.read(io.BytesIO(data), self._config, **kwargs)
+
+    def _signature(self):
+        """Files and options the parsed data depends on"""
+        return [self._files, self._config.m_categorical, self._config.m_downcast] + self._parse_options()
+
+    def _visible(self, columns):
+        """Returns the columns not hidden as undesired"""
+        if not self._config.hide_undesired:
+            return list(columns)
+        return [column for column in columns if column not in self._config.undesired_columns]
+
+    @staticmethod
+    def _encoded(values):
+        """Returns a text column dictionary-encoded (categorical) if it has few distinct values, as is otherwise"""
+        encoded = pd.Categorical(values)
+        if len(encoded.categories) > CATEGORY_MAX_RATIO * len(values):
+            return values
+        logger.debug(f"{values.name} encoded with {len(encoded.categories)} categories")
+        return pd.Series(encoded, index=values.index, name=values.name)
+
+    def _index_file(self, progress=None):
+        """Indexes the rows of the file instead of importing it, they will be read on demand"""
+        if len(self._files) > 1:
+            raise CsvReadError("La lecture à la demande ne gère qu'un seul fichier")
+        if compression_of(self._files[0]):
+            raise CsvReadError("La lecture à la demande ne gère pas les fichiers compressés")
+
+        self.read_errors = {}
+        self.line_index = LineIndex.load_or_build(self._files[0], self._config, progress)
+        self._parsed = None
+        self._offsets = None
+        self.df = None
+        self.df_columns = self.line_index.columns
+        self.numeric_columns = set()
+        self.string_columns = set()
+
+    def _read_all(self, read, progress=None):
+        """Reads the files in parallel, returns the dfs in the files order. A file that fails is skipped and
+        reported in self.read_errors, unless all of them fail"""
+        self.read_errors = {}
+        workers = min(self._config.workers or 1, len(self._files))
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(read, file) for file in self._files]
+
+        dfs = []
+        for file, future in zip(self._files, futures):
+            try:
+                dfs.append(future.result())
+            except OperationCancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cannot read {file} : {e}")
+                self.read_errors[file] = e
+
+        if not dfs:
+            raise next(iter(self.read_errors.values()))
+        return dfs
+
+    def _stream_all(self, progress, **kwargs):
+        """Reads the files one after the other by chunks, sending each chunk to the progress as soon as it is read.
+        Returns the dfs in the files order, a file that fails is skipped as in _read_all"""
+        self.read_errors = {}
+        dfs = []
+        cache = self._get_parse_cache()
+        for file in self._files:
+            df = cache.get(file, self._parse_options()) if cache else None
+            if df is not None:
+                self._report_cached(file, df, progress)
+                progress.add_chunk(self._displayable(df))
+                dfs.append(df)
+                continue
+
+            try:
+                chunks = list(self._stream_csv(file, progress, **kwargs))
+            except OperationCancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cannot read {file} : {e}")
+                self.read_errors[file] = e
+            else:
+                dfs.extend(chunks)
+                if cache:
+                    cache.put(file, self._parse_options(), pd.concat(chunks, ignore_index=True, sort=False))
+
+        if not dfs:
+            raise next(iter(self.read_errors.values()))
+        return dfs
+
+    def _stream_csv(self, file, progress, **kwargs):
+        """Yields the chunks of a csv file, sending each one to the progress"""
+        for chunk in self._read_chunks(file, progress, **kwargs):
+            progress.add_chunk(self._displayable(chunk))
+            yield chunk
+
+    def _read_chunks(self, file, progress=None, usecols=None, nrows=None, na_values=None, dtype=None):
+        """Yields the chunks of a csv file, with the rows of the load mode of the config. Falls back to the python
+        engine if the fast one fails before the first chunk"""
+        progress = progress or Progress()
+        first_line = self._config.m_first_line if self._config.m_load_mode == "range" else 0
+        if first_line and nrows:
+            nrows += first_line
+        position = 0
+        for chunk in self._iter_chunks(file, progress, usecols=usecols, nrows=nrows, na_values=na_values,
+                                       dtype=dtype):
+            if position + chunk.shape[0] > first_line:
+                yield chunk.iloc[max(0, first_line - position):]
+            position += chunk.shape[0]
+
+    def _iter_chunks(self, file, progress, usecols=None, nrows=None, na_values=None, dtype=None):
+        """Yields the chunks of all the rows of a csv file, growing in size"""
+        kwargs = dict(usecols=usecols, nrows=nrows, na_values=na_values, dtype=dtype)
+        engine = select_engine(self._config, usecols=usecols, nrows=nrows, iterator=True)
+        nb_chunks = 0
+
+        while True:
+            progress.start_file(file)
+            try:
+                with progress.open(file) as handle, \
+                        engine.read(handle, self._config, iterator=True, **kwargs) as reader:
+                    chunk_rows = FIRST_CHUNK_ROWS
+                    while True:
+                        try:
+                            chunk = reader.get_chunk(chunk_rows)
+                        except StopIteration:
+                            return
+                        nb_chunks += 1
+                        progress.add_rows(chunk.shape[0])
+                        yield chunk
+                        chunk_rows = min(2 * chunk_rows, MAX_CHUNK_ROWS)
+
+            except OperationCancelledError:
+                raise
+            except Exception as e:
+                if nb_chunks or engine is PYTHON_ENGINE:
+                    raise
+                logger.warning(f"{engine.name} engine failed to read {file} ({e}), retrying with python engine")
+                engine = PYTHON_ENGINE
+
+    def _displayable(self, chunk):
+        """Returns a chunk as it will be once imported (no undesired columns, no NaN in string columns)"""
+        chunk = chunk[self._visible(chunk.columns)]
+        return chunk.fillna({col: "" for col, dtype in zip(chunk.columns, chunk.dtypes) if is_string_dtype(dtype)})
+
+    def _get_parse_cache(self):
+        """Returns the parse cache, None if it is disabled"""
+        if self._parse_cache is None and self._config.cache_max_size:
+            self._parse_cache = ParseCache(self._config.cache_dir, self._config.cache_max_size)
+        return self._parse_cache
+
+    def _parse_options(self):
+        """Options of the config the parsed data depends on, to key the parse cache"""
+        return [self._config.m_encoding, self._config.m_separator, self._config.m_header, self._config.m_comment,
+                self._config.m_skip_blank_lines, self._config.m_max_lines, self._config.m_load_mode,
+                self._config.m_first_line]
+
+    def _read_cached(self, file, progress=None, **kwargs):
+        """Reads a csv file, from the parse cache if it has already been parsed with the same options"""
+        cache = self._get_parse_cache()
+        df = cache.get(file, self._parse_options()) if cache else None
+        if df is not None:
+            self._report_cached(file, df, progress)
+            return df
+
+        df = self._read_csv(file, progress=progress, **kwargs)
+        if cache:
+            cache.put(file, self._parse_options(), df)
+        return df
+
+    @staticmethod
+    def _report_cached(file, df, progress):
+        """Reports a file loaded from the cache as entirely read"""
+        logger.info(f"{file} loaded from the parse cache")
+        if progress:
+            progress.start_file(file)
+            progress.add_bytes(file, file.stat().st_size)
+            progress.add_rows(df.shape[0])
+
+    def _read_csv(self, file, usecols=None, nrows=None, na_values=None, dtype=None, progress=None):
+        """Reads the rows of a csv file selected by the load mode of the config, nrows being the max of rows.
+        The rows not selected are never all in memory"""
+        kwargs = dict(usecols=usecols, na_values=na_values, dtype=dtype)
+        mode = self._config.m_load_mode
+
+        if mode == "tail" and nrows:
+            return self._read_tail(file, nrows, progress, **kwargs)
+        if nrows != 0 and (mode == "range" and self._config.m_first_line or mode == "sample" and nrows):
+            chunks = self._read_chunks(file, progress, nrows=None if mode == "sample" else nrows, **kwargs)
+            if mode == "sample":
+                df = self._sample(chunks, nrows)
+            else:
+                chunks = list(chunks)
+                df = pd.concat(chunks, ignore_index=True, sort=False) if chunks else None
+            if df is not None and df.shape[0]:
+                return df
+            # no row : only the columns
+            return self._read_head(file, nrows=0, **kwargs)
+        return self._read_head(file, nrows=nrows, progress=progress, **kwargs)
+
+    @staticmethod
+    def _sample(chunks, nrows):
+        """Returns a uniform random sample of nrows rows of the chunks, in their order, in one pass : each row gets a
+        random key and the rows with the smallest keys are kept"""
+        rng = np.random.default_rng(SAMPLE_SEED)
+        sample = None
+        keys = np.empty(0)
+        position = 0
+        for chunk in chunks:
+            chunk = chunk.set_axis(pd.RangeIndex(position, position + chunk.shape[0]))
+            position += chunk.shape[0]
+            sample = chunk if sample is None else pd.concat([sample, chunk], sort=False)
+            keys = np.concatenate([keys, rng.random(chunk.shape[0])])
+            if keys.shape[0] > nrows:
+                kept = np.sort(np.argpartition(keys, nrows)[:nrows])
+                sample, keys = sample.iloc[kept], keys[kept]
+        return None if sample is None else sample.reset_index(drop=True)
+
+    def _read_tail(self, file, nrows, progress=None, **kwargs):
+        """Reads the last nrows rows of a csv file : its lines are counted backwards from its end, and only the last
+        ones are parsed. A compressed file is read by chunks instead, keeping the last rows"""
+        if compression_of(file):
+            df = self._tail_of_chunks(self._read_chunks(file, progress, **kwargs), nrows)
+            # no row : only the columns
+            return df if df is not None else self._read_head(file, nrows=0, **kwargs)
+
+        data_start = self._data_start(file)
+        lines_kwargs = kwargs
+        if self._config.m_header is not None:
+            columns = list(self._read_head(file, nrows=0, **kwargs).columns)
+            lines_kwargs = dict(kwargs, header=None, names=columns)
+
+        nb_lines = nrows
+        while True:
+            offset = self._lines_start(file, nb_lines, data_start)
+            if offset <= data_start:
+                # not that many lines
+                df = self._read_head(file, progress=progress, **kwargs)
+                return df.tail(nrows).reset_index(drop=True)
+
+            df = self._read_head(file, offset=offset, progress=progress, **lines_kwargs)
+            if df.shape[0] >= nrows:
+                return df.tail(nrows).reset_index(drop=True)
+            # blank or comment lines
+            nb_lines += nrows - df.shape[0]
 
-        dfs = (self._read_csv(file, usecols=usecols, na_values=["", " ", "inv"], nrows=self._config.m_max_lines)
-               for file in self._files)
+    @staticmethod
+    def _tail_of_chunks(chunks, nrows):
+        """Returns the last nrows rows of the chunks, None if there is no row"""
+        tail = None
+        for chunk in chunks:
+            tail = chunk if tail is None else pd.concat([tail, chunk], ignore_index=True, sort=False)
+            tail = tail.iloc[-nrows:]
+        return None if tail is None or not tail.shape[0] else tail.reset_index(drop=True)
 
-        df = pd.concat(dfs, ignore_index=True, sort=False)
+    def _data_start(self, file):
+        """Returns the offset of the first data line, after the header (the lines ignored before it are the same as
+        for LineIndex)"""
+        if self._config.m_header is None:
+            return 0
+        comment = self._config.m_comment.encode(self._config.m_encoding or "utf-8")[:1] \
+            if self._config.m_comment else None
+        nb_lines = 0
+        with open(file, "rb") as handle:
+            for line in iter(handle.readline, b""):
+                if comment and line.startswith(comment) or self._config.m_skip_blank_lines and not line.strip(b"\r\n"):
+                    continue
+                if nb_lines == self._config.m_header:
+                    return handle.tell()
+                nb_lines += 1
+            return handle.tell()
 
-        if self._config.hide_empty:
-            df.dropna(how='all', axis=1, inplace=True)
+    @staticmethod
+    def _lines_start(file, nb_lines, stop):
+        """Returns the offset of the start of the last nb_lines lines of a file, reading it backwards until the offset
+        stop"""
+        with open(file, "rb") as handle:
+            position = handle.seek(0, io.SEEK_END)
+            if position > stop:
+                handle.seek(position - 1)
+                if handle.read(1) == b"\n":
+                    position -= 1  # end of the last line
+            while position > stop:
+                start = max(stop, position - TAIL_BLOCK_BYTES)
+                handle.seek(start)
+                block = np.frombuffer(handle.read(position - start), dtype=np.uint8)
+                new_lines = np.flatnonzero(block == ord("\n"))
+                if new_lines.shape[0] >= nb_lines:
+                    return start + int(new_lines[-nb_lines]) + 1
+                nb_lines -= new_lines.shape[0]
+                position = start
+        return stop
 
-        self.df_columns = list(df.columns)
+    def _read_head(self, file, nrows=None, offset=0, progress=None, **kwargs):
+        """Reads a csv file from a byte offset with the fastest engine supporting the config, falls back to the
+        python engine"""
+        usecols = kwargs.get("usecols")
+        kwargs.update(nrows=nrows)
+        engine = select_engine(self._config, usecols=usecols, nrows=nrows)
 
-        self.numeric_columns = {col for col, dtype in zip(self.df_columns, df.dtypes) if is_numeric_dtype(dtype)}
-        self.string_columns = {col for col, dtype in zip(self.df_columns, df.dtypes) if is_string_dtype(dtype)}
+        if engine is not PYTHON_ENGINE:
+            try:
+                return self._read_with(engine, file, progress, offset, **kwargs)
+            except OperationCancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"{engine.name} engine failed to read {file} ({e}), retrying with python engine")
 
-        for column in self.string_columns:
-            df[column] = df[column].fillna("")
+        return self._read_with(PYTHON_ENGINE, file, progress, offset, **kwargs)
 
-        self.df = df
+    def _read_with(self, engine, file, progress, offset=0, **kwargs):
+        """Reads a csv file from a byte offset with an engine, reporting to the progress"""
+        if progress is None and not offset and not compression_of(file):
+            return engine.read(file, self._config, **kwargs)
 
-    def _read_csv(self, file, usecols=None, nrows=None, na_values=None, dtype=None):
-        return pd.read_csv(file, engine="python", index_col=False, usecols=usecols, na_values=na_values, dtype=dtype,
-                           encoding=self._config.m_encoding, sep=self._config.m_separator, header=self._config.m_header,
-                           comment=self._config.m_comment, skip_blank_lines=self._config.m_skip_blank_lines,
-                           nrows=nrows)
+        progress = progress or Progress()
+        progress.start_file(file)
+        with progress.open(file) as handle:
+            if offset:
+                handle.seek(offset)
+            df = engine.read(handle, self._config, **kwargs)
+        progress.add_rows(df.shape[0])
+        return df
@@ -0,0 +1,89 @@
+"""Reduction of the memory used by the numeric columns of a df, uniform types of the text columns"""
+import logging
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype, is_float_dtype, is_integer_dtype, is_numeric_dtype
+
+logger = logging.getLogger(__name__)
+
+SPARSE_MIN_RATIO = 0.9  # a numeric column is stored sparse if at least this ratio of its values are missing
+NULLABLE_INT_DTYPES = ("Int8", "Int16", "Int32", "Int64")
+
+
+def unify_text_columns(df):
+    """Converts (in place) the values of the object columns mixing numbers and texts to texts, the missing values
+    being kept : a column can be numeric in a chunk of the rows or in a file, and text in another one"""
+    for column in df.columns:
+        values = df[column]
+        if values.dtype == object and infer_dtype(values, skipna=True) not in ("string", "empty"):
+            df[column] = values.where(values.isna(), values.astype(str))
+
+
+def cast_like(values, dtype):
+    """Returns the numeric values with the dtype (of a downcast column) if it holds them without loss, as they are
+    otherwise"""
+    if values.dtype == dtype or not (is_numeric_dtype(values.dtype) and is_numeric_dtype(dtype)):
+        return values
+    try:
+        cast = values.astype(dtype)
+    except (TypeError, ValueError, OverflowError):
+        return values
+    if np.array_equal(cast.to_numpy(dtype=np.float64, na_value=np.nan),
+                      values.to_numpy(dtype=np.float64, na_value=np.nan), equal_nan=True):
+        return cast
+    return values
+
+
+def optimize_dtypes(df):
+    """Converts the numeric columns of df (in place) to the smallest dtype holding their values without loss,
+    logs the memory used by each column before and after"""
+    total_before = total_after = 0
+    for column in df.columns:
+        values = df[column]
+        if not isinstance(values.dtype, np.dtype):
+            continue
+
+        before = values.memory_usage(deep=True, index=False)
+        optimized = _optimized(values)
+        after = optimized.memory_usage(deep=True, index=False)
+        total_before += before
+        total_after += after
+
+        if optimized.dtype != values.dtype:
+            df[column] = optimized
+            logger.info(f"{column} : {values.dtype} {before} B -> {optimized.dtype} {after} B")
+
+    logger.info(f"Memory used by the columns : {total_before // 1000} kB -> {total_after // 1000} kB")
+
+
+def _optimized(values):
+    """Returns the column with the smallest dtype, or the column itself if it cannot be reduced"""
+    if is_integer_dtype(values.dtype):
+        return pd.to_numeric(values, downcast="integer")
+
+    if not is_float_dtype(values.dtype):
+        return values
+
+    missing = values.isna()
+    nb_missing = int(missing.sum())
+    if nb_missing == len(values):
+        return values
+
+    if nb_missing >= SPARSE_MIN_RATIO * len(values):
+        return values.astype(pd.SparseDtype(values.dtype, np.nan))
+
+    present = values[~missing]
+    if nb_missing and (present == np.round(present)).all():
+        # integers with missing values
+        for dtype in NULLABLE_INT_DTYPES:
+            info = np.iinfo(dtype.lower())
+            if info.min <= present.min() and present.max() <= info.max:
+                return values.astype(dtype)
+
+    if values.dtype == np.float64:
+        as_float32 = values.astype(np.float32)
+        if (as_float32[~missing].astype(np.float64) == present).all():
+            return as_float32
+
+    return values
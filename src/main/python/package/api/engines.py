@@ -0,0 +1,87 @@
+"""Csv parsing engines, from the fastest to the most permissive"""
+import importlib.util
+import logging
+
+import pandas as pd
+
+from package.api.utils import log_time_it
+
+logger = logging.getLogger(__name__)
+
+
+class Engine:
+    """Base class of the parsing engines, wraps pd.read_csv with the options of the config"""
+    name = None
+
+    def supports(self, config, usecols=None, nrows=None, iterator=False):
+        """Returns True if the engine can read files with the config and the read options"""
+        raise NotImplementedError
+
+    def read(self, file, config, **kwargs):
+        """Reads a csv file, returns a DataFrame"""
+        raise NotImplementedError
+
+    def _read(self, file, config, **kwargs):
+        """Reads with the options of the config, kwargs can override them"""
+        options = dict(encoding=config.m_encoding, sep=config.m_separator, header=config.m_header,
+                       comment=config.m_comment, skip_blank_lines=config.m_skip_blank_lines)
+        options.update(kwargs)
+        return pd.read_csv(file, engine=self.name, **options)
+
+
+class PyArrowEngine(Engine):
+    """Multi-threaded pyarrow parser. Fastest, but no comment, no line limit, no reading by chunks, and it counts
+    the blank lines before the header, so a header offset is only supported when blank lines are kept"""
+    name = "pyarrow"
+
+    def __init__(self):
+        self.available = importlib.util.find_spec("pyarrow") is not None
+
+    def supports(self, config, usecols=None, nrows=None, iterator=False):
+        return (self.available
+                and nrows is None
+                and not iterator
+                and not callable(usecols)
+                and not config.m_comment
+                and not (config.m_header and config.m_skip_blank_lines)
+                and len(config.m_separator) == 1)
+
+    @log_time_it
+    def read(self, file, config, **kwargs):
+        return self._read(file, config, **kwargs)
+
+
+class CEngine(Engine):
+    """C parser, handles everything but multi-char separators. The types are inferred on whole columns
+    (low_memory=False) : by blocks of rows, a column could mix numbers and texts"""
+    name = "c"
+
+    def supports(self, config, usecols=None, nrows=None, iterator=False):
+        return len(config.m_separator) == 1
+
+    @log_time_it
+    def read(self, file, config, **kwargs):
+        return self._read(file, config, index_col=False, low_memory=False, **kwargs)
+
+
+class PythonEngine(Engine):
+    """Python parser, slow but handles all the options (regex separator ...)"""
+    name = "python"
+
+    def supports(self, config, usecols=None, nrows=None, iterator=False):
+        return True
+
+    @log_time_it
+    def read(self, file, config, **kwargs):
+        return self._read(file, config, index_col=False, **kwargs)
+
+
+PYTHON_ENGINE = PythonEngine()
+ENGINES = (PyArrowEngine(), CEngine(), PYTHON_ENGINE)
+
+
+def select_engine(config, usecols=None, nrows=None, iterator=False):
+    """Returns the fastest engine supporting the config and the read options"""
+    for engine in ENGINES:
+        if engine.supports(config, usecols=usecols, nrows=nrows, iterator=iterator):
+            return engine
@@ -15,3 +15,13 @@ class CsvReadError(Exception):
 class CustomError(Exception):
     """Raise this exception in case of problem with custom operation"""
     pass
+
+
+class OperationCancelledError(Exception):
+    """The operation has been cancelled by the user"""
+    pass
+
+
+class ExportError(Exception):
+    """Error when exporting the data"""
+    pass
@@ -0,0 +1,111 @@
+"""Export of the rows displayed to csv, parquet or feather. The rows are copied and written by chunks, never all at
+once, and the file is replaced only when it is complete"""
+import importlib.util
+import logging
+import os
+import pathlib
+
+import pandas as pd
+
+from package.api.exceptions import ExportError
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_ROWS = 100000
+EXPORT_FORMATS = ("csv", "parquet", "feather")
+EXPORT_ENCODING = "utf-8"
+EXPORT_SEPARATOR = ";"  # separator of a csv export when the one given is not a character
+
+
+class _CsvWriter:
+
+    def __init__(self, path, separator):
+        self._file = open(path, "w", newline="", encoding=EXPORT_ENCODING)
+        self._separator = separator
+        self._header = True
+
+    def write(self, chunk):
+        chunk.to_csv(self._file, sep=self._separator, index=False, header=self._header, lineterminator="\n")
+        self._header = False
+
+    def close(self):
+        self._file.close()
+
+
+class _ArrowWriter:
+    """Parquet or feather (arrow ipc file) writer, with the schema of the first chunk"""
+
+    def __init__(self, path, file_format):
+        self._path = str(path)
+        self._format = file_format
+        self._schema = None
+        self._writer = None
+
+    def write(self, chunk):
+        import pyarrow as pa
+
+        # arrow does not convert the sparse columns of a downcast df
+        sparse = {column: dtype.subtype for column, dtype in chunk.dtypes.items() if isinstance(dtype, pd.SparseDtype)}
+        if sparse:
+            chunk = chunk.astype(sparse)
+        table = pa.Table.from_pandas(chunk, schema=self._schema, preserve_index=False)
+        if self._writer is None:
+            self._schema = table.schema
+            if self._format == "parquet":
+                import pyarrow.parquet as pq
+                self._writer = pq.ParquetWriter(self._path, self._schema)
+            else:
+                self._writer = pa.ipc.new_file(self._path, self._schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def export_format(path):
+    """Returns the format of an export file from its extension, raises ExportError if it is not supported"""
+    file_format = pathlib.Path(path).suffix[1:].lower()
+    if file_format not in EXPORT_FORMATS:
+        raise ExportError(f"Format d'export inconnu : {pathlib.Path(path).suffix or pathlib.Path(path).name}")
+    if file_format != "csv" and importlib.util.find_spec("pyarrow") is None:
+        raise ExportError(f"L'export en {file_format} nécessite pyarrow")
+    return file_format
+
+
+def export_rows(df, path, rows=None, columns=None, separator=EXPORT_SEPARATOR, progress=None):
+    """Writes the rows of df at the positions rows (int array, None : all of them) and the columns to path, in the
+    format of its extension, with the separator if it is one character. The progress (optional) counts the rows
+    written, and cancels the export if it is cancelled. Returns the nb of rows written"""
+    path = pathlib.Path(path)
+    file_format = export_format(path)
+    if file_format == "csv" and len(separator) != 1:
+        # a separator of several characters or a regex is only for the reading
+        logger.warning(f"Separator {separator!r} not written, {EXPORT_SEPARATOR!r} is used instead")
+        separator = EXPORT_SEPARATOR
+    positions = [df.columns.get_loc(column) for column in (df.columns if columns is None else columns)]
+    nb_rows = df.shape[0] if rows is None else rows.shape[0]
+    if progress:
+        progress.rows_total = nb_rows
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    writer = _CsvWriter(tmp_path, separator) if file_format == "csv" else _ArrowWriter(tmp_path, file_format)
+    try:
+        # at least one chunk, for the header of an export without rows
+        for start in range(0, max(nb_rows, 1), EXPORT_CHUNK_ROWS):
+            if progress:
+                progress.check()
+            stop = min(start + EXPORT_CHUNK_ROWS, nb_rows)
+            writer.write(df.iloc[slice(start, stop) if rows is None else rows[start:stop], positions])
+            if progress:
+                progress.add_rows(stop - start)
+        writer.close()
+        os.replace(tmp_path, path)
+    finally:
+        writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    logger.info(f"{nb_rows} rows exported to {path}")
+    return nb_rows
@@ -0,0 +1,205 @@
+"""Filter expressions : conditions combined with and, or, not and parentheses, e.g.
+Col1 > 10 and (Col2 : java* or not Col3 = x)"""
+import functools
+import re
+
+from package.api.exceptions import FilterInvalidError
+from package.api.predicates import And, Not, NumericCompare, Or, StringMatch, TextSearch
+
+ANY_COLUMN = "*"  # column of the filters searching a text in all the text columns
+
+OPERATOR_REGEX = re.compile(r"[<>]=?|[:=]")
+OPERAND_START_REGEX = re.compile(r"\s*(\(|not\b)", re.IGNORECASE)  # keywords where an operand is expected
+OPERAND_END_REGEX = re.compile(r"\s*(\)|and\b|or\b)", re.IGNORECASE)  # keywords after an operand
+VALUE_END_REGEX = re.compile(r"\)|\b(?:and|or)\b", re.IGNORECASE)  # candidate ends of the value of a condition
+
+
+def tokenize(text):
+    """Splits an expression into keywords and conditions : returns (keyword, text) tuples, keyword being and, or,
+    not, ( or ) for a keyword and None for a condition. A keyword or a parenthesis is only one where an operand starts
+    or ends, so that the column names and the values can contain them : Poids (kg) > 5, Genre : rock and roll"""
+    tokens = []
+    position = 0
+    expect_operand = True
+    while text[position:].strip():
+        match = (OPERAND_START_REGEX if expect_operand else OPERAND_END_REGEX).match(text, position)
+        if match:
+            keyword = match.group(1).lower()
+            tokens.append((keyword, keyword))
+            position = match.end()
+            expect_operand = keyword != ")"
+            continue
+
+        start = len(text) - len(text[position:].lstrip())
+        position = _condition_end(text, start)
+        tokens.append((None, text[start:position]))
+        expect_operand = False
+    return tokens
+
+
+def _condition_end(text, start):
+    """Returns the end of the condition starting at start : its column goes up to the operator, its value ends before
+    a closing parenthesis, or before an and / or followed by another operand"""
+    operator = OPERATOR_REGEX.search(text, start)
+    if not operator:
+        # incomplete condition
+        end = VALUE_END_REGEX.search(text, start)
+        return end.start() if end else len(text)
+
+    for end in VALUE_END_REGEX.finditer(text, operator.end()):
+        if end.group(0) == ")" or _is_operand(text, end.end()):
+            return end.start()
+    return len(text)
+
+
+def _is_operand(text, position):
+    """Returns True if the text from position starts with a condition, possibly after not and parentheses, or is
+    empty (incomplete expression)"""
+    if not text[position:].strip():
+        return True
+    while True:
+        match = OPERAND_START_REGEX.match(text, position)
+        if not match:
+            break
+        position = match.end()
+    end = VALUE_END_REGEX.search(text, position)
+    return OPERATOR_REGEX.search(text, position, end.start() if end else len(text)) is not None
+
+
+def parse_expression(text, condition):
+    """Returns the predicate of an expression and its normalized text. condition(text) returns the predicate and the
+    normalized text of a condition. Raises FilterInvalidError"""
+    return _Parser(tokenize(text), condition).parse()
+
+
+def parse_filter(text, columns, numeric_columns, string_columns, get_index=None):
+    """Returns the predicate of a filter on data having these columns and its normalized text.
+    Raises FilterInvalidError"""
+    return parse_expression(text, functools.partial(parse_condition, columns=columns, numeric_columns=numeric_columns,
+                                                    string_columns=string_columns, get_index=get_index))
+
+
+def parse_condition(text, columns, numeric_columns, string_columns, get_index=None):
+    """Returns the predicate of a condition (column operator value) and its normalized text. get_index returns the
+    trigram index of the text columns, for the searches in all of them. Raises FilterInvalidError"""
+    match = re.search(r"[<>]=?|[:=]", text)
+    if not match:
+        raise FilterInvalidError(f"Opérateur manquant dans : {text}")
+    operator = match.group(0)
+
+    column, value = [v.strip() for v in text.split(operator, maxsplit=1)]
+
+    if column != ANY_COLUMN and column not in columns:
+        raise FilterInvalidError(f"{column} n'est pas une colonne de ce fichier")
+
+    if not re.match(r"^[\w?*:,.% ]+$", value):
+        raise FilterInvalidError(f"La valeur du filtre est incorrecte")
+
+    if column == ANY_COLUMN:
+        if not re.match(r"[:=]", operator):
+            raise FilterInvalidError(f"Opérateurs autorisés pour une recherche dans toutes les colonnes : "
+                                     f"':' ou '='")
+        predicate = TextSearch(value, get_index)
+
+    elif column in string_columns:
+        if not re.match(r"[:=]", operator):
+            raise FilterInvalidError(f"Opérateurs autorisés pour une colonne texte : ':' ou '='")
+        predicate = StringMatch(column, value)
+
+    elif column in numeric_columns:
+        if not re.match(r"[<>=]", operator):
+            raise FilterInvalidError(
+                f"Opérateurs autorisés pour une colonne numérique : '>', '>=', '<' ou '<='")
+        predicate = _numeric_compare(column, value, operator)
+
+    else:
+        raise FilterInvalidError("Le filtre n'est pas valide")
+
+    return predicate, f"{column}{operator} {value}"
+
+
+def _numeric_compare(column, value, operator):
+    """Returns the predicate of a number filter"""
+    if value == "*":
+        return NumericCompare(column, operator, None)
+    try:
+        value = float(value.replace(",", "."))
+    except ValueError:
+        raise FilterInvalidError(f"La valeur doit filtre doit être un nombre")
+    return NumericCompare(column, operator, value)
+
+
+class _Parser:
+    """Recursive descent parser : or of ands of (not) factors, a factor being a condition or an expression in
+    parentheses"""
+
+    def __init__(self, tokens, condition):
+        self._tokens = tokens
+        self._position = 0
+        self._condition = condition
+
+    def parse(self):
+        if not self._tokens:
+            raise FilterInvalidError("Le filtre est vide")
+        predicate, text = self._or()
+        if self._peek() is not None:
+            raise FilterInvalidError(f"Expression invalide à partir de : {self._peek()[1].strip()}")
+        return predicate, text
+
+    def _peek(self):
+        return self._tokens[self._position] if self._position < len(self._tokens) else None
+
+    def _keyword(self):
+        """Returns the keyword (lower case) or parenthesis at the current position, None if it is a condition"""
+        token = self._peek()
+        return token[0] if token is not None else None
+
+    def _or(self):
+        operands = [self._and()]
+        while self._keyword() == "or":
+            self._position += 1
+            operands.append(self._and())
+        if len(operands) == 1:
+            return operands[0]
+        return Or([predicate for predicate, _ in operands]), " or ".join(text for _, text in operands)
+
+    def _and(self):
+        operands = [self._not()]
+        while self._keyword() == "and":
+            self._position += 1
+            operands.append(self._not())
+        if len(operands) == 1:
+            return operands[0]
+        return And([predicate for predicate, _ in operands]), " and ".join(self._grouped(*operand)
+                                                                           for operand in operands)
+
+    def _not(self):
+        if self._keyword() == "not":
+            self._position += 1
+            predicate, text = self._not()
+            return Not(predicate), "not " + self._grouped(predicate, text)
+        return self._factor()
+
+    def _factor(self):
+        keyword = self._keyword()
+        token = self._peek()
+        if token is None:
+            raise FilterInvalidError("Expression incomplète")
+
+        if keyword == "(":
+            self._position += 1
+            predicate, text = self._or()
+            if self._keyword() != ")":
+                raise FilterInvalidError("Parenthèse fermante manquante")
+            self._position += 1
+            return predicate, text
+
+        if keyword is not None:
+            raise FilterInvalidError(f"Condition attendue avant : {keyword}")
+        self._position += 1
+        return self._condition(token[1].strip())
+
+    @staticmethod
+    def _grouped(predicate, text):
+        """Text of an operand, in parentheses if it combines predicates"""
+        return f"({text})" if isinstance(predicate, (And, Or)) else text
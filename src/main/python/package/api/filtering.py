@@ -1,9 +1,11 @@
-import re
 import logging
 
+import numpy as np
 from PySide2 import QtCore, QtWidgets
 
 from package.api.exceptions import FilterInvalidError
+from package.api.expression import parse_condition, parse_expression
+from package.api.predicates import And, Not, Or
 
 logger = logging.getLogger(__name__)
 
@@ -19,89 +21,63 @@ class FilterManager:
         self._filters = {}
 
     @property
-    def enabled_queries(self):
+    def enabled_masks(self):
         if not self._filters:
             return []
-        return [filter_.query for filter_ in self._filters.values() if filter_.enabled]
+        return [self._mask(filter_) for filter_ in self._filters.values() if filter_.enabled]
 
     @property
     def filtered_columns(self):
         if not self._filters:
             return {}
-        return {filter_.column for filter_ in self._filters.values() if filter_.enabled}
+        return set().union(*(filter_.columns for filter_ in self._filters.values() if filter_.enabled))
 
     @staticmethod
     def _parse_text(text, operator):
         """returns column and value from the raw (button) text"""
         return [v.strip() for v in text.split(operator, maxsplit=1)]
 
-    @staticmethod
-    def _prepare_numeric_query(column, value, operator):
-        """Returns the number query"""
-        if value == "*":
-            return f"{column}.notnull()"
-        try:
-            value = float(value.replace(",", "."))
-        except ValueError:
-            raise FilterInvalidError(f"La valeur doit filtre doit être un nombre")
-        return f"{column} {operator} {value}"
+    def _text_index(self):
+        """Returns the trigram index of the text columns of the model, None if it has not been built yet"""
+        return self._table_model.text_index
 
-    @staticmethod
-    def _prepare_string_query(column, value):
-        """Returns the string query"""
-        if value == "*":
-            return f"{column}.str.match(r'^.+$')"
-        value = value.replace("*", ".*").replace("?", ".?")
-        return f"{column}.str.match('{value}$', case=False)"
+    def _mask(self, filter_):
+        """Returns the mask of a filter over the whole data, computed once"""
+        if filter_.mask is None:
+            filter_.mask = self._table_model.compute_mask(filter_.predicate)
+        return filter_.mask
 
     def add(self, text, neg):
-        """Adds a new filter and returns the associated button for the UI"""
-        operator = re.search(r"[<>]=?|[:=]", text).group(0)
-
-        column, value = [v.strip() for v in text.split(operator, maxsplit=1)]
-
-        if column not in self._table_model.df_columns:
-            raise FilterInvalidError(f"{column} n'est pas une colonne de ce fichier")
-
-        if not re.match(r"^[\w?*:,.% ]+$", value):
-            raise FilterInvalidError(f"La valeur du filtre est incorrecte")
-
-        if column in self._table_model.string_columns:
-            if not re.match(r"[:=]", operator):
-                raise FilterInvalidError(f"Opérateurs autorisés pour une colonne texte : ':' ou '='")
-            query = self._prepare_string_query(column, value)
-
-        elif column in self._table_model.numeric_columns:
-            if not re.match(r"[<>=]", operator):
-                raise FilterInvalidError(
-                    f"Opérateurs autorisés pour une colonne numérique : '>', '>=', '<' ou '<='")
-            query = self._prepare_numeric_query(column, value, operator)
+        """Adds a new filter and returns the associated button for the UI. The text is a condition
+        (column operator value), or an expression of conditions combined with and, or, not and parentheses"""
+        predicate, text = parse_expression(text, self._condition)
 
-        else:
-            raise FilterInvalidError("Le filtre n'est pas valide")
-
-        text = f"{column}{operator} {value}"
-
-        # negate the query
+        # negate the predicate
         if neg:
-            text = "not " + text
-            query = "not " + query
+            text = "not " + (f"({text})" if isinstance(predicate, (And, Or)) else text)
+            predicate = Not(predicate)
 
         if text in self._filters:
             raise FilterInvalidError("Ce filtre existe déjà")
 
         filter_ = Filter(enabled=True,
-                         column=column,
+                         columns=predicate.columns,
                          text=text,
-                         query=query,
+                         predicate=predicate,
                          btn=QtWidgets.QPushButton(self._icon_on, text))
 
         self._filters[text] = filter_
-        self._table_model.update_highlights(added_col=column)
-        self._table_model.add_query(query)
+        for column in filter_.columns:
+            self._table_model.update_highlights(added_col=column)
+        self._table_model.add_mask(self._mask(filter_))
 
         return filter_.btn
 
+    def _condition(self, text):
+        """Returns the predicate of a condition (column operator value) and its normalized text"""
+        return parse_condition(text, self._table_model.df_columns, self._table_model.numeric_columns,
+                               self._table_model.string_columns, self._text_index)
+
     def delete(self, text):
         """Deletes a filter"""
         if text in self._filters:
@@ -110,12 +86,19 @@ class FilterManager:
             self._table_model.update_highlights()
         self._table_model.reset_filtering()
 
+    def extend_masks(self, rows):
+        """Extends the masks already computed with the rows appended to the data"""
+        for filter_ in self._filters.values():
+            if filter_.mask is not None:
+                filter_.mask = np.concatenate([filter_.mask, filter_.predicate.mask(rows)])
+
     def file_opened(self):
         """Updates filtering when a new file is opened"""
         if self._filters:
             remove_list = []
             for filter_ in self._filters.values():
-                if filter_.column in self._table_model.columns:
+                filter_.mask = None
+                if filter_.columns <= set(self._table_model.columns):
                     if filter_.enabled:
                         filter_.enabled = False
                         filter_.btn.setIcon(self._icon_off)
@@ -152,17 +135,18 @@ class FilterManager:
             filter_.enabled = True
             filter_.btn.setIcon(self._icon_on)
             filter_.btn.repaint()
-            self._table_model.add_query(filter_.query)
+            self._table_model.add_mask(self._mask(filter_))
         self._table_model.update_highlights()
 
 
 class Filter:
-    def __init__(self, enabled, text, column, query, btn):
+    def __init__(self, enabled, text, columns, predicate, btn):
 
         self.enabled = enabled
         self.text = text
-        self.column = column
-        self.query = query
+        self.columns = columns  # set, empty for a search in all the text columns
+        self.predicate = predicate
+        self.mask = None  # rows of the whole data kept by the filter (numpy bool array), computed once
 
         self.btn = btn
         self.btn.setIconSize(QtCore.QSize(10, 10))
@@ -0,0 +1,137 @@
+"""Index of the byte offsets of the rows of a csv file, to read any range of rows without reading the whole file.
+Rows are split on the new lines : a quoted value containing a new line is not supported"""
+import io
+import json
+import logging
+import mmap
+
+import numpy as np
+import pandas as pd
+
+from package.api.engines import PYTHON_ENGINE, select_engine
+from package.api.exceptions import CsvReadError
+from package.api.utils import log_time_it
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".idx.npz"
+SCAN_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+class LineIndex:
+
+    def __init__(self, file, config, offsets, header):
+        self._file = file
+        self._config = config
+        self._offsets = offsets  # start of each row, then the end of the file (uint64 array)
+        self._header = header  # header line (bytes), None if the file has no header
+        if header is None and not len(self):
+            raise CsvReadError(f"Le fichier {file} est vide")
+        self.columns = list(self.read_rows(0, 0 if header else 1).columns)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    @classmethod
+    def load_or_build(cls, file, config, progress=None):
+        """Returns the index of the file, from the cache next to it if it is still valid"""
+        index_file = file.with_name(file.name + INDEX_SUFFIX)
+        key = cls._key(file, config)
+
+        if index_file.is_file():
+            try:
+                with np.load(index_file) as cached:
+                    if json.loads(str(cached["key"])) == key:
+                        header = bytes(cached["header"]) if cached["has_header"] else None
+                        return cls(file, config, cached["offsets"], header)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Cannot load the index {index_file} : {e}")
+
+        offsets, header = cls._scan(file, config, progress)
+
+        try:
+            with open(index_file, "wb") as handle:
+                np.savez(handle, key=json.dumps(key), offsets=offsets, header=np.frombuffer(header or b"", np.uint8),
+                         has_header=header is not None)
+        except OSError as e:
+            logger.warning(f"Cannot save the index {index_file} : {e}")
+
+        return cls(file, config, offsets, header)
+
+    def read_rows(self, start, stop):
+        """Parses the rows [start, stop[ of the file"""
+        stop = min(stop, len(self))
+        with open(self._file, "rb") as handle:
+            handle.seek(int(self._offsets[start]))
+            data = handle.read(int(self._offsets[stop] - self._offsets[start])) if stop > start else b""
+
+        if self._header is not None:
+            data = self._header + data
+        options = dict(header=None if self._header is None else 0, nrows=stop - start, na_values=["", " ", "inv"])
+
+        # nrows excludes the pyarrow engine, which drops the blank lines
+        engine = select_engine(self._config, nrows=stop - start)
+        if engine is not PYTHON_ENGINE:
+            try:
+                return engine.read(io.BytesIO(data), self._config, **options)
+            except Exception as e:
+                logger.warning(f"{engine.name} engine failed to read rows of {self._file} ({e}), "
+                               f"retrying with python engine")
+        return PYTHON_ENGINE.read(io.BytesIO(data), self._config, **options)
+
+    @staticmethod
+    def _key(file, config):
+        """What the index depends on"""
+        stat = file.stat()
+        return [stat.st_size, stat.st_mtime_ns, config.m_header, config.m_comment, config.m_skip_blank_lines]
+
+    @staticmethod
+    @log_time_it
+    def _scan(file, config, progress=None):
+        """Returns the offsets of the data rows (and the end of the file) and the header line"""
+        size = file.stat().st_size
+        if not size:
+            raise CsvReadError(f"Le fichier {file} est vide")
+        if progress:
+            progress.start_file(file)
+
+        with open(file, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = np.frombuffer(mm, dtype=np.uint8)
+
+            # start of each line, block by block to bound the memory used
+            starts = [np.zeros(1, dtype=np.uint64)]
+            for block_start in range(0, size, SCAN_BLOCK_BYTES):
+                if progress:
+                    progress.check()
+                block = data[block_start:block_start + SCAN_BLOCK_BYTES]
+                starts.append((np.flatnonzero(block == ord("\n")) + block_start + 1).astype(np.uint64))
+                if progress:
+                    progress.add_bytes(file, block.shape[0])
+                del block
+            starts = np.concatenate(starts)
+            if starts[-1] == size:
+                starts = starts[:-1]
+
+            # lines ignored by the parser
+            first_bytes = data[starts]
+            del data
+            keep = np.ones(starts.shape[0], dtype=bool)
+            if config.m_comment:
+                keep &= first_bytes != ord(config.m_comment.encode(config.m_encoding or "utf-8")[:1])
+            if config.m_skip_blank_lines:
+                lengths = np.diff(np.append(starts, np.uint64(size)))
+                blank = (lengths == 1) & (first_bytes == ord("\n"))
+                blank |= (lengths <= 2) & (first_bytes == ord("\r"))
+                keep &= ~blank
+            lines = starts[keep]
+
+            header = None
+            if config.m_header is not None:
+                if config.m_header >= lines.shape[0]:
+                    raise CsvReadError(f"Le fichier {file} n'a pas de ligne d'en-tête")
+                header_start = int(lines[config.m_header])
+                header_end = mm.find(b"\n", header_start)
+                header = mm[header_start:header_end if header_end >= 0 else size] + b"\n"
+                lines = lines[config.m_header + 1:]
+
+        return np.append(lines, np.uint64(size)), header
@@ -0,0 +1,84 @@
+"""On-disk cache of the parsed csv files (feather if pyarrow is installed, pickle otherwise)"""
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import pandas as pd
+
+from package.api.tracing import count
+
+logger = logging.getLogger(__name__)
+
+
+class ParseCache:
+    """Parsed files, keyed by the file fingerprint (path, size, mtime) and the parsing options. The least recently
+    used entries are evicted when the cache is bigger than its max size"""
+
+    def __init__(self, directory, max_bytes):
+        self._dir = directory
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def get(self, file, options):
+        """Returns the df of the file parsed with the options (list), None if it is not in the cache"""
+        entry = self._entry(file, options)
+        for path, read in ((entry + ".feather", pd.read_feather), (entry + ".pkl", pd.read_pickle)):
+            if os.path.isfile(path):
+                try:
+                    df = read(path)
+                    os.utime(path)  # most recently used
+                    count("parse cache hits")
+                    return df
+                except Exception as e:
+                    logger.warning(f"Cannot read the cached {path} : {e}")
+        count("parse cache misses")
+        return None
+
+    def put(self, file, options, df):
+        """Stores the df of the file parsed with the options, then evicts the oldest entries if needed"""
+        entry = self._entry(file, options)
+        try:
+            os.makedirs(self._dir, exist_ok=True)
+            try:
+                self._write(df.to_feather, entry + ".feather")
+            except Exception as e:
+                # no pyarrow, or columns feather cannot store (mixed types, non-text names ...)
+                logger.debug(f"Cannot cache {file} as feather ({e}), using pickle")
+                self._write(df.to_pickle, entry + ".pkl")
+        except OSError as e:
+            logger.warning(f"Cannot cache {file} : {e}")
+            return
+        self._evict()
+
+    def _entry(self, file, options):
+        """Path of the entry, without extension"""
+        stat = file.stat()
+        key = json.dumps([str(file.resolve()), stat.st_size, stat.st_mtime_ns, options], default=str)
+        return os.path.join(self._dir, hashlib.sha1(key.encode()).hexdigest())
+
+    def _evict(self):
+        with self._lock:
+            try:
+                entries = [entry for entry in os.scandir(self._dir) if entry.is_file()]
+                entries.sort(key=lambda entry: entry.stat().st_mtime)
+                total = sum(entry.stat().st_size for entry in entries)
+                for entry in entries:
+                    if total <= self._max_bytes:
+                        break
+                    total -= entry.stat().st_size
+                    os.remove(entry.path)
+            except OSError as e:
+                logger.warning(f"Cannot evict the parse cache entries : {e}")
+
+    @staticmethod
+    def _write(to_file, path):
+        """Writes to a temporary file then renames it, so a partial file is never read"""
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            to_file(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,333 @@
+"""Predicates of the filters : each one computes the boolean mask of the rows of a df it keeps, over all the rows
+or only over some of them (the ones still kept by the other predicates of an expression)"""
+import operator
+import re
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from package.api.profiling import profiles_of
+from package.api.trigram_index import TrigramIndex, factorize
+from package.api.utils import split_columns
+
+NUMERIC_OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "=": operator.eq,
+}
+
+REGEX_SYNTAX = r"[?.\\^$+()\[\]{}|]"  # patterns matched by a regex, not by a string comparison
+FOLDED_DFS = 4  # dfs whose folded text columns are kept
+PLAN_MIN_ROWS = 10000  # rows from which the predicates of an expression are ordered by the planner
+PLAN_SAMPLE_ROWS = 1000  # rows the selectivity of the predicates is estimated on
+DENSE_RATIO = 0.5  # ratio of rows still evaluated from which evaluating all of them is cheaper than gathering them
+
+
+def to_mask(result):
+    """Converts the result of a comparison (Series or array) to a numpy boolean array, missing values being False"""
+    if isinstance(result, np.ndarray):
+        return result
+    return pd.Series(result).to_numpy(dtype=bool, na_value=False)
+
+
+def positions(rows, mask):
+    """Returns the positions in the df of the rows (None : all of them) kept by the mask"""
+    return np.flatnonzero(mask) if rows is None else rows[mask]
+
+
+class Predicate:
+    """Base class of the predicates"""
+    cost = 1  # cost of the evaluation of a row, relative to the other predicates
+
+    @property
+    def columns(self):
+        """Columns used by the predicate (set), empty if it uses all the text columns"""
+        raise NotImplementedError
+
+    def mask(self, df, rows=None):
+        """Returns the boolean mask (numpy array) of the rows of df kept by the predicate. rows : positions (int array)
+        of the rows evaluated, the mask is then over them only. None : all the rows"""
+        raise NotImplementedError
+
+    def estimate(self, profiles):
+        """Returns the ratio of the rows kept estimated from the Profiles of the columns, None if it cannot be"""
+        return None
+
+
+class FoldedColumns:
+    """Distinct values of the text columns in lower case, and the codes of their rows, computed once per df and
+    column"""
+
+    def __init__(self, max_dfs=FOLDED_DFS):
+        self._max_dfs = max_dfs
+        self._dfs = OrderedDict()  # by id of the df : weak reference to the df, {column: FoldedValues}
+
+    def get(self, df, column):
+        """Returns the code of each row (-1 for a missing value) and the distinct values (FoldedValues)"""
+        key = id(df)
+        entry = self._dfs.get(key)
+        if entry is None or entry[0]() is not df:
+            entry = self._dfs[key] = (weakref.ref(df), {})
+            if len(self._dfs) > self._max_dfs:
+                self._dfs.popitem(last=False)
+        self._dfs.move_to_end(key)
+
+        folded = entry[1].get(column)
+        if folded is None:
+            codes, uniques = factorize(df[column])
+            folded = entry[1][column] = (codes, FoldedValues(pd.Series(uniques, dtype=object).astype(str)))
+        return folded
+
+
+class FoldedValues:
+    """Distinct values of a text column, their lower case, and the ones compared as strings : ascii without new line,
+    whose lower case is compared as by a case insensitive regex"""
+
+    def __init__(self, values):
+        self.values = values
+        self.lower = values.str.lower()
+        self.plain = np.fromiter((value.isascii() and "\n" not in value for value in values), dtype=bool,
+                                 count=len(values))
+
+
+FOLDED_COLUMNS = FoldedColumns()
+
+
+class StringMatch(Predicate):
+    """The value of a text column matches a pattern (case insensitive), where * is any text and ? an optional
+    character. The pattern is matched once per distinct value, with a string comparison when its only wildcards are
+    a * at its start and/or its end, with a regex otherwise. A string comparison matches the same values as the
+    regex : the values that are not ascii or that have a new line are matched by the regex"""
+
+    def __init__(self, column, pattern):
+        self.column = column
+        self.pattern = pattern
+        self._value = pattern.strip("*").lower()
+        self._regex = r"^.+$" if pattern == "*" else pattern.replace("*", ".*").replace("?", ".?") + "$"
+        if pattern == "*":
+            self._kind = "any"
+        elif re.search(REGEX_SYNTAX, pattern) or "*" in self._value or not pattern.isascii():
+            self._kind = "regex"
+        elif pattern.startswith("*"):
+            self._kind = "contains" if pattern.endswith("*") else "endswith"
+        else:
+            self._kind = "startswith" if pattern.endswith("*") else "equal"
+
+    @property
+    def columns(self):
+        return {self.column}
+
+    @property
+    def cost(self):
+        return 4 if self._kind == "regex" else 2
+
+    def estimate(self, profiles):
+        profile = profiles.get(self.column)
+        if profile is None or not profile.is_text:
+            return None
+        if self._kind == "any":
+            return 1 - profile.nb_nulls / max(profile.nb_rows, 1)
+        if self._kind == "equal":
+            return profile.ratio_equal(self._value)
+        if self._kind == "startswith":
+            return profile.ratio_startswith(self._value)
+        return None
+
+    def mask(self, df, rows=None):
+        # matched once per distinct value, then mapped to the rows by their codes (-1 for a missing value)
+        codes, folded = FOLDED_COLUMNS.get(df, self.column)
+        return np.append(self._match(folded), False)[codes if rows is None else codes[rows]]
+
+    def _match(self, folded):
+        """Returns the matches of the distinct values (FoldedValues) as a numpy bool array"""
+        if self._kind == "regex":
+            return to_mask(folded.values.str.match(self._regex, case=False))
+
+        values = folded.lower
+        if self._kind == "any":
+            matches = values.str.len() > 0
+        elif self._kind == "equal":
+            matches = values == self._value
+        elif self._kind == "startswith":
+            matches = values.str.startswith(self._value)
+        elif self._kind == "endswith":
+            matches = values.str.endswith(self._value)
+        else:
+            matches = values.str.contains(self._value, regex=False)
+        matches = to_mask(matches)
+        others = ~folded.plain
+        if others.any():
+            matches[others] = to_mask(folded.values[others].str.match(self._regex, case=False))
+        return matches
+
+
+class TextSearch(Predicate):
+    """A value of any text column contains a pattern (case insensitive), where * is any text and ? an optional
+    character. Uses the trigram index returned by get_index if it has been built on the df, scans the distinct values
+    of the columns otherwise"""
+
+    def __init__(self, pattern, get_index=None):
+        self.pattern = pattern
+        self._get_index = get_index
+
+    @property
+    def columns(self):
+        return set()
+
+    cost = 2
+
+    def mask(self, df, rows=None):
+        index = self._get_index() if self._get_index else None
+        if index is None or not index.covers(df):
+            index = TrigramIndex(df, sorted(split_columns(df)[1], key=list(df.columns).index), trigrams=False)
+        mask = index.mask(self.pattern)
+        return mask if rows is None else mask[rows]
+
+
+class NumericCompare(Predicate):
+    """The value of a numeric column compared to a number, or * for any value"""
+
+    def __init__(self, column, operator_, value):
+        self.column = column
+        self.operator = operator_
+        self.value = value  # float, None for any value
+
+    @property
+    def columns(self):
+        return {self.column}
+
+    def mask(self, df, rows=None):
+        # numpy array, or extension array (nullable integers, sparse)
+        series = df[self.column]
+        values = series.to_numpy() if isinstance(series.dtype, np.dtype) else series.array
+        if rows is not None:
+            values = values[rows]
+        if self.value is None:
+            return ~pd.isna(values)
+        return to_mask(NUMERIC_OPERATORS[self.operator](values, self.value))
+
+    def estimate(self, profiles):
+        profile = profiles.get(self.column)
+        if profile is None or profile.is_text:
+            return None
+        if self.value is None:
+            return 1 - profile.nb_nulls / max(profile.nb_rows, 1)
+        if self.operator == "=":
+            return profile.ratio_value()
+        below = profile.ratio_below(self.value)
+        if self.operator in ("<", "<="):
+            return below
+        return 1 - profile.nb_nulls / max(profile.nb_rows, 1) - below
+
+
+class Not(Predicate):
+    """Negation of a predicate"""
+
+    def __init__(self, predicate):
+        self.predicate = predicate
+
+    @property
+    def columns(self):
+        return self.predicate.columns
+
+    @property
+    def cost(self):
+        return self.predicate.cost
+
+    def mask(self, df, rows=None):
+        return ~self.predicate.mask(df, rows)
+
+    def estimate(self, profiles):
+        selectivity = self.predicate.estimate(profiles)
+        return None if selectivity is None else 1 - selectivity
+
+
+class Combination(Predicate):
+    """Base class of the combinations of predicates, evaluated one after the other in the order of the planner"""
+
+    def __init__(self, predicates):
+        self.predicates = predicates
+
+    @property
+    def columns(self):
+        return set().union(*(predicate.columns for predicate in self.predicates))
+
+    @property
+    def cost(self):
+        return sum(predicate.cost for predicate in self.predicates)
+
+    def plan(self, df, rows=None):
+        """Returns the predicates in their order of evaluation : by their rank, from their cost and their selectivity
+        estimated from the profiles of the columns if they have been computed, on a sample of the rows otherwise"""
+        nb_rows = df.shape[0] if rows is None else rows.shape[0]
+        if nb_rows < PLAN_MIN_ROWS:
+            return self.predicates
+        profiles = profiles_of(df)
+        sample = np.linspace(0, nb_rows - 1, PLAN_SAMPLE_ROWS).astype(np.int64)
+        if rows is not None:
+            sample = rows[sample]
+
+        def rank(predicate):
+            selectivity = predicate.estimate(profiles) if profiles else None
+            if selectivity is None:
+                selectivity = predicate.mask(df, sample).mean()
+            return self._rank(predicate.cost, selectivity)
+
+        return sorted(self.predicates, key=rank)
+
+    @staticmethod
+    def _rank(cost, selectivity):
+        """Rank of a predicate (the lowest is evaluated first) from its cost and the ratio of rows it keeps"""
+        raise NotImplementedError
+
+
+class And(Combination):
+    """All the predicates are true. Each predicate is only evaluated over the rows kept by the previous ones"""
+
+    def mask(self, df, rows=None):
+        mask = None
+        for predicate in self.plan(df, rows):
+            if mask is None:
+                mask = predicate.mask(df, rows).copy()
+                continue
+            nb_alive = np.count_nonzero(mask)
+            if not nb_alive:
+                break
+            if nb_alive > DENSE_RATIO * mask.shape[0]:
+                mask &= predicate.mask(df, rows)
+            else:
+                mask[mask] = predicate.mask(df, positions(rows, mask))
+        return mask
+
+    @staticmethod
+    def _rank(cost, selectivity):
+        # cost per row discarded
+        return cost / max(1 - selectivity, 1e-6)
+
+
+class Or(Combination):
+    """One of the predicates is true. Each predicate is only evaluated over the rows not kept by the previous ones"""
+
+    def mask(self, df, rows=None):
+        mask = None
+        for predicate in self.plan(df, rows):
+            if mask is None:
+                mask = predicate.mask(df, rows).copy()
+                continue
+            nb_remaining = mask.shape[0] - np.count_nonzero(mask)
+            if not nb_remaining:
+                break
+            if nb_remaining > DENSE_RATIO * mask.shape[0]:
+                mask |= predicate.mask(df, rows)
+            else:
+                mask[~mask] = predicate.mask(df, positions(rows, ~mask))
+        return mask
+
+    @staticmethod
+    def _rank(cost, selectivity):
+        # cost per row kept
+        return cost / max(selectivity, 1e-6)
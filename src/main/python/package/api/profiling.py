@@ -0,0 +1,145 @@
+"""Profiles of the columns of a df, computed in the background after the import : nb of distinct and missing values,
+min, max and histogram of the numeric columns, sorted distinct values of the text columns. They are used to complete
+the values of the filters and to estimate the selectivity of the filters"""
+import logging
+import weakref
+
+import numpy as np
+
+from package.api.trigram_index import factorize
+from package.api.utils import log_time_it, split_columns
+
+logger = logging.getLogger(__name__)
+
+HISTOGRAM_BINS = 20
+MAX_COMPLETIONS = 50  # values returned by a completion
+
+_registered = None  # Profiles of the data displayed, used by the planner of the filters
+
+
+def register_profiles(profiles):
+    """Sets the profiles used by the planner of the filters"""
+    global _registered
+    _registered = profiles
+
+
+def profiles_of(df):
+    """Returns the profiles registered if they have been computed on df, None otherwise"""
+    profiles = _registered
+    return profiles if profiles is not None and profiles.covers(df) else None
+
+
+class ColumnProfile:
+    """Profile of a column. values : its distinct values (not missing) sorted, case insensitively for a text column"""
+
+    def __init__(self, nb_rows, nb_nulls, values, counts=None, folded=None, histogram=None):
+        self.nb_rows = nb_rows
+        self.nb_nulls = nb_nulls
+        self.values = values
+        self.counts = counts  # nb of rows of each value, text columns only
+        self._folded = folded  # casefolded values, text columns only
+        self.histogram = histogram  # (counts, edges) of the values, numeric columns only
+
+    @property
+    def nb_distinct(self):
+        return len(self.values)
+
+    @property
+    def minimum(self):
+        return self.values[0] if len(self.values) else None
+
+    @property
+    def maximum(self):
+        return self.values[-1] if len(self.values) else None
+
+    @property
+    def is_text(self):
+        return self._folded is not None
+
+    def complete(self, prefix, nb=MAX_COMPLETIONS):
+        """Returns the first nb values starting with prefix (case insensitive), text columns only"""
+        start, stop = self._prefix_range(prefix)
+        return list(self.values[start:min(stop, start + nb)])
+
+    def ratio_equal(self, value):
+        """Ratio of the rows equal to value (case insensitive), text columns only"""
+        folded = value.casefold()
+        start = np.searchsorted(self._folded, folded, side="left")
+        stop = np.searchsorted(self._folded, folded, side="right")
+        return self.counts[start:stop].sum() / max(self.nb_rows, 1)
+
+    def ratio_startswith(self, prefix):
+        """Ratio of the rows starting with prefix (case insensitive), text columns only"""
+        start, stop = self._prefix_range(prefix)
+        return self.counts[start:stop].sum() / max(self.nb_rows, 1)
+
+    def ratio_below(self, value):
+        """Ratio of the rows lower than value, numeric columns only, interpolated from the histogram"""
+        if not len(self.values):
+            return 0.0
+        counts, edges = self.histogram
+        value = min(max(value, edges[0]), edges[-1])
+        i = min(np.searchsorted(edges, value, side="right") - 1, len(counts) - 1)
+        below = counts[:i].sum() + counts[i] * (value - edges[i]) / (edges[i + 1] - edges[i])
+        return float(below) / max(self.nb_rows, 1)
+
+    def ratio_value(self):
+        """Ratio of the rows equal to a value of the column, assuming the values are evenly distributed"""
+        return (self.nb_rows - self.nb_nulls) / max(self.nb_rows, 1) / max(self.nb_distinct, 1)
+
+    def _prefix_range(self, prefix):
+        """Positions of the first value starting with prefix (case insensitive) and after the last one"""
+        folded = prefix.casefold()
+        return (np.searchsorted(self._folded, folded, side="left"),
+                np.searchsorted(self._folded, folded + "\U0010ffff", side="left"))
+
+
+class Profiles:
+    """Profiles of the columns of a df"""
+
+    def __init__(self, df, columns):
+        self._df = weakref.ref(df)
+        self.columns = columns  # ColumnProfile by column
+
+    def covers(self, df):
+        """Returns True if the profiles have been computed on df"""
+        return self._df() is df
+
+    def get(self, column):
+        return self.columns.get(column)
+
+
+def _text_profile(series):
+    codes, uniques = factorize(series)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    values = np.asarray([str(value) for value in uniques], dtype=object)
+    present = (counts > 0) & (values != "")
+    values, counts = values[present], counts[present]
+    folded = np.asarray([value.casefold() for value in values], dtype=object)
+    order = np.argsort(folded, kind="stable")
+    return ColumnProfile(series.shape[0], int(series.shape[0] - counts.sum()), values[order], counts[order],
+                         folded[order])
+
+
+def _numeric_profile(series):
+    values = series.to_numpy(dtype=float, na_value=np.nan)
+    present = values[~np.isnan(values)]
+    histogram = np.histogram(present, bins=HISTOGRAM_BINS) if present.shape[0] else None
+    return ColumnProfile(series.shape[0], int(series.shape[0] - present.shape[0]), np.unique(present),
+                         histogram=histogram)
+
+
+@log_time_it
+def profile_columns(df, progress=None):
+    """Returns the Profiles of the numeric and text columns of df"""
+    numeric_columns, string_columns = split_columns(df)
+    columns = {}
+    for column in df.columns:
+        if progress:
+            progress.check()
+        if column in string_columns:
+            columns[column] = _text_profile(df[column])
+        elif column in numeric_columns:
+            columns[column] = _numeric_profile(df[column])
+    logger.debug(f"{len(columns)} columns profiled")
+    return Profiles(df, columns)
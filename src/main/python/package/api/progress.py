@@ -0,0 +1,116 @@
+"""Progress of a long operation (load, export ...), shared between the working threads and the UI"""
+import io
+import threading
+from time import perf_counter
+
+from package.api.compression import compression_of, decompressed
+from package.api.exceptions import OperationCancelledError
+
+REPORT_INTERVAL = 0.1  # min nb of seconds between two calls of the callback
+COMPRESSED_BUFFER_BYTES = 64 * 1024
+
+
+class Progress:
+    """Counts the bytes and rows processed. Cancelling it makes the next read raise OperationCancelledError"""
+
+    def __init__(self, callback=None, chunk_callback=None):
+        self._callback = callback  # called with the progress when it changes (throttled)
+        self._chunk_callback = chunk_callback  # called with each partial result (df)
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._last_report = 0
+        self._file_bytes = {}  # bytes read per file
+
+        self.bytes_total = 0
+        self.rows = 0
+        self.rows_total = 0  # if known in advance (export)
+        self.current_file = None
+
+    @property
+    def bytes_read(self):
+        return sum(self._file_bytes.values())
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def check(self):
+        """Raises OperationCancelledError if the operation has been cancelled"""
+        if self._cancelled.is_set():
+            raise OperationCancelledError("Opération annulée")
+
+    def start_file(self, file):
+        """A file is (re)starting to be read"""
+        with self._lock:
+            self.current_file = file
+            self._file_bytes[file] = 0
+        self._report(force=True)
+
+    def add_bytes(self, file, nb):
+        with self._lock:
+            self._file_bytes[file] = self._file_bytes.get(file, 0) + nb
+        self._report()
+
+    def add_chunk(self, chunk):
+        """Sends a partial result"""
+        if self._chunk_callback is not None:
+            self._chunk_callback(chunk)
+
+    def add_rows(self, nb):
+        with self._lock:
+            self.rows += nb
+        self._report()
+
+    def open(self, file):
+        """Opens a file in binary mode, decompressed if it is compressed. Its reads (of the compressed bytes) are
+        counted and stopped if the operation is cancelled"""
+        compression = compression_of(file)
+        # the decompressor reads by blocks, a big buffer would only read ahead more compressed bytes
+        buffer_size = COMPRESSED_BUFFER_BYTES if compression else 1 << 20
+        handle = io.BufferedReader(_ProgressReader(file, self), buffer_size=buffer_size)
+        return decompressed(handle, compression, name=file)
+
+    def _report(self, force=False):
+        if self._callback is None:
+            return
+        now = perf_counter()
+        with self._lock:
+            if not force and now - self._last_report < REPORT_INTERVAL:
+                return
+            self._last_report = now
+        self._callback(self)
+
+
+class _ProgressReader(io.RawIOBase):
+    """Raw file reporting its reads to a Progress"""
+
+    def __init__(self, file, progress):
+        super().__init__()
+        self._file = file
+        self._progress = progress
+        self._raw = open(file, "rb", buffering=0)
+
+    def close(self):
+        self._raw.close()
+        super().close()
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        self._progress.check()
+        nb = self._raw.readinto(buffer)
+        self._progress.add_bytes(self._file, nb or 0)
+        return nb
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._raw.seek(offset, whence)
+
+    def tell(self):
+        return self._raw.tell()
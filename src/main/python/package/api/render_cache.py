@@ -0,0 +1,49 @@
+from collections import OrderedDict
+
+from package.api.tracing import count
+
+
+class RenderCache:
+    """LRU cache of the display strings of the cells, by blocks of rows of a column. A missing block is rendered
+    with its neighbours (prefetch) in one vectorized call"""
+
+    def __init__(self, render, block_rows=64, max_blocks=5000, prefetch=1):
+        self._render = render  # render(start, stop, column) -> list of the display strings of the rows
+        self._block_rows = block_rows
+        self._max_blocks = max_blocks
+        self._prefetch = prefetch  # nb of blocks rendered before and after a missing one
+        self._blocks = OrderedDict()  # (block nb, column): display strings
+
+    def clear(self):
+        self._blocks.clear()
+
+    def get(self, row, column):
+        """Returns the display string of a cell"""
+        block, offset = divmod(row, self._block_rows)
+        values = self._blocks.get((block, column))
+        if values is None:
+            count("render cache misses")
+            values = self._load(block, column)
+        else:
+            count("render cache hits")
+            self._blocks.move_to_end((block, column))
+        return values[offset]
+
+    def _load(self, block, column):
+        """Renders a block and its neighbours not already in cache, returns the block"""
+        first = block
+        while first > 0 and block - first < self._prefetch and (first - 1, column) not in self._blocks:
+            first -= 1
+        last = block
+        while last - block < self._prefetch and (last + 1, column) not in self._blocks:
+            last += 1
+
+        values = self._render(first * self._block_rows, (last + 1) * self._block_rows, column)
+        for nb in range(first, last + 1):
+            start = (nb - first) * self._block_rows
+            if start < len(values) or nb == block:
+                self._blocks[(nb, column)] = values[start:start + self._block_rows]
+
+        while len(self._blocks) > self._max_blocks:
+            self._blocks.popitem(last=False)
+        return self._blocks[(block, column)]
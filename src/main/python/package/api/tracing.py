@@ -0,0 +1,173 @@
+"""Instrumentation of the long operations : nested spans (timed blocks of code), counters and peak memory. Nothing is
+recorded until tracing is enabled : a disabled span is a shared object doing nothing, a disabled counter a test.
+The spans can be exported to a Chrome trace (chrome://tracing, Perfetto)"""
+import collections
+import json
+import os
+import sys
+import threading
+from time import perf_counter
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MAX_SPANS = 100000  # last spans kept
+TRACE_ENV_VARIABLE = "CSV_TABLE_TRACE"  # enables tracing at startup if set to 1
+
+
+def memory_peak():
+    """Returns the peak resident memory of the process in bytes, None if it is unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Span:
+    """Timed block of code, recorded by the tracer when it ends"""
+    __slots__ = ("name", "args", "thread", "depth", "start", "duration", "memory_start", "memory_end", "_tracer")
+
+    def __init__(self, tracer, name, args):
+        self._tracer = tracer
+        self.name = name
+        self.args = args
+        self.thread = threading.get_ident()
+        self.depth = 0  # nb of spans of the thread it is nested in
+        self.start = None
+        self.duration = None
+        self.memory_start = None  # peak memory of the process when the span started and ended
+        self.memory_end = None
+
+    def __enter__(self):
+        self.depth = self._tracer.enter()
+        self.memory_start = memory_peak()
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.duration = perf_counter() - self.start
+        self.memory_end = memory_peak()
+        self._tracer.exit(self)
+        return False
+
+
+class _NullSpan:
+    """Span of a disabled tracer"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Records the spans and the counters of the process while it is enabled"""
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._local = threading.local()  # depth of the spans of each thread
+        self._origin = perf_counter()
+        self.spans = collections.deque(maxlen=MAX_SPANS)  # ended spans
+        self.counters = collections.Counter()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+            self.counters.clear()
+            self._origin = perf_counter()
+
+    def span(self, name, **args):
+        """Returns a span to use as a context manager, doing nothing if the tracer is disabled"""
+        return Span(self, name, args) if self.enabled else NULL_SPAN
+
+    def count(self, name, nb=1):
+        """Adds nb to a counter, if the tracer is enabled"""
+        if self.enabled:
+            with self._lock:
+                self.counters[name] += nb
+
+    def enter(self):
+        """A span of the current thread starts, returns its depth"""
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        return depth
+
+    def exit(self, span):
+        self._local.depth = span.depth
+        with self._lock:
+            self.spans.append(span)
+
+    def counter_values(self):
+        """Returns the values of the counters (dict)"""
+        with self._lock:
+            return dict(self.counters)
+
+    def summary(self):
+        """Returns the nb of calls, total and max duration of the spans by name, the longest first"""
+        stats = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            nb, total, longest = stats.get(span.name, (0, 0.0, 0.0))
+            stats[span.name] = (nb + 1, total + span.duration, max(longest, span.duration))
+        return sorted(((name, *values) for name, values in stats.items()), key=lambda stat: -stat[2])
+
+    def peak_memory(self):
+        """Returns the highest peak memory recorded by the spans, in bytes, None if unknown"""
+        with self._lock:
+            peaks = [span.memory_end for span in self.spans if span.memory_end is not None]
+        return max(peaks) if peaks else memory_peak()
+
+    def chrome_trace(self):
+        """Returns the spans and the counters in the Chrome trace event format (dict)"""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+            counters = dict(self.counters)
+            origin = self._origin
+
+        events = []
+        end = 0
+        for span in spans:
+            args = {key: str(value) for key, value in span.args.items()}
+            if span.memory_end is not None:
+                args["peak_memory_mb"] = round(span.memory_end / 1e6, 1)
+                args["peak_memory_growth_mb"] = round((span.memory_end - span.memory_start) / 1e6, 1)
+            start = (span.start - origin) * 1e6
+            end = max(end, start + span.duration * 1e6)
+            events.append({"name": span.name, "ph": "X", "ts": start, "dur": span.duration * 1e6, "pid": pid,
+                           "tid": span.thread, "args": args})
+        for name, value in counters.items():
+            events.append({"name": name, "ph": "C", "ts": end, "pid": pid, "args": {name: value}})
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"counters": counters, "peak_memory": self.peak_memory()}}
+
+    def export_chrome(self, path):
+        """Writes the Chrome trace to path (json)"""
+        with open(path, "w") as handle:
+            json.dump(self.chrome_trace(), handle)
+
+
+TRACER = Tracer()
+TRACER.enable(os.environ.get(TRACE_ENV_VARIABLE) == "1")
+
+
+def span(name, **args):
+    """Returns a span of the tracer, to use as a context manager : with span("parse", file=file): ..."""
+    return Span(TRACER, name, args) if TRACER.enabled else NULL_SPAN
+
+
+def count(name, nb=1):
+    """Adds nb to a counter of the tracer"""
+    if TRACER.enabled:
+        TRACER.count(name, nb)
@@ -0,0 +1,102 @@
+"""Trigram index of the text columns, to search a text in all of them without scanning their rows"""
+import logging
+import re
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from package.api.utils import log_time_it
+
+logger = logging.getLogger(__name__)
+
+CHECK_VALUES = 100000  # values indexed between two checks of the cancellation
+WILDCARDS = r"[*?.]"  # characters of a pattern matching any character
+REGEX_SYNTAX = r"[\\|()\[\]{}+^$]"  # patterns whose texts are not surely in the values matched
+
+
+def search_regex(pattern):
+    """Returns the regex (compiled) of a text searched in the values (lower case), where * is any text and ? an
+    optional character"""
+    return re.compile(pattern.lower().replace("*", ".*").replace("?", ".?"))
+
+
+def factorize(values):
+    """Returns the code of each row (int array, -1 for a missing value) and the distinct values of a text column"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    return pd.factorize(values)
+
+
+class TrigramIndex:
+    """Distinct values of the text columns of a df, and the inverted index of their trigrams. A search only checks
+    the values having all the trigrams of the text, then maps them to the rows by their codes"""
+
+    def __init__(self, df, columns, progress=None, trigrams=True):
+        self._df = df
+        self._codes = {}  # code of the value of each row, by column
+        self._first_ids = {}  # id of the first value of each column
+        values = []
+        for column in columns:
+            codes, uniques = factorize(df[column])
+            self._codes[column] = codes
+            self._first_ids[column] = len(values)
+            values.extend(str(value).lower() for value in uniques)
+        self._values = values  # distinct values of all the columns, in lower case
+
+        # ids of the values containing each trigram (sorted int array), None : not built
+        self._postings = self._build_postings(values, progress) if trigrams else None
+
+    def covers(self, df):
+        """Returns True if the index has been built on df"""
+        return df is self._df
+
+    def mask(self, pattern):
+        """Returns the mask (numpy bool array) of the rows having a value of the indexed columns containing the
+        pattern"""
+        regex = search_regex(pattern)
+        ids = [i for i in self._candidates(pattern) if regex.search(self._values[i])]
+        return self._rows(np.asarray(ids, dtype=np.int64))
+
+    def _candidates(self, pattern):
+        """Returns the ids of the values having all the trigrams of the parts of the pattern without wildcard, all of
+        them if the pattern has another regex syntax"""
+        if self._postings is None or re.search(REGEX_SYNTAX, pattern):
+            return range(len(self._values))
+        trigrams = {part[i:i + 3] for part in re.split(WILDCARDS, pattern.lower()) for i in range(len(part) - 2)}
+        if not trigrams:
+            return range(len(self._values))
+
+        postings = sorted((self._postings.get(trigram, np.empty(0, dtype=np.int64)) for trigram in trigrams),
+                          key=len)
+        ids = postings[0]
+        for other in postings[1:]:
+            if not ids.shape[0]:
+                break
+            ids = np.intersect1d(ids, other, assume_unique=True)
+        return ids
+
+    def _rows(self, ids):
+        """Returns the mask of the rows having one of the values"""
+        mask = np.zeros(self._df.shape[0], dtype=bool)
+        ends = list(self._first_ids.values())[1:] + [len(self._values)]
+        for (column, codes), first_id, end in zip(self._codes.items(), self._first_ids.values(), ends):
+            column_ids = ids[(ids >= first_id) & (ids < end)] - first_id
+            if column_ids.shape[0]:
+                hits = np.zeros(end - first_id + 1, dtype=bool)  # last one for the code -1
+                hits[column_ids] = True
+                mask |= hits[codes]
+        return mask
+
+    @staticmethod
+    @log_time_it
+    def _build_postings(values, progress=None):
+        """Returns the ids of the values containing each trigram"""
+        postings = defaultdict(list)
+        for i, value in enumerate(values):
+            if progress and not i % CHECK_VALUES:
+                progress.check()
+            for trigram in {value[j:j + 3] for j in range(len(value) - 2)}:
+                postings[trigram].append(i)
+        logger.debug(f"{len(postings)} trigrams indexed for {len(values)} values")
+        return {trigram: np.asarray(ids, dtype=np.int64) for trigram, ids in postings.items()}
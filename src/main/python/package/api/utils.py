@@ -1,15 +1,41 @@
 from time import perf_counter
 
+import functools
 import logging
 
+import pandas as pd
+from pandas.api.types import is_numeric_dtype, is_string_dtype
+
+from package.api.tracing import span
+
 logger = logging.getLogger(__name__)
 
 
 def log_time_it(func):
+    """Logs the run time of func, and the nb of rows per second if it returns a DataFrame. Each call is a span of
+    the tracer when tracing is enabled"""
+    @functools.wraps(func)
     def timed(*args, **kw):
         t0 = perf_counter()
-        res = func(*args, **kw)
+        with span(func.__qualname__):
+            res = func(*args, **kw)
         t1 = perf_counter()
-        logger.info(f"{func.__name__} run in {round(t1-t0, 5)}")
+        msg = f"{func.__qualname__} run in {round(t1-t0, 5)}"
+        shape = getattr(res, "shape", None)
+        if shape and t1 > t0:
+            msg += f" ({shape[0]} rows, {round(shape[0] / (t1-t0))} rows/s)"
+        logger.info(msg)
         return res
     return timed
+
+
+def split_columns(df):
+    """Returns the sets of the numeric columns and of the string columns of a df. Categorical columns are text"""
+    numeric_columns = set()
+    string_columns = set()
+    for col, dtype in zip(df.columns, df.dtypes):
+        if isinstance(dtype, pd.CategoricalDtype) or is_string_dtype(dtype):
+            string_columns.add(col)
+        elif is_numeric_dtype(dtype):
+            numeric_columns.add(col)
+    return numeric_columns, string_columns
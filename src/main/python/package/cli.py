@@ -0,0 +1,198 @@
+"""Filtering of csv files from the command line, without the GUI (PySide2 is not imported) : the files are read by
+chunks with the config presets, and the rows kept by the filters are written to a file or to stdout, e.g.
+python -m package.cli data/*.csv -f "Col1 > 10 and Col2 : java*" -c Col1,Col2 -o result.csv"""
+import argparse
+import logging
+import os
+import pathlib
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from package.api.compression import extension_of
+from package.api.config import Config
+from package.api.csv_set import CsvSet
+from package.api.exceptions import CsvReadError, FilterInvalidError
+from package.api.expression import parse_filter
+from package.api.utils import split_columns
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_ENCODING = "utf-8"
+
+
+class BatchFilter:
+    """Filters csv files chunk by chunk with the syntax of the filters of the GUI, and writes the rows kept"""
+
+    def __init__(self, filters=(), columns=None, preset=None, max_lines=None, separator=None):
+        self._text = " and ".join(f"({text})" for text in filters)  # all the filters must be true
+        self._columns = columns  # columns written, all of them if None (list)
+        self._preset = preset  # extension of the config preset, the one of each file if None
+        self._max_lines = max_lines  # max of rows read per file
+        self._separator = separator  # separator of the output, the one of the preset if None
+
+        self._config = Config()
+        self._csv_set = CsvSet(config=self._config)
+
+    def run(self, files, output, jobs=1):
+        """Writes the rows of the files kept by the filters to output (text stream), with one header. The files are
+        filtered in jobs processes. Returns the nb of rows read and written"""
+        for file in files:
+            if not pathlib.Path(file).is_file():
+                raise CsvReadError(f"The file {file} does not exist")
+
+        if jobs <= 1 or len(files) == 1:
+            return self._write((chunk for file in files for chunk in self.filtered_chunks(file)), output)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            parts = [pathlib.Path(tmp_dir) / f"{i}.csv" for i in range(len(files))]
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                counts = list(executor.map(self._filter_part, files, parts))
+            self._merge(parts, output)
+        return sum(read for read, _ in counts), sum(written for _, written in counts)
+
+    def filtered_chunks(self, file):
+        """Yields the nb of rows of each chunk of a file and the rows of the chunk kept by the filters, with the
+        columns written"""
+        extension = self._preset or extension_of(file)
+        if extension != self._config.csv_extension:
+            self._config.load_csv_config(extension)
+
+        predicate = columns = dtypes = None
+        position = 0  # of the chunk in the file
+        for chunk in self._csv_set.iter_chunks(file, nrows=self._max_lines):
+            if columns is None:
+                # the columns and their types are the ones of the first chunk
+                predicate = self._predicate(chunk)
+                columns = self._projection(file, chunk)
+                dtypes = chunk.dtypes
+            texts = self._conformed(chunk, dtypes, position) if position and predicate is not None else {}
+            nb_rows = chunk.shape[0]
+            position += nb_rows
+            if predicate is not None:
+                try:
+                    chunk = chunk[predicate.mask(chunk)]
+                except TypeError:
+                    # a numeric filter on a column with a text after the first chunk
+                    raise FilterInvalidError(f"Colonne non numérique dans {file} : " + ", ".join(
+                        f"{column} ({text})" for column, text in texts.items()))
+            yield nb_rows, chunk[columns]
+
+    def _write(self, chunks, output):
+        """Writes the chunks to output (text stream), with a header before the first one. Returns the nb of rows read
+        and written"""
+        nb_read = nb_written = 0
+        header = True
+        for nb_rows, chunk in chunks:
+            chunk.to_csv(output, sep=self._separator or self._config.m_separator, index=False, header=header,
+                         lineterminator="\n")
+            header = False
+            nb_read += nb_rows
+            nb_written += chunk.shape[0]
+        logger.info(f"{nb_written} / {nb_read} rows written")
+        return nb_read, nb_written
+
+    def _filter_part(self, file, part):
+        """Filters a file to a part of the output, in a worker process"""
+        with open(part, "w", newline="", encoding=OUTPUT_ENCODING) as output:
+            return self._write(self.filtered_chunks(file), output)
+
+    @staticmethod
+    def _merge(parts, output):
+        """Writes the parts to output, with the header of the first one only"""
+        header_written = False
+        for part in parts:
+            with open(part, "r", newline="", encoding=OUTPUT_ENCODING) as handle:
+                if header_written:
+                    handle.readline()
+                elif part.stat().st_size:
+                    header_written = True
+                shutil.copyfileobj(handle, output)
+
+    def _predicate(self, chunk):
+        """Returns the predicate of the filters for the columns of the chunk, None if there is no filter"""
+        if not self._text:
+            return None
+        numeric_columns, string_columns = split_columns(chunk)
+        predicate, _ = parse_filter(self._text, list(chunk.columns), numeric_columns, string_columns)
+        return predicate
+
+    @staticmethod
+    def _conformed(chunk, dtypes, position):
+        """Casts the columns of the chunk to the types of the first chunk of the file, the ones of the predicate : text
+        columns to text, numeric columns to numbers. Returns the texts found in numeric columns, left as they are
+        (description of the first one by column)"""
+        texts = {}
+        for column, dtype in dtypes.items():
+            values = chunk[column]
+            if values.dtype == dtype:
+                continue
+            if not is_numeric_dtype(dtype):
+                chunk[column] = values.astype(str).where(values.notna(), "")
+                continue
+            numbers = pd.to_numeric(values, errors="coerce")
+            invalid = (numbers.isna() & values.notna() & (values != "")).to_numpy()
+            if invalid.any():
+                row = invalid.argmax()
+                texts[column] = f"{values.iloc[row]} ligne {position + row + 1}"
+            else:
+                chunk[column] = numbers
+        return texts
+
+    def _projection(self, file, chunk):
+        """Returns the columns of the chunk written"""
+        if not self._columns:
+            return list(chunk.columns)
+        for column in self._columns:
+            if column not in chunk.columns:
+                raise FilterInvalidError(f"{column} n'est pas une colonne de {file}")
+        return self._columns
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m package.cli",
+                                     description="Filtre des fichiers csv et écrit les lignes gardées, sans interface")
+    parser.add_argument("files", nargs="+", help="fichiers csv")
+    parser.add_argument("-f", "--filter", action="append", default=[],
+                        help="filtre, avec la syntaxe de la barre de filtre (répétable : tous doivent être vrais)")
+    parser.add_argument("-c", "--columns", help="colonnes écrites, séparées par des virgules (toutes par défaut)")
+    parser.add_argument("-p", "--preset",
+                        help="extension du paramétrage utilisé (config_<preset>.yaml), celle du fichier par défaut")
+    parser.add_argument("-n", "--max-lines", type=int, help="nombre max de lignes lues par fichier")
+    parser.add_argument("-s", "--separator", help="séparateur du résultat, celui du paramétrage par défaut")
+    parser.add_argument("-o", "--output", help="fichier résultat, la sortie standard par défaut")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="nombre de fichiers filtrés en parallèle")
+    parser.add_argument("-v", "--verbose", action="store_true", help="affiche le détail du traitement")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(name)s\t%(levelname)s\t%(message)s")
+
+    batch = BatchFilter(filters=args.filter, columns=args.columns.split(",") if args.columns else None,
+                        preset=args.preset, max_lines=args.max_lines, separator=args.separator)
+    output = open(args.output, "w", newline="", encoding=OUTPUT_ENCODING) if args.output else sys.stdout
+    try:
+        batch.run(args.files, output, jobs=args.jobs)
+    except (CsvReadError, FilterInvalidError) as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # stdout closed by the reader (head ...) : nothing more to write
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if args.output:
+            output.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import logging
+
+from PySide2 import QtWidgets, QtCore
+
+from package.api.tracing import TRACER
+
+logger = logging.getLogger(__name__)
+
+STR_ENABLE = "Activer le traçage"
+STR_CLEAR = "Effacer"
+STR_EXPORT = "Exporter la trace Chrome"
+STR_SPAN_HEADERS = ["Opération", "Nb", "Total (ms)", "Max (ms)"]
+STR_COUNTER_HEADERS = ["Compteur", "Valeur"]
+
+REFRESH_INTERVAL = 1000  # ms between two refreshes while the panel is visible
+
+
+class DebugPanel(QtWidgets.QWidget):
+    """Spans, counters and peak memory recorded by the tracer"""
+
+    def __init__(self, tracer=TRACER, parent=None):
+        super().__init__(parent)
+        self._tracer = tracer
+        self._timer = QtCore.QTimer(self)
+
+        # create widgets
+        self._enable_cb = QtWidgets.QCheckBox(STR_ENABLE)
+        self._clear_btn = QtWidgets.QPushButton(STR_CLEAR)
+        self._export_btn = QtWidgets.QPushButton(STR_EXPORT)
+        self._memory_lbl = QtWidgets.QLabel()
+        self._spans_table = QtWidgets.QTableWidget(0, len(STR_SPAN_HEADERS))
+        self._counters_table = QtWidgets.QTableWidget(0, len(STR_COUNTER_HEADERS))
+
+        # create layouts
+        self._main_layout = QtWidgets.QVBoxLayout(self)
+        self._buttons_layout = QtWidgets.QHBoxLayout()
+
+        # modify widgets
+        for table, headers in ((self._spans_table, STR_SPAN_HEADERS), (self._counters_table, STR_COUNTER_HEADERS)):
+            table.setHorizontalHeaderLabels(headers)
+            table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+            table.verticalHeader().hide()
+            table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeToContents)
+        self._enable_cb.setChecked(self._tracer.enabled)
+        self._timer.setInterval(REFRESH_INTERVAL)
+
+        # add widgets to layouts
+        self._buttons_layout.addWidget(self._enable_cb)
+        self._buttons_layout.addWidget(self._clear_btn)
+        self._buttons_layout.addWidget(self._export_btn)
+        self._main_layout.addLayout(self._buttons_layout)
+        self._main_layout.addWidget(self._memory_lbl)
+        self._main_layout.addWidget(self._spans_table, stretch=3)
+        self._main_layout.addWidget(self._counters_table, stretch=1)
+
+        # set connections
+        self._enable_cb.toggled.connect(self._tracer.enable)
+        self._clear_btn.clicked.connect(self._clear)
+        self._export_btn.clicked.connect(self._export)
+        self._timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self.refresh()
+        self._timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        """Displays what the tracer has recorded"""
+        memory = self._tracer.peak_memory()
+        self._memory_lbl.setText(f"Mémoire max : {memory // 1000000} Mo" if memory else "Mémoire max : inconnue")
+
+        summary = self._tracer.summary()
+        self._spans_table.setRowCount(len(summary))
+        for row, (name, nb, total, longest) in enumerate(summary):
+            for col, value in enumerate((name, nb, f"{total * 1000:.1f}", f"{longest * 1000:.1f}")):
+                self._spans_table.setItem(row, col, QtWidgets.QTableWidgetItem(str(value)))
+
+        counters = sorted(self._tracer.counter_values().items())
+        self._counters_table.setRowCount(len(counters))
+        for row, (name, value) in enumerate(counters):
+            self._counters_table.setItem(row, 0, QtWidgets.QTableWidgetItem(name))
+            self._counters_table.setItem(row, 1, QtWidgets.QTableWidgetItem(str(value)))
+
+    def _clear(self):
+        self._tracer.clear()
+        self.refresh()
+
+    def _export(self):
+        """Writes the spans to a Chrome trace file (chrome://tracing, Perfetto)"""
+        path_str, _ = QtWidgets.QFileDialog.getSaveFileName(self, STR_EXPORT, "trace.json", "Json (*.json)")
+        if not path_str:
+            return
+        try:
+            self._tracer.export_chrome(path_str)
+        except OSError as e:
+            QtWidgets.QMessageBox.warning(self, "Erreur", f"Export impossible : {e}")
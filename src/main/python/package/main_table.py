@@ -1,17 +1,34 @@
+from collections import OrderedDict
+
 from PySide2 import QtCore, QtGui
 
-from pandas.api.types import is_numeric_dtype, is_string_dtype
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_string_dtype
 
-from package.api.utils import log_time_it
+from package.api.aggregates import Aggregator
+from package.api.dtypes import unify_text_columns
+from package.api.render_cache import RenderCache
+from package.api.tracing import count, span
+from package.api.utils import log_time_it, split_columns
 
 COLOR_HIGHLIGHT = QtGui.QColor(245, 217, 188)
 
+FETCH_ROWS = 5000  # rows added to the view each time it scrolls to the bottom, when streaming
+BLOCK_ROWS = 1000  # rows parsed at once by the virtual model
+MAX_BLOCKS = 50  # blocks of rows kept in memory by the virtual model
+MAX_SORT_PERMUTATIONS = 8  # sort orders kept in memory
+
 
 class MainTableModel(QtCore.QAbstractTableModel):
 
     @property
     def df(self):
-        return self._df
+        """Rows displayed. The whole data itself when all the rows are displayed : it is shared, never modify it"""
+        self._concat_pending()
+        if self._rows is None:
+            return self._df
+        return self._df.iloc[self._rows]
 
     @property
     def df_columns(self):
@@ -21,30 +38,45 @@ class MainTableModel(QtCore.QAbstractTableModel):
     def hits(self):
         return self._hits
 
-    def __init__(self, df, filter_manager, parent=None):
+    @property
+    def streaming(self):
+        return self._nb_fetched is not None
+
+    def __init__(self, df, filter_manager, parent=None, streaming=False):
         super().__init__(parent)
 
         self._filter_manager = filter_manager
 
-        self._original_df = df
-        self._df = df
+        self._df = df  # whole data, never modified
+        self._pending = []  # chunks streamed after the rows of df, concatenated to it once they are fetched
+        self._nb_pending = 0  # nb of rows of the pending chunks
+        self._rows = None  # positions in df of the rows displayed, in order (numpy array). None : all of them
+        self._mask = None  # rows kept by the enabled filters (numpy bool array). None : all of them
+        self._sort_key = None  # (column, ascending) of the current sort
+        self._sort_permutations = OrderedDict()  # positions in df of all the rows sorted, by sort key
+
+        # display strings of the cells, rendered by blocks from the values of the columns
+        self._render_cache = RenderCache(self._render)
+        self._column_values = {}
+
+        # nb of rows shown to the view when streaming (the view asks for more with fetchMore), None otherwise
+        self._nb_fetched = min(df.shape[0], FETCH_ROWS) if streaming else None
 
         self._nb_total_lines = df.shape[0]
         self._update_hits()
 
         self.columns = list(df.columns)
-        self.column_highlights = None
-
-        self.numeric_columns = {col for col, dtype in zip(self.columns, df.dtypes) if is_numeric_dtype(dtype)}
-        self.string_columns = {col for col, dtype in zip(self.columns, df.dtypes) if is_string_dtype(dtype)}
-
-        # Filter details. Dict "btn text": ("enabled", "field", "query)
-        self._filters = {}
+        self.column_highlights = [False] * len(self.columns)
 
-        # self._np = np.array(df.values)
+        self.numeric_columns, self.string_columns = split_columns(df)
+        self.text_index = None  # TrigramIndex of the text columns, built in the background
+        self.profiles = None  # Profiles of the columns, computed in the background
+        self._aggregator = None  # Aggregator of the rows kept by the filters, created by the first summary
 
     def rowCount(self, parent=None):
-        return self._df.shape[0]
+        if self._nb_fetched is not None:
+            return min(self._nb_rows(), self._nb_fetched)
+        return self._nb_rows()
 
     def columnCount(self, parent=None):
         return self._df.shape[1]
@@ -55,49 +87,186 @@ class MainTableModel(QtCore.QAbstractTableModel):
                 return str(self._df.columns[section])
 
             if orientation == QtCore.Qt.Vertical:
-                return str(self._df.index[section])
+                return str(self._df.index[section if self._rows is None else self._rows[section]])
 
     def data(self, index, role=QtCore.Qt.DisplayRole):
         if not index.isValid():
             return None
 
         if role == QtCore.Qt.DisplayRole:
-            value = self._df.iloc[index.row(), index.column()]
-            # value = self._np[index.row(), index.column()]
-            return str(value)
+            return self._render_cache.get(index.row(), index.column())
 
         if role == QtCore.Qt.BackgroundRole:
             if self.column_highlights[index.column()]:
                 return QtGui.QBrush(COLOR_HIGHLIGHT)
 
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return self._nb_fetched is not None and self._nb_fetched < self._nb_rows()
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        nb_new = min(FETCH_ROWS, self._nb_rows() - self._nb_fetched)
+        if nb_new <= 0:
+            return
+        if self._nb_fetched + nb_new > self._df.shape[0]:
+            self._concat_pending()
+        self.beginInsertRows(QtCore.QModelIndex(), self._nb_fetched, self._nb_fetched + nb_new - 1)
+        self._nb_fetched += nb_new
+        self.endInsertRows()
+
     def flags(self, index):
         return QtCore.Qt.ItemIsEnabled
 
     def sort(self, column, order=QtCore.Qt.SortOrder.AscendingOrder):
-        if not self._df.empty:
-            colname = self._df.columns.tolist()[column]
+        if self.streaming:
+            # the rows still to come could not be sorted
+            return
+        if self._nb_rows():
             self.layoutAboutToBeChanged.emit()
-            self._df.sort_values(colname, ascending=order == QtCore.Qt.AscendingOrder, inplace=True)
-            # self._df.reset_index(inplace=True, drop=True)
+            self._sort_key = (column, order == QtCore.Qt.AscendingOrder)
+            self._update_rows()
         self.layoutChanged.emit()
 
-    def add_query(self, query):
-        """Add a query to the current filtered df"""
+    def append_rows(self, df):
+        """Appends the rows of a chunk being streamed, the view gets them with fetchMore. The chunks are only
+        concatenated to the data when their rows are fetched, not once per chunk"""
+        self._nb_fetched = min(self._nb_fetched, self._nb_rows())
+        # the columns that are not in the first chunk (other files) are displayed once all the files are read
+        self._pending.append(df.reindex(columns=self._df.columns))
+        self._nb_pending += df.shape[0]
+        self._nb_total_lines = self._df.shape[0] + self._nb_pending
+        self._update_hits()
+        if self._nb_fetched < FETCH_ROWS:
+            self.fetchMore()
+
+    def _concat_pending(self):
+        """Concatenates the pending chunks to the data"""
+        if not self._pending:
+            return
+        df = pd.concat([self._df] + self._pending, ignore_index=True, sort=False)
+        self._pending = []
+        self._nb_pending = 0
+        # chunks where a column is numeric and others where it is text
+        unify_text_columns(df)
+        self.numeric_columns, self.string_columns = split_columns(df)
+        self._df = df.fillna({column: "" for column in self.string_columns})
+        self._sort_permutations.clear()
+        self._aggregator = None
+        self._clear_render_cache()
+
+    def rows_appended(self, df):
+        """Updates the data with rows appended at its end (df : whole new data), keeping the sort and the filters.
+        Only the new rows are filtered"""
+        start = self._df.shape[0]
+        nb_displayed = self._nb_rows()
+        self._df = df
+        self._sort_permutations.clear()
+        self._aggregator = None
+        self._clear_render_cache()
+        self._nb_total_lines = df.shape[0]
+        self.numeric_columns, self.string_columns = split_columns(df)
+
+        self._filter_manager.extend_masks(df.iloc[start:])
+        if self._mask is not None:
+            new_mask = np.logical_and.reduce([mask[start:] for mask in self._filter_manager.enabled_masks])
+            self._mask = np.concatenate([self._mask, new_mask])
+
+        if self._sort_key is None:
+            new_rows = np.arange(start, df.shape[0]) if self._mask is None else start + np.flatnonzero(
+                self._mask[start:])
+            if new_rows.shape[0]:
+                self.beginInsertRows(QtCore.QModelIndex(), nb_displayed, nb_displayed + new_rows.shape[0] - 1)
+                if self._rows is not None:
+                    self._rows = np.concatenate([self._rows, new_rows])
+                self.endInsertRows()
+        else:
+            # the new rows are inserted among the others
+            self.layoutAboutToBeChanged.emit()
+            self._update_rows()
+            self.layoutChanged.emit()
+        self._update_hits()
+
+    def compute_mask(self, predicate):
+        """Returns the mask of the rows of the whole data kept by a predicate"""
+        with span("filter mask", columns=sorted(map(str, predicate.columns))):
+            return predicate.mask(self._df)
+
+    def add_mask(self, mask):
+        """Keeps only the rows displayed that are in the mask (numpy bool array over the whole data)"""
         self.layoutAboutToBeChanged.emit()
-        self._df = self._df.query(query).copy()
+        self._mask = mask if self._mask is None else self._mask & mask
+        self._update_rows()
         self.layoutChanged.emit()
         self._update_hits()
 
     def reset_filtering(self):
         """Refilters the data with the current active filters"""
         self.layoutAboutToBeChanged.emit()
-        self._df = self._original_df
-        queries_list = self._filter_manager.enabled_queries
-        if queries_list:
-            self._df = self._df.query(" & ".join(queries_list)).copy()
+        masks = self._filter_manager.enabled_masks
+        self._mask = np.logical_and.reduce(masks) if masks else None
+        self._update_rows()
         self.layoutChanged.emit()
         self._update_hits()
 
+    def view(self):
+        """Returns the whole data, the positions of the rows displayed in their order (None : all of them) and the
+        columns displayed. They are replaced, never modified, when the view changes"""
+        self._concat_pending()
+        return self._df, self._rows, list(self.columns)
+
+    def summary(self, group_column=None):
+        """Returns the Summary of the rows kept by the filters, with the nb of rows by value of group_column"""
+        if self._aggregator is None or self._aggregator.group_column != group_column:
+            columns = [column for column in self.columns if column in self.numeric_columns]
+            self._aggregator = Aggregator(self._df, columns, group_column)
+        return self._aggregator.summary(self._mask)
+
+    def _clear_render_cache(self):
+        """Forgets the display strings, when the data changes"""
+        self._render_cache.clear()
+        self._column_values = {}
+
+    def _sort_permutation(self):
+        """Returns the positions of all the rows sorted by the current sort key, computed once per key"""
+        permutation = self._sort_permutations.get(self._sort_key)
+        if permutation is None:
+            column, ascending = self._sort_key
+            with span("sort", column=self.columns[column]):
+                permutation = self._df.iloc[:, column].reset_index(drop=True).sort_values(
+                    ascending=ascending, kind="mergesort").index.to_numpy()
+            self._sort_permutations[self._sort_key] = permutation
+            if len(self._sort_permutations) > MAX_SORT_PERMUTATIONS:
+                self._sort_permutations.popitem(last=False)
+        else:
+            self._sort_permutations.move_to_end(self._sort_key)
+        return permutation
+
+    def _update_rows(self):
+        """Updates the rows displayed from the filters mask and the sort permutation"""
+        if self._sort_key is None:
+            self._rows = None if self._mask is None else np.flatnonzero(self._mask)
+        else:
+            permutation = self._sort_permutation()
+            self._rows = permutation if self._mask is None else permutation[self._mask[permutation]]
+        self._render_cache.clear()
+
+    def _nb_rows(self):
+        """Nb of rows displayed"""
+        return self._df.shape[0] + self._nb_pending if self._rows is None else self._rows.shape[0]
+
+    def _render(self, start, stop, column):
+        """Returns the display strings of the rows [start, stop[ of a column"""
+        values = self._column_values.get(column)
+        if values is None:
+            # array of the column : numpy, or extension array (categorical : only the codes of the rows rendered are
+            # decoded, nullable integers : rendered as integers)
+            series = self._df.iloc[:, column]
+            values = series.to_numpy() if isinstance(series.dtype, np.dtype) else series.array
+            self._column_values[column] = values
+        rows = slice(start, stop) if self._rows is None else self._rows[start:stop]
+        rendered = np.asarray(values[rows].astype(str)).tolist()
+        count("cells rendered", len(rendered))
+        return rendered
+
     def update_highlights(self, added_col=False):
         if added_col:
             self.column_highlights[self.columns.index(added_col)] = True
@@ -107,8 +276,98 @@ class MainTableModel(QtCore.QAbstractTableModel):
 
     def _update_hits(self):
         """Updates the number of hits with the current active filters"""
-        nb_filtered = self._df.shape[0]
+        nb_filtered = self._nb_rows()
         if nb_filtered == self._nb_total_lines:
             self._hits = f"{nb_filtered} lignes"
         else:
             self._hits = f"{nb_filtered} / {self._nb_total_lines} lignes"
+
+
+class VirtualTableModel(QtCore.QAbstractTableModel):
+    """Model of a file read on demand : only the blocks of rows displayed are parsed. Cannot be sorted nor filtered"""
+
+    @property
+    def df(self):
+        return None
+
+    @property
+    def df_columns(self):
+        return self.columns
+
+    @property
+    def hits(self):
+        return f"{len(self._line_index)} lignes"
+
+    def __init__(self, line_index, filter_manager, parent=None):
+        super().__init__(parent)
+
+        self._filter_manager = filter_manager
+        self._line_index = line_index
+        self._blocks = OrderedDict()  # display values of the last blocks of rows read, by block nb
+
+        self.columns = list(line_index.columns)
+        self.column_highlights = [False] * len(self.columns)
+        self.numeric_columns = set()
+        self.string_columns = set()
+        self.text_index = None
+        self.profiles = None
+
+    def rowCount(self, parent=None):
+        return len(self._line_index)
+
+    def columnCount(self, parent=None):
+        return len(self.columns)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole:
+            if orientation == QtCore.Qt.Horizontal:
+                return str(self.columns[section])
+
+            if orientation == QtCore.Qt.Vertical:
+                return str(section)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        if role == QtCore.Qt.DisplayRole:
+            values = self._block(index.row() // BLOCK_ROWS)
+            row = index.row() % BLOCK_ROWS
+            # a block can be shorter than expected if a quoted value contains a new line
+            return str(values[row, index.column()]) if row < values.shape[0] else ""
+
+        if role == QtCore.Qt.BackgroundRole:
+            if self.column_highlights[index.column()]:
+                return QtGui.QBrush(COLOR_HIGHLIGHT)
+
+    def flags(self, index):
+        return QtCore.Qt.ItemIsEnabled
+
+    def sort(self, column, order=QtCore.Qt.SortOrder.AscendingOrder):
+        pass
+
+    def reset_filtering(self):
+        pass
+
+    def summary(self, group_column=None):
+        return None
+
+    def update_highlights(self, added_col=False):
+        filtered = self._filter_manager.filtered_columns
+        self.column_highlights = [col in filtered for col in self.columns]
+
+    def _block(self, nb):
+        """Returns the values of a block of rows, parsing it if it is not in memory"""
+        values = self._blocks.get(nb)
+        if values is not None:
+            self._blocks.move_to_end(nb)
+            return values
+
+        df = self._line_index.read_rows(nb * BLOCK_ROWS, (nb + 1) * BLOCK_ROWS).reindex(columns=self.columns)
+        df = df.fillna({col: "" for col, dtype in zip(df.columns, df.dtypes) if is_string_dtype(dtype)})
+        values = df.to_numpy(dtype=object)
+
+        self._blocks[nb] = values
+        if len(self._blocks) > MAX_BLOCKS:
+            self._blocks.popitem(last=False)
+        return values
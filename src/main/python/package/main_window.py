@@ -1,3 +1,4 @@
+import re
 import pathlib
 import logging
 
@@ -5,19 +6,15 @@ from PySide2 import QtWidgets, QtCore, QtGui, QtSvg
 from PySide2.QtCore import Slot
 
 import package.api.logger
-from package.about import show_about
-from package.settings_editor import SettingsEditor
-from package.column_selector import ColumnSelector
-from package.main_table import MainTableModel
-from package.api.csv_set import CsvSet
+from package.summary_panel import SummaryPanel
+from package.debug_panel import DebugPanel
+from package.preload import preload
+from package.workers import Worker
 from package.api.config import Config
-from package.api.filtering import FilterManager
-from package.api.exceptions import FilterInvalidError, CustomError
+from package.api.exceptions import CsvReadError, ExportError, FilterInvalidError, CustomError
 
-try:
-    from package.custom import Custom
-except ModuleNotFoundError:
-    from package.custom_example import Custom
+# the modules using pandas, the dialogs and the custom actions are imported where they are used, the slow ones are
+# preloaded once the window is displayed
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +23,19 @@ STR_WINDOW_TITLE = "CSV Table"
 STR_TB_ACTION_OPEN = "Ouvrir un fichier"
 STR_TB_ACTION_EDIT_SETTINGS = "Paramètres"
 STR_TB_ACTION_SHOW_ABOUT = "Legal"
+STR_LOADING = "Chargement ..."
+STR_LOADING_CANCELLED = "Chargement annulé"
+STR_CANCEL = "Annuler"
+STR_EXPORTING = "Export ..."
+STR_EXPORT_CANCELLED = "Export annulé"
+STR_EXPORT_FILTERS = "Csv (*.csv);;Parquet (*.parquet);;Feather (*.feather)"
+STR_SUMMARY = "Résumé"
+STR_DEBUG = "Débogage"
+STR_FILTER_PLACEHOLDER = "colonne : valeur, ou * : texte à chercher dans toutes les colonnes"
+
+VALUE_OPERATOR_REGEX = re.compile(r"\s*(.+?)\s*[:=]\s*")  # column and operator of a condition on text values
+FOLLOW_INTERVAL = 1000  # ms between two checks of the lines appended to the files, when following them
+PRELOAD_DELAY = 200  # ms after the window is displayed before the slow modules are imported in the background
 
 
 class LogoWidget(QtSvg.QSvgWidget):
@@ -51,16 +61,23 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.ctx = ctx
 
-        self._ICON_OPEN = QtGui.QIcon(QtGui.QPixmap(ctx.get_resource("document.svg")))
-        self._ICON_SAVE = QtGui.QIcon(QtGui.QPixmap(ctx.get_resource("save.svg")))
-        self._ICON_ABOUT = QtGui.QIcon(QtGui.QPixmap(ctx.get_resource("question.svg")))
+        # icons created from their file are only loaded when they are painted
+        self._ICON_OPEN = QtGui.QIcon(ctx.get_resource("document.svg"))
+        self._ICON_SAVE = QtGui.QIcon(ctx.get_resource("save.svg"))
+        self._ICON_ABOUT = QtGui.QIcon(ctx.get_resource("question.svg"))
 
         self._config = Config()
-        self._csv_set = CsvSet(config=self._config)
-        self._filter_manager = FilterManager(icon_on=QtGui.QIcon(QtGui.QPixmap(self.ctx.get_resource("dot_on.svg"))),
-                                             icon_off=QtGui.QIcon(QtGui.QPixmap(self.ctx.get_resource("dot_off.svg"))))
+        self._lazy_csv_set = None  # see _csv_set
+        self._lazy_filter_manager = None  # see _filter_manager
         self._table_model = None
+        self._streaming_model = None  # model displaying the rows as they are read, when streaming
         self._completer = None
+        self._loader = None  # worker reading the files
+        self._next_read = None  # (files,) read once the cancelled loader has stopped, see _read_files
+        self._indexer = None  # worker building the trigram index of the text columns
+        self._profiler = None  # worker computing the profiles of the columns
+        self._exporter = None  # worker exporting the rows displayed
+        self._export_path = None  # file of the last export
         self._timer = QtCore.QTimer()
 
         # create widgets
@@ -75,6 +92,11 @@ class MainWindow(QtWidgets.QMainWindow):
         self._pop_menu = QtWidgets.QMenu(self)
         self._neg_cb = QtWidgets.QCheckBox("Neg")
         self._action_remove_btn = QtWidgets.QAction("Supprimer", self)
+        self._progress_bar = QtWidgets.QProgressBar()
+        self._cancel_load_btn = QtWidgets.QPushButton(STR_CANCEL)
+        self._summary_panel = SummaryPanel()
+        self._summary_dock = QtWidgets.QDockWidget(STR_SUMMARY, self)
+        self._debug_dock = QtWidgets.QDockWidget(STR_DEBUG, self)
 
         # create layouts
         self._main_layout = QtWidgets.QVBoxLayout(self._main_widget)
@@ -85,8 +107,13 @@ class MainWindow(QtWidgets.QMainWindow):
         self._file_menu = self._main_menu.addMenu("&Fichier")
         self._open_file_action = self._file_menu.addAction(self._ICON_OPEN, "&Ouvrir un fichier")
         self._edit_settings_action = self._file_menu.addAction(self._ICON_SAVE, "&Modifier les paramètres")
+        self._follow_action = self._file_menu.addAction("&Suivre les ajouts aux fichiers")
+        self._export_action = self._file_menu.addAction(self._ICON_SAVE, "&Exporter la vue")
         self._columns_menu = self._main_menu.addMenu("&Colonnes")
         self._columns_edit_undesired_action = self._columns_menu.addAction("&Editer les colonnes à masquer")
+        self._view_menu = self._main_menu.addMenu("&Affichage")
+        self._view_menu.addAction(self._summary_dock.toggleViewAction())
+        self._view_menu.addAction(self._debug_dock.toggleViewAction())
         self._help_menu = self._main_menu.addMenu('&Aide')
         self._show_about_action = self._help_menu.addAction(self._ICON_ABOUT, "&A propos ...")
 
@@ -96,6 +123,19 @@ class MainWindow(QtWidgets.QMainWindow):
         self._csv_widget.hide()
         self._table_view.setSortingEnabled(True)
         self._pop_menu.addAction(self._action_remove_btn)
+        self._follow_action.setCheckable(True)
+        self._timer.setInterval(FOLLOW_INTERVAL)
+        self._filter_le.setPlaceholderText(STR_FILTER_PLACEHOLDER)
+        self._progress_bar.setRange(0, 1000)
+        self._progress_bar.setMaximumWidth(200)
+        self._progress_bar.hide()
+        self._cancel_load_btn.hide()
+        self.statusBar().addPermanentWidget(self._progress_bar)
+        self.statusBar().addPermanentWidget(self._cancel_load_btn)
+        self._summary_dock.setWidget(self._summary_panel)
+        self._summary_dock.hide()
+        self._debug_dock.setWidget(DebugPanel())
+        self._debug_dock.hide()
         self.setAcceptDrops(True)
 
         # add widgets to layouts
@@ -109,24 +149,60 @@ class MainWindow(QtWidgets.QMainWindow):
         self._csv_layout.addLayout(self._filtering_layout)
         self._csv_layout.addWidget(self._table_view)
         self._main_layout.addWidget(self._csv_widget)
+        self.addDockWidget(QtCore.Qt.RightDockWidgetArea, self._summary_dock)
+        self.addDockWidget(QtCore.Qt.BottomDockWidgetArea, self._debug_dock)
 
         self._info_lbl.hide()
 
         # setup connections
         self._open_file_action.triggered.connect(self._open_file_clicked)
         self._edit_settings_action.triggered.connect(self._show_settings)
+        self._follow_action.toggled.connect(self._follow_toggled)
+        self._export_action.triggered.connect(self._export_view)
+        self._timer.timeout.connect(self._follow_files)
         self._columns_edit_undesired_action.triggered.connect(self._edit_undesired_columns)
         self._show_about_action.triggered.connect(self._show_about)
         self._filter_le.returnPressed.connect(self._filter_entered)
+        self._filter_le.textEdited.connect(self._filter_edited)
         self._raz_btn.clicked.connect(self._filter_raz)
         self._action_remove_btn.triggered.connect(self._filter_remove_btn)
         self._table_view.doubleClicked.connect(self._table_view_double_clicked)
+        self._cancel_load_btn.clicked.connect(self._cancel_load)
+        self._summary_dock.visibilityChanged.connect(lambda _: self._update_summary())
+        self._summary_panel.group_column_changed.connect(self._update_summary)
 
         self._config.load_gen_config()
-        self._custom = Custom(self._config.custom)
+        self._custom = None  # custom actions, created on the first double click
 
+        # the window is displayed before pandas is imported
+        QtCore.QTimer.singleShot(PRELOAD_DELAY, preload)
         if file_path_strs:
-            self._read_files(file_path_strs)
+            QtCore.QTimer.singleShot(0, lambda: self._read_files(file_path_strs))
+
+    @property
+    def _csv_set(self):
+        """Files opened, created on first use (imports pandas)"""
+        if self._lazy_csv_set is None:
+            from package.api.csv_set import CsvSet
+            self._lazy_csv_set = CsvSet(config=self._config)
+        return self._lazy_csv_set
+
+    @property
+    def _filter_manager(self):
+        """Filters of the table, created on first use (imports pandas)"""
+        if self._lazy_filter_manager is None:
+            from package.api.filtering import FilterManager
+            self._lazy_filter_manager = FilterManager(icon_on=QtGui.QIcon(self.ctx.get_resource("dot_on.svg")),
+                                                      icon_off=QtGui.QIcon(self.ctx.get_resource("dot_off.svg")))
+        return self._lazy_filter_manager
+
+    def closeEvent(self, event):
+        self._next_read = None
+        for worker in (self._loader, self._indexer, self._profiler, self._exporter):
+            if worker:
+                worker.cancel()
+                worker.wait()
+        super().closeEvent(event)
 
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
@@ -150,8 +226,17 @@ class MainWindow(QtWidgets.QMainWindow):
     #     self._table_model.clear()
     #     self._completer = None
 
+    def _cancel_load(self):
+        """Cancels the files being read or exported"""
+        self._next_read = None
+        for worker in (self._loader, self._exporter):
+            if worker:
+                worker.cancel()
+
     def _edit_undesired_columns(self):
         """Actions when edit undesirable columns in menu has been clicked"""
+        from package.column_selector import ColumnSelector
+
         if not self._csv_set.extension:
             QtWidgets.QMessageBox.warning(self, "Erreur", "Aucun fichier ouvert")
             return
@@ -159,10 +244,84 @@ class MainWindow(QtWidgets.QMainWindow):
         self._columns_selector.validated.connect(self._save_columns_preferences)
         self._columns_selector.show()
 
+    def _export_cancelled(self):
+        """Actions when the export has been cancelled"""
+        if self.sender() is not self._exporter:
+            return
+        self._export_ended()
+        self.statusBar().showMessage(STR_EXPORT_CANCELLED)
+
+    def _export_ended(self):
+        """Actions when the export has ended, whatever the result"""
+        self._exporter = None
+        self._hide_progress()
+
+    def _export_failed(self, e):
+        """Actions when the export has raised an exception"""
+        if self.sender() is not self._exporter:
+            return
+        self._export_ended()
+        self.statusBar().clearMessage()
+        QtWidgets.QMessageBox.warning(self, "Erreur", f"Export impossible : {e}")
+
+    def _export_progressed(self, progress):
+        """Displays the progress of the export"""
+        if self.sender() is not self._exporter:
+            return
+        if progress.rows_total:
+            self._progress_bar.setValue(int(1000 * progress.rows / progress.rows_total))
+        if not self._loader:
+            self.statusBar().showMessage(f"{STR_EXPORTING} {progress.rows} / {progress.rows_total} lignes")
+
+    def _export_succeeded(self, nb_rows):
+        """Actions when the rows have been exported by the worker"""
+        if self.sender() is not self._exporter:
+            return
+        self._export_ended()
+        self.statusBar().showMessage(f"{nb_rows} lignes exportées dans {self._export_path}")
+
+    def _export_view(self):
+        """Exports the rows displayed, with their sort and the columns displayed, in a worker thread"""
+        from package.api.export import export_format, export_rows
+        from package.main_table import MainTableModel
+
+        if self._exporter:
+            QtWidgets.QMessageBox.warning(self, "Erreur", "Un export est déjà en cours")
+            return
+        if self._loader or not isinstance(self._table_model, MainTableModel):
+            QtWidgets.QMessageBox.warning(self, "Erreur", "Aucune donnée à exporter")
+            return
+
+        path_str, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Exporter la vue", self._config.open_file_dir,
+                                                            STR_EXPORT_FILTERS)
+        if not path_str:
+            return
+        try:
+            export_format(path_str)
+        except ExportError as e:
+            QtWidgets.QMessageBox.warning(self, "Erreur", str(e))
+            return
+
+        df, rows, columns = self._table_model.view()
+        self._exporter = Worker(export_rows, df, path_str, rows=rows, columns=columns,
+                                separator=self._config.m_separator, parent=self)
+        self._export_path = path_str
+        self._exporter.progressed.connect(self._export_progressed)
+        self._exporter.succeeded.connect(self._export_succeeded)
+        self._exporter.failed.connect(self._export_failed)
+        self._exporter.cancelled.connect(self._export_cancelled)
+        self._exporter.finished.connect(self._exporter.deleteLater)
+
+        self._progress_bar.setValue(0)
+        self._progress_bar.show()
+        self._cancel_load_btn.show()
+        self.statusBar().showMessage(STR_EXPORTING)
+        self._exporter.start()
+
     def _filter_btn_clicked(self):
         """Actions when filter button has been left-clicked"""
         self._filter_manager.toggle_filter(self.sender().text())
-        self.statusBar().showMessage(self._table_model.hits)
+        self._update_hits()
 
     def _filter_btn_right_clicked(self, point):
         """Actions when filter button has been right-clicked"""
@@ -170,6 +329,22 @@ class MainWindow(QtWidgets.QMainWindow):
         self._last_right_clicked_btn = sender_btn
         self._pop_menu.exec_(sender_btn.mapToGlobal(point))
 
+    def _filter_edited(self, text):
+        """Completes the value of the last condition if it is on a text column, the column names otherwise"""
+        from package.api.expression import tokenize
+
+        if not self._completer:
+            return
+        completions = self._table_model.df_columns
+        tokens = tokenize(text)
+        condition = tokens[-1][1] if tokens and tokens[-1][0] is None else ""
+        match = VALUE_OPERATOR_REGEX.match(condition)
+        profile = self._table_model.profiles.get(match.group(1)) if match and self._table_model.profiles else None
+        if profile and profile.is_text:
+            prefix = condition[match.end():]
+            completions = [text[:len(text) - len(prefix)] + value for value in profile.complete(prefix)]
+        self._completer.model().setStringList(completions)
+
     def _filter_entered(self):
         """Actions when Enter key pressed in filter lineedit"""
         text = self._filter_le.text()
@@ -209,6 +384,63 @@ class MainWindow(QtWidgets.QMainWindow):
         self._filter_manager.delete(text)
         self._update_hits()
 
+    def _follow_files(self):
+        """Displays the lines appended to the files since they have been read"""
+        from package.main_table import MainTableModel
+
+        if self._loader or not isinstance(self._table_model, MainTableModel):
+            return
+        try:
+            nb_rows = self._csv_set.read_appended()
+        except CsvReadError as e:
+            # truncated (log rotation ...) : read again
+            logger.warning(e)
+            self._read_files()
+            return
+        except Exception as e:
+            logger.error(f"Cannot read the lines appended to the files : {e}")
+            return
+        if nb_rows:
+            self._table_model.rows_appended(self._csv_set.df)
+            self._update_hits()
+
+    def _follow_toggled(self, checked):
+        """Starts or stops following the files"""
+        if checked:
+            self._timer.start()
+        else:
+            self._timer.stop()
+
+    def _hide_progress(self):
+        """Hides the progress bar, unless files are still being read or exported"""
+        if not self._loader and not self._exporter:
+            self._progress_bar.hide()
+            self._cancel_load_btn.hide()
+
+    def _index_built(self, index):
+        """Gives the trigram index to the model it has been built for"""
+        if self.sender() is not self._indexer:
+            return
+        self._indexer = None
+        self._table_model.text_index = index
+
+    def _index_text(self):
+        """Builds the trigram index of the text columns of the model in a worker thread"""
+        from package.api.trigram_index import TrigramIndex
+        from package.main_table import MainTableModel
+
+        if self._indexer:
+            self._indexer.cancel()
+            self._indexer = None
+        if not isinstance(self._table_model, MainTableModel) or not self._csv_set.string_columns:
+            return
+
+        columns = [column for column in self._csv_set.df_columns if column in self._csv_set.string_columns]
+        self._indexer = Worker(TrigramIndex, self._csv_set.df, columns, parent=self)
+        self._indexer.succeeded.connect(self._index_built)
+        self._indexer.finished.connect(self._indexer.deleteLater)
+        self._indexer.start()
+
     def _open_file_clicked(self):
         """Actions when open files in menu has been clicked"""
         path_strs, _ = QtWidgets.QFileDialog.getOpenFileNames(self, "Ouvrir un fichier",
@@ -222,72 +454,212 @@ class MainWindow(QtWidgets.QMainWindow):
         self._read_files(path_strs)
 
     def _read_files(self, files=None):
-        """Reads csv files : new ones if arg files is provided, otherwise re-reads current ones"""
-        try:
-            self._csv_set.read_files(files=files)
+        """Reads csv files in a worker thread : new ones if arg files is provided, otherwise re-reads current ones.
+        A read in progress is cancelled, and the files are read once it has stopped (both use the csv set), without
+        waiting for it in the GUI thread"""
+        if self._loader:
+            if self._next_read is None:
+                self._loader.finished.connect(self._start_next_read)
+            self._next_read = (files,)
+            self._loader.cancel()
+            return
 
-        except ValueError as e:
-            QtWidgets.QMessageBox.warning(self, "Erreur", str(e))
-            logger.error(e)
-            logger.exception("Value error")
-            # display
-            self._csv_widget.hide()
-            self._logo_widget.show()
+        self._loader = Worker(self._csv_set.read_files, files=files, parent=self)
+        self._loader.progressed.connect(self._read_progressed)
+        self._loader.chunk_loaded.connect(self._read_chunk_loaded)
+        self._loader.succeeded.connect(self._read_succeeded)
+        self._loader.failed.connect(self._read_failed)
+        self._loader.cancelled.connect(self._read_cancelled)
+        self._loader.finished.connect(self._loader.deleteLater)
+
+        self._progress_bar.setValue(0)
+        self._progress_bar.show()
+        self._cancel_load_btn.show()
+        self.statusBar().showMessage(STR_LOADING)
+        self._loader.start()
+
+    def _start_next_read(self):
+        """Reads the files requested while the previous loader was running, once it has stopped"""
+        if self._next_read is None:
+            return
+        (files,), self._next_read = self._next_read, None
+        self._read_files(files)
+
+    def _profile_columns(self):
+        """Computes the profiles of the columns of the model in a worker thread"""
+        from package.api.profiling import profile_columns
+        from package.main_table import MainTableModel
+
+        if self._profiler:
+            self._profiler.cancel()
+            self._profiler = None
+        if not isinstance(self._table_model, MainTableModel):
+            return
 
-        except Exception as e:
-            QtWidgets.QMessageBox.warning(self, "Erreur", str(e))
-            logger.error(e)
-            logger.exception("unexpected exception")
-            # display
+        self._profiler = Worker(profile_columns, self._csv_set.df, parent=self)
+        self._profiler.succeeded.connect(self._profiles_built)
+        self._profiler.finished.connect(self._profiler.deleteLater)
+        self._profiler.start()
+
+    def _profiles_built(self, profiles):
+        """Gives the profiles to the model they have been computed for, and to the planner of the filters"""
+        from package.api.profiling import register_profiles
+
+        if self.sender() is not self._profiler:
+            return
+        self._profiler = None
+        self._table_model.profiles = profiles
+        register_profiles(profiles)
+
+    def _read_cancelled(self):
+        """Actions when the files reading has been cancelled"""
+        if self.sender() is not self._loader:
+            return
+        self._read_ended()
+        self.statusBar().showMessage(STR_LOADING_CANCELLED)
+
+        # back to the previous files
+        if self._table_model and self._table_view.model() is not self._table_model:
+            self._table_view.setModel(self._table_model)
+        elif not self._table_model:
             self._csv_widget.hide()
             self._logo_widget.show()
 
+    def _read_chunk_loaded(self, df):
+        """Displays the rows read so far, when streaming"""
+        from package.main_table import MainTableModel
+
+        if self.sender() is not self._loader:
+            return
+        if self._streaming_model:
+            self._streaming_model.append_rows(df)
         else:
-            self._read_success()
+            self._streaming_model = MainTableModel(df, self._filter_manager, streaming=True)
+            self._table_view.setModel(self._streaming_model)
+            self._set_filtering_enabled(False)
+            self._logo_widget.hide()
+            self._csv_widget.show()
+        self._update_hits()
+
+    def _read_ended(self):
+        """Actions when the files reading has ended, whatever the result"""
+        self._loader = None
+        self._streaming_model = None
+        self._hide_progress()
+        self._set_filtering_enabled(True)
+
+    def _read_failed(self, e):
+        """Actions when the files reading has raised an exception"""
+        if self.sender() is not self._loader:
+            return
+        self._read_ended()
+        self.statusBar().clearMessage()
+        QtWidgets.QMessageBox.warning(self, "Erreur", str(e))
+        # display
+        self._csv_widget.hide()
+        self._logo_widget.show()
+
+    def _read_progressed(self, progress):
+        """Displays the progress of the files reading"""
+        if self.sender() is not self._loader:
+            return
+        if progress.bytes_total:
+            self._progress_bar.setValue(int(1000 * progress.bytes_read / progress.bytes_total))
+        if progress.current_file and not self._streaming_model:
+            self.statusBar().showMessage(f"{STR_LOADING} {progress.current_file.name} : "
+                                         f"{progress.bytes_read // 1000000} / {progress.bytes_total // 1000000} Mo, "
+                                         f"{progress.rows} lignes")
+
+    def _read_succeeded(self, _):
+        """Actions when the files have been read by the worker"""
+        if self.sender() is not self._loader:
+            return
+        scroll_value = self._table_view.verticalScrollBar().value() if self._streaming_model else 0
+        self._read_ended()
+        self._read_success()
+        self._table_view.verticalScrollBar().setValue(scroll_value)
 
     def _read_success(self):
         """Actions when _read_files has run without error"""
-        self._table_model = MainTableModel(self._csv_set.df, self._filter_manager)
+        from package.main_table import MainTableModel, VirtualTableModel
+
+        if self._csv_set.line_index:
+            self._table_model = VirtualTableModel(self._csv_set.line_index, self._filter_manager)
+        else:
+            self._table_model = MainTableModel(self._csv_set.df, self._filter_manager)
         self._filter_manager.set_model(self._table_model)
         self._filter_manager.file_opened()
         self._table_view.setModel(self._table_model)
+        self._index_text()
+        self._profile_columns()
 
         # self._table_view.resizeColumnsToContents()  # too slow
 
         self._completer = QtWidgets.QCompleter(self._table_model.df_columns)
         self._completer.setCaseSensitivity(QtCore.Qt.CaseInsensitive)
         self._filter_le.setCompleter(self._completer)
+        self._summary_panel.set_columns(self._table_model.df_columns)
         self.setWindowTitle(self._csv_set.title)
 
         # display
         self._logo_widget.hide()
         self._csv_widget.show()
+        self._set_filtering_enabled(self._csv_set.line_index is None)
         self._update_hits()
 
+        if self._csv_set.read_errors:
+            QtWidgets.QMessageBox.warning(self, "Erreur", "Fichiers non lus :\n" + "\n".join(
+                f"{file} : {e}" for file, e in self._csv_set.read_errors.items()))
+
+    def _reload(self):
+        """Displays the files with the current config, parsing them again only if needed"""
+        if self._loader or self._csv_set.needs_parse():
+            self._read_files()
+        else:
+            self._csv_set.project()
+            self._read_success()
+
     def _save_columns_preferences(self):
         """Saves the column preferences"""
         self._columns_selector = None
         self._config.save_csv_config()
-        self._read_files()
+        self._reload()
 
     def _save_settings(self):
         """Saves the settings"""
         self._settings_editor = None
         self._config.save_csv_config()
-        self._read_files()
+        self._reload()
+
+    def _set_filtering_enabled(self, enabled):
+        """Enables or disables the filtering widgets and the filter buttons"""
+        for i in range(self._filtering_layout.count()):
+            widget = self._filtering_layout.itemAt(i).widget()
+            if widget:
+                widget.setEnabled(enabled)
 
     def _show_about(self):
         """Show the about dialog"""
+        from package.about import show_about
+
         show_about(logo=QtGui.QPixmap(self.ctx.get_resource("images/stork.svg")).scaledToWidth(100))
 
     def _show_settings(self):
         """Actions when edit settings in menu has been clicked"""
+        from package.settings_editor import SettingsEditor
+
         self._settings_editor = SettingsEditor(csv_set=self._csv_set, config=self._config, ctx=self.ctx)
         self._settings_editor.validated.connect(self._save_settings)
         self._settings_editor.show()
 
     def _table_view_double_clicked(self, item: QtCore.QModelIndex):
         """Actions when table view is double-clicked"""
+        if self._custom is None:
+            try:
+                from package.custom import Custom
+            except ModuleNotFoundError:
+                from package.custom_example import Custom
+            self._custom = Custom(self._config.custom)
         try:
             self._custom.table_view_double_clicked(item=item,
                                                    row_index=item.model().headerData(item.row(), QtCore.Qt.Vertical),
@@ -297,4 +669,11 @@ class MainWindow(QtWidgets.QMainWindow):
             QtWidgets.QMessageBox.warning(self, "Erreur", str(e))
 
     def _update_hits(self):
-        self.statusBar().showMessage(self._table_model.hits)
+        self.statusBar().showMessage((self._streaming_model or self._table_model).hits)
+        self._update_summary()
+
+    def _update_summary(self):
+        """Displays the summary of the rows kept by the filters, if the summary panel is visible"""
+        if self._summary_dock.isHidden() or not self._table_model or self._streaming_model:
+            return
+        self._summary_panel.set_summary(self._table_model.summary(self._summary_panel.group_column))
@@ -0,0 +1,31 @@
+"""Imports the slow modules (pandas and the modules using it) in the background once the window is displayed, so
+that the first file opens without waiting for them"""
+import importlib
+import logging
+import threading
+from time import perf_counter
+
+logger = logging.getLogger(__name__)
+
+MODULES = ("pandas", "package.api.csv_set", "package.api.filtering", "package.api.profiling",
+           "package.api.trigram_index", "package.main_table")
+
+
+def _import(modules):
+    t0 = perf_counter()
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            # imported again where it is used, the error will be raised there
+            logger.warning(f"Cannot preload {module} : {e}")
+            return
+    logger.debug(f"Modules preloaded in {perf_counter() - t0:.3f}s")
+
+
+def preload(modules=MODULES):
+    """Imports the modules in a daemon thread, returns it. A module imported meanwhile by another thread waits for
+    the import to end"""
+    thread = threading.Thread(target=_import, args=(modules,), name="preload", daemon=True)
+    thread.start()
+    return thread
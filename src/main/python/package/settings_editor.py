@@ -1,5 +1,6 @@
 from PySide2 import QtWidgets, QtCore, QtGui
 
+from package.api.config import LOAD_MODES
 from package.api.exceptions import ConfigSettingError
 
 STR_CANCEL = "Annuler"
@@ -12,7 +13,14 @@ STR_COMMENT = "Commentaire"
 STR_HEADER = "Nb lignes avant en-tête"
 STR_SEPARATOR = "Séparateur"
 STR_MAX_LINES = "Nb max de lignes"
+STR_LOAD_MODE = "Lignes chargées"
+STR_LOAD_MODES = ("Premières", "Dernières", "A partir de la ligne", "Echantillon aléatoire")  # as LOAD_MODES
+STR_FIRST_LINE = "Première ligne"
 STR_SKIP_BLANK_LINES = "Ignorer les lignes vides"
+STR_STREAMING = "Affichage progressif"
+STR_VIRTUAL = "Lecture à la demande (gros fichiers, sans filtre)"
+STR_CATEGORICAL = "Encoder les colonnes texte répétitives"
+STR_DOWNCAST = "Réduire la mémoire des colonnes numériques"
 STR_HIDE_EMPTY = "Masquer les colonnes vides"
 STR_HIDE_UNDESIRED = "Masquer les colonnes indésirables"
 
@@ -37,7 +45,13 @@ class SettingsEditor(QtWidgets.QWidget):
         self._header_le = QtWidgets.QLineEdit(str(self._config.header))
         self._separator_le = QtWidgets.QLineEdit(self._config.separator)
         self._max_lines_le = QtWidgets.QLineEdit(str(self._config.max_lines))
+        self._load_mode_cb = QtWidgets.QComboBox()
+        self._first_line_le = QtWidgets.QLineEdit(str(self._config.first_line))
         self._skip_blank__lines_le = QtWidgets.QCheckBox()
+        self._streaming_le = QtWidgets.QCheckBox()
+        self._virtual_le = QtWidgets.QCheckBox()
+        self._categorical_le = QtWidgets.QCheckBox()
+        self._downcast_le = QtWidgets.QCheckBox()
         self._hide_empty_le = QtWidgets.QCheckBox()
         self._hide_undesired_le = QtWidgets.QCheckBox()
 
@@ -51,7 +65,14 @@ class SettingsEditor(QtWidgets.QWidget):
         self._buttons_layout = QtWidgets.QHBoxLayout()
 
         # modify widgets
+        self._load_mode_cb.addItems(STR_LOAD_MODES)
+        self._load_mode_cb.setCurrentIndex(LOAD_MODES.index(self._config.load_mode))
+        self._load_mode_changed(self._load_mode_cb.currentIndex())
         self._skip_blank__lines_le.setChecked(self._config.skip_blank_lines)
+        self._streaming_le.setChecked(self._config.streaming)
+        self._virtual_le.setChecked(self._config.virtual)
+        self._categorical_le.setChecked(self._config.categorical)
+        self._downcast_le.setChecked(self._config.downcast)
         self._hide_empty_le.setChecked(self._config.hide_empty)
         self._hide_undesired_le.setChecked(self._config.hide_undesired)
         self._cancel_btn.setIcon(QtGui.QIcon(QtGui.QPixmap(ctx.get_resource("cross.svg"))))
@@ -61,6 +82,7 @@ class SettingsEditor(QtWidgets.QWidget):
 
         self._encoding_le.setMaximumWidth(80)
         self._max_lines_le.setMaximumWidth(80)
+        self._first_line_le.setMaximumWidth(80)
         self._comment_le.setMaximumWidth(50)
         self._header_le.setMaximumWidth(50)
         self._separator_le.setMaximumWidth(50)
@@ -68,10 +90,16 @@ class SettingsEditor(QtWidgets.QWidget):
         # add widgets to form layout
         self._form_layout.addRow(STR_ENCODING, self._encoding_le)
         self._form_layout.addRow(STR_MAX_LINES, self._max_lines_le)
+        self._form_layout.addRow(STR_LOAD_MODE, self._load_mode_cb)
+        self._form_layout.addRow(STR_FIRST_LINE, self._first_line_le)
         self._form_layout.addRow(STR_COMMENT, self._comment_le)
         self._form_layout.addRow(STR_HEADER, self._header_le)
         self._form_layout.addRow(STR_SEPARATOR, self._separator_le)
         self._form_layout.addRow(STR_SKIP_BLANK_LINES, self._skip_blank__lines_le)
+        self._form_layout.addRow(STR_STREAMING, self._streaming_le)
+        self._form_layout.addRow(STR_VIRTUAL, self._virtual_le)
+        self._form_layout.addRow(STR_CATEGORICAL, self._categorical_le)
+        self._form_layout.addRow(STR_DOWNCAST, self._downcast_le)
         self._form_layout.addRow(STR_HIDE_EMPTY, self._hide_empty_le)
         self._form_layout.addRow(STR_HIDE_UNDESIRED, self._hide_undesired_le)
 
@@ -88,6 +116,10 @@ class SettingsEditor(QtWidgets.QWidget):
     def setup_connections(self):
         self._cancel_btn.clicked.connect(self.cancel)
         self._validate_btn.clicked.connect(self.validate)
+        self._load_mode_cb.currentIndexChanged.connect(self._load_mode_changed)
+
+    def _load_mode_changed(self, index):
+        self._first_line_le.setEnabled(LOAD_MODES[index] == "range")
 
     def cancel(self):
         self.close()
@@ -99,7 +131,13 @@ class SettingsEditor(QtWidgets.QWidget):
             self._config.header = self._header_le.text()
             self._config.separator = self._separator_le.text()
             self._config.max_lines = self._max_lines_le.text()
+            self._config.load_mode = LOAD_MODES[self._load_mode_cb.currentIndex()]
+            self._config.first_line = self._first_line_le.text()
             self._config.skip_blank_lines = self._skip_blank__lines_le.isChecked()
+            self._config.streaming = self._streaming_le.isChecked()
+            self._config.virtual = self._virtual_le.isChecked()
+            self._config.categorical = self._categorical_le.isChecked()
+            self._config.downcast = self._downcast_le.isChecked()
             self._config.hide_empty = self._hide_empty_le.isChecked()
             self._config.hide_undesired = self._hide_undesired_le.isChecked()
 
@@ -0,0 +1,96 @@
+import logging
+
+from PySide2 import QtWidgets, QtCore
+from PySide2.QtCore import Signal
+
+logger = logging.getLogger(__name__)
+
+STR_AGGREGATES = ["Nb", "Somme", "Min", "Max", "Moyenne"]
+STR_GROUP_BY = "Regrouper par"
+STR_NO_GROUP = "(aucune)"
+STR_GROUP_HEADERS = ["Valeur", "Nb"]
+STR_NO_SUMMARY = "Pas de résumé pour ce mode d'affichage"
+
+MAX_GROUPS = 100  # values of the group column displayed, having the most rows
+
+
+class SummaryPanel(QtWidgets.QWidget):
+    """Aggregates of the numeric columns over the rows kept by the filters, and nb of rows by value of a column"""
+    group_column_changed = Signal()
+
+    @property
+    def group_column(self):
+        """Column the rows are grouped by, None if no group"""
+        return self._group_cb.currentData()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        # create widgets
+        self._rows_lbl = QtWidgets.QLabel()
+        self._aggregates_table = QtWidgets.QTableWidget(0, len(STR_AGGREGATES))
+        self._group_cb = QtWidgets.QComboBox()
+        self._groups_table = QtWidgets.QTableWidget(0, len(STR_GROUP_HEADERS))
+
+        # create layouts
+        self._main_layout = QtWidgets.QVBoxLayout(self)
+        self._group_layout = QtWidgets.QFormLayout()
+
+        # modify widgets
+        for table, headers in ((self._aggregates_table, STR_AGGREGATES), (self._groups_table, STR_GROUP_HEADERS)):
+            table.setHorizontalHeaderLabels(headers)
+            table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+            table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+        self._group_cb.addItem(STR_NO_GROUP, None)
+
+        # add widgets to layouts
+        self._group_layout.addRow(STR_GROUP_BY, self._group_cb)
+        self._main_layout.addWidget(self._rows_lbl)
+        self._main_layout.addWidget(self._aggregates_table)
+        self._main_layout.addLayout(self._group_layout)
+        self._main_layout.addWidget(self._groups_table)
+
+        # set connections
+        self._group_cb.currentIndexChanged.connect(lambda _: self.group_column_changed.emit())
+
+    def set_columns(self, columns):
+        """Sets the columns the rows can be grouped by, keeping the current one if it is still there"""
+        current = self.group_column
+        self._group_cb.blockSignals(True)
+        self._group_cb.clear()
+        self._group_cb.addItem(STR_NO_GROUP, None)
+        for column in columns:
+            self._group_cb.addItem(str(column), column)
+        index = self._group_cb.findData(current)
+        self._group_cb.setCurrentIndex(max(index, 0))
+        self._group_cb.blockSignals(False)
+
+    def set_summary(self, summary):
+        """Displays a Summary, None if the model cannot be summarized"""
+        if summary is None:
+            self._rows_lbl.setText(STR_NO_SUMMARY)
+            self._aggregates_table.setRowCount(0)
+            self._groups_table.setRowCount(0)
+            return
+
+        self._rows_lbl.setText(f"{summary.nb_rows} lignes")
+
+        self._aggregates_table.setRowCount(len(summary.columns))
+        self._aggregates_table.setVerticalHeaderLabels([str(column) for column in summary.columns])
+        for row, aggregates in enumerate(summary.columns.values()):
+            values = (aggregates.count, aggregates.total, aggregates.minimum, aggregates.maximum, aggregates.mean)
+            for col, value in enumerate(values):
+                self._aggregates_table.setItem(row, col, self._item(value))
+
+        groups = summary.top_groups(MAX_GROUPS)
+        self._groups_table.setRowCount(len(groups))
+        for row, (value, nb) in enumerate(groups):
+            self._groups_table.setItem(row, 0, QtWidgets.QTableWidgetItem(str(value)))
+            self._groups_table.setItem(row, 1, self._item(nb))
+
+    @staticmethod
+    def _item(value):
+        """Item of a number, aligned on the right"""
+        item = QtWidgets.QTableWidgetItem(f"{value:.6g}" if isinstance(value, float) else str(value))
+        item.setTextAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+        return item
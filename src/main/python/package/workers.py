@@ -0,0 +1,40 @@
+import logging
+
+from PySide2 import QtCore
+
+from package.api.exceptions import OperationCancelledError
+from package.api.progress import Progress
+
+logger = logging.getLogger(__name__)
+
+
+class Worker(QtCore.QThread):
+    """Runs func(*args, progress=..., **kwargs) in a thread. The signals are received in the GUI thread"""
+    progressed = QtCore.Signal(object)  # Progress
+    chunk_loaded = QtCore.Signal(object)  # partial result sent by func
+    succeeded = QtCore.Signal(object)  # value returned by func
+    failed = QtCore.Signal(object)  # exception raised by func
+    cancelled = QtCore.Signal()
+
+    def __init__(self, func, *args, parent=None, **kwargs):
+        super().__init__(parent)
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self.progress = Progress(callback=self.progressed.emit, chunk_callback=self.chunk_loaded.emit)
+
+    def cancel(self):
+        """Stops func at its next read"""
+        self.progress.cancel()
+
+    def run(self):
+        try:
+            result = self._func(*self._args, progress=self.progress, **self._kwargs)
+        except OperationCancelledError:
+            logger.info(f"{self._func.__qualname__} cancelled")
+            self.cancelled.emit()
+        except Exception as e:
+            logger.exception(f"{self._func.__qualname__} failed")
+            self.failed.emit(e)
+        else:
+            self.succeeded.emit(result)
@@ -0,0 +1,70 @@
+import io
+import pathlib
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from package.api.exceptions import FilterInvalidError
+from package.cli import BatchFilter
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dir = pathlib.Path(self.tmp_dir.name)
+        (self.dir / "config_csv.yaml").write_text("header: 1\nseparator: ';'\nmax_lines: 2\n")
+        self.files = []
+        for i in range(3):
+            path = self.dir / f"day{i}.csv"
+            path.write_text("Titre\nCol1;Col2;Col3\n" + "".join(f"{i * 10 + j};{'ab'[j % 2]};x\n" for j in range(10)))
+            self.files.append(str(path))
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def _batch(self, **kwargs):
+        batch = BatchFilter(**kwargs)
+        batch._config._config_dir = self.dir
+        return batch
+
+    def test_run(self):
+        batch = self._batch(filters=["Col1 > 5", "Col2 = b or Col1 > 25"], columns=["Col2", "Col1"], separator=",")
+        output = io.StringIO()
+
+        # the max of lines of the preset is only for the display
+        self.assertEqual(batch.run(self.files, output), (30, 14))
+        self.assertEqual(output.getvalue().splitlines(),
+                         ["Col2,Col1"] + [f"b,{i}" for i in range(7, 26, 2)] + ["a,26", "b,27", "a,28", "b,29"])
+
+        output_parallel = io.StringIO()
+        self.assertEqual(self._batch(filters=["Col1 > 5", "Col2 = b or Col1 > 25"], columns=["Col2", "Col1"],
+                                     separator=",").run(self.files, output_parallel, jobs=2), (30, 14))
+        self.assertEqual(output_parallel.getvalue(), output.getvalue())
+
+    def test_run_max_lines(self):
+        output = io.StringIO()
+        self.assertEqual(self._batch(max_lines=4).run(self.files, output), (12, 12))
+        self.assertEqual(output.getvalue().splitlines()[:2], ["Col1;Col2;Col3", "0;a;x"])
+
+    def test_run_mixed_types(self):
+        # the types of the filters are the ones of the first chunk, the next ones are cast to them
+        path = self.dir / "mixed.csv"
+        path.write_text("Titre\nA;B\n" + "".join(f"a{i};{i}\n" for i in range(3000)) + "1;x\n2;3000\n")
+        output = io.StringIO()
+        self.assertEqual(self._batch(filters=["A : a29*9"]).run([str(path)], output), (3002, 11))
+        self.assertEqual(output.getvalue().splitlines()[-1], "a2999;2999")
+
+        with self.assertRaisesRegex(FilterInvalidError, r"B \(x ligne 3001\)"):
+            self._batch(filters=["B > 2990"]).run([str(path)], io.StringIO())
+
+    def test_no_qt(self):
+        code = "import sys, package.cli; print('PySide2' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=pathlib.Path(__file__).resolve().parent.parent)
+        self.assertEqual(result.stdout.strip(), "False")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,342 @@
+import bz2
+import gzip
+import lzma
+import pathlib
+import tempfile
+import unittest
+import unittest.mock
+import zipfile
+
+import pandas as pd
+
+from package.api.config import Config
+from package.api.csv_set import CsvSet
+from package.api.engines import PYTHON_ENGINE, CEngine, select_engine
+from package.api.exceptions import CsvReadError, OperationCancelledError
+from package.api.progress import Progress
+from package.api.tracing import NULL_SPAN, Tracer, TRACER
+
+
+class TestCsvSet(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dir = pathlib.Path(self.tmp_dir.name)
+
+        self.config = Config()
+        self.config.csv_extension = "csv"
+        self.config.set_config(header=1, separator=";", max_lines="")
+
+        self.csv_set = CsvSet(config=self.config)
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def _write(self, name, text):
+        path = self.dir / name
+        path.write_text(text, encoding="latin_1")
+        return str(path)
+
+    def test_select_engine(self):
+        self.assertIsInstance(select_engine(self.config, nrows=10), CEngine)
+
+        self.config.separator = ";;"
+        self.assertIs(select_engine(self.config), PYTHON_ENGINE)
+
+    def test_fallback_to_python_engine(self):
+        # the fast engines fail on a data line longer than the header, the python engine skips it
+        file = self._write("fallback.csv", "Titre\nCol1;Col2\n\n1;a\n2;b;c\n")
+        with unittest.mock.patch.object(PYTHON_ENGINE, "read", wraps=PYTHON_ENGINE.read) as python_read:
+            self.csv_set.read_files([file])
+
+        python_read.assert_called()
+        self.assertEqual(list(self.csv_set.df.columns), ["Col1", "Col2"])
+
+    def test_read_files_parallel(self):
+        files = [self._write(f"day{i}.csv", f"Titre\nCol1;Col2\n{i};a\n{i};b\n") for i in range(6)]
+        files.insert(3, self._write("empty.csv", ""))
+        self.config.workers = 4
+
+        self.csv_set.read_files(files)
+
+        self.assertEqual(self.csv_set.df["Col1"].tolist(), [0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5])
+        self.assertEqual(list(self.csv_set.read_errors), [pathlib.Path(files[3])])
+
+    def test_read_files_progress(self):
+        file = self._write("progress.csv", "Titre\nCol1;Col2\n" + "1;a\n" * 1000)
+        progress = Progress()
+
+        self.csv_set.read_files([file], progress=progress)
+
+        self.assertEqual(progress.bytes_read, pathlib.Path(file).stat().st_size)
+        self.assertEqual(progress.rows, 1000)
+
+    def test_read_files_cancelled(self):
+        first = self._write("first.csv", "Titre\nCol1;Col2\n1;a\n")
+        second = self._write("second.csv", "Titre\nCol1;Col2\n2;b\n")
+        self.csv_set.read_files([first])
+
+        progress = Progress()
+        progress.cancel()
+        with self.assertRaises(OperationCancelledError):
+            self.csv_set.read_files([second], progress=progress)
+
+        self.assertEqual(self.csv_set.title, first)
+
+    def test_read_files_streaming(self):
+        rows = "".join(f"{i};{'a' if i % 2 else ''}\n" for i in range(10000))
+        file = self._write("streaming.csv", "Titre\nCol1;Col2\n" + rows)
+        self.config.streaming = True
+        chunks = []
+
+        self.csv_set.read_files([file], progress=Progress(chunk_callback=chunks.append))
+
+        self.assertEqual([chunk.shape[0] for chunk in chunks], [2000, 4000, 4000])
+        self.assertEqual(chunks[0]["Col2"].tolist()[:2], ["", "a"])
+        self.assertEqual(self.csv_set.df["Col1"].tolist(), list(range(10000)))
+
+    def test_read_files_virtual(self):
+        file = self._write("virtual.csv", "Titre\n#commentaire\nCol1;Col2\n1;a\n\n2;b\n#fin\n3;c")
+        self.config.set_config(header=1, separator=";", comment="#", skip_blank_lines=True, virtual=True)
+
+        self.csv_set.read_files([file])
+        line_index = self.csv_set.line_index
+
+        self.assertEqual(len(line_index), 3)
+        self.assertEqual(line_index.columns, ["Col1", "Col2"])
+        self.assertEqual(line_index.read_rows(1, 3).values.tolist(), [[2, "b"], [3, "c"]])
+
+        # index cached next to the file
+        self.csv_set.read_files()
+        self.assertTrue(pathlib.Path(file + ".idx.npz").is_file())
+        self.assertEqual(len(self.csv_set.line_index), 3)
+
+    def test_read_files_downcast(self):
+        file = self._write("downcast.csv", "Titre\nCol1;Col2;Col3;Col4\n1;0.5;;1.1\n2;1.25;3;2.2\n")
+        self.config.downcast = True
+
+        self.csv_set.read_files([file])
+
+        self.assertEqual([str(dtype) for dtype in self.csv_set.df.dtypes], ["int8", "float32", "Int8", "float64"])
+        self.assertEqual(self.csv_set.numeric_columns, {"Col1", "Col2", "Col3", "Col4"})
+
+    def test_parse_cache_config(self):
+        # opt-in, in the cache directory of the user
+        config = Config()
+        config._config_dir = self.dir
+        config._gen_config_file = self.dir / "gen_config.yaml"
+        with unittest.mock.patch.dict("os.environ", {"XDG_CACHE_HOME": str(self.dir / "user"),
+                                                     "LOCALAPPDATA": str(self.dir / "user")}):
+            config.load_gen_config()
+        self.assertEqual(config.cache_max_size, 0)
+        self.assertEqual(pathlib.Path(config.cache_dir), self.dir / "user" / "CsvTable" / "parse")
+
+    def test_read_files_parse_cache(self):
+        file = self._write("cached.csv", "Titre\nCol1;Col2\n1;a\n2;\n")
+        self.config.cache_dir = str(self.dir / "cache")
+        self.config.cache_max_size = 10000000
+
+        self.csv_set.read_files([file])
+        self.assertEqual(len(list((self.dir / "cache").iterdir())), 1)
+
+        # same file and options : read from the cache, even by another set
+        csv_set = CsvSet(config=self.config)
+        with unittest.mock.patch.object(csv_set, "_read_csv") as read_csv:
+            csv_set.read_files([file])
+        read_csv.assert_not_called()
+        pd.testing.assert_frame_equal(csv_set.df, self.csv_set.df)
+
+        # other options : parsed again
+        self.config.max_lines = 1
+        self.csv_set.read_files()
+        self.assertEqual(len(self.csv_set.df), 1)
+        self.assertEqual(len(list((self.dir / "cache").iterdir())), 2)
+
+        # oldest entry evicted
+        self.config.cache_max_size = 1
+        self.config.max_lines = 2
+        CsvSet(config=self.config).read_files([file])
+        self.assertLessEqual(len(list((self.dir / "cache").iterdir())), 1)
+
+    def test_project(self):
+        file = self._write("project.csv", "Titre\nCol1;Col2;Col3\n1;;a\n2;;b\n")
+        self.config.hide_empty = False
+        self.csv_set.read_files([file])
+        self.assertEqual(self.csv_set.df_columns, ["Col1", "Col2", "Col3"])
+
+        # hiding columns does not parse the files again
+        self.config.hide_empty = True
+        self.config.hide_undesired = True
+        self.config.undesired_columns = {"Col3"}
+        self.assertFalse(self.csv_set.needs_parse())
+        with unittest.mock.patch.object(self.csv_set, "_read_csv") as read_csv:
+            self.csv_set.read_files()
+        read_csv.assert_not_called()
+        self.assertEqual(self.csv_set.df_columns, ["Col1"])
+        self.assertEqual(self.csv_set.numeric_columns, {"Col1"})
+
+        self.config.separator = ","
+        self.assertTrue(self.csv_set.needs_parse())
+
+    def test_read_files_load_modes(self):
+        file = self._write("modes.csv", "Titre\nCol1;Col2\n" + "".join(f"{i};a\n" for i in range(100)))
+        self.config.max_lines = 3
+
+        self.config.load_mode = "tail"
+        self.csv_set.read_files([file])
+        self.assertEqual(self.csv_set.df["Col1"].tolist(), [97, 98, 99])
+
+        self.config.load_mode = "range"
+        self.config.first_line = 10
+        self.csv_set.read_files()
+        self.assertEqual(self.csv_set.df["Col1"].tolist(), [10, 11, 12])
+        self.assertEqual(self.csv_set.available_columns, ["Col1", "Col2"])
+
+        # first line after the end : only the columns
+        self.config.first_line = 200
+        self.config.hide_empty = False
+        self.csv_set.read_files()
+        self.assertEqual(list(self.csv_set.df.columns), ["Col1", "Col2"])
+        self.assertEqual(self.csv_set.df.shape[0], 0)
+        self.config.first_line = 10
+
+        self.config.load_mode = "sample"
+        self.csv_set.read_files()
+        sample = self.csv_set.df["Col1"].tolist()
+        self.assertEqual(len(sample), 3)
+        self.assertEqual(sample, sorted(sample))
+
+        # fewer lines than the max
+        self.config.max_lines = 1000
+        self.config.load_mode = "tail"
+        self.csv_set.read_files()
+        self.assertEqual(self.csv_set.df["Col1"].tolist(), list(range(100)))
+
+    def test_read_files_compressed(self):
+        data = ("Titre\nCol1;Col2\n" + "".join(f"{i};a\n" for i in range(100))).encode("latin_1")
+        with zipfile.ZipFile(self.dir / "data.csv.zip", "w") as archive:
+            archive.writestr("data.csv", data)
+        (self.dir / "data.csv.gz").write_bytes(gzip.compress(data))
+        (self.dir / "data.csv.bz2").write_bytes(bz2.compress(data))
+        (self.dir / "data.csv.xz").write_bytes(lzma.compress(data))
+        (self.dir / "gzipped.csv").write_bytes(gzip.compress(data))  # detected from its first bytes
+
+        for name in ("data.csv.zip", "data.csv.gz", "data.csv.bz2", "data.csv.xz", "gzipped.csv"):
+            with self.subTest(name=name):
+                self.config.max_lines = ""
+                self.config.load_mode = "head"
+                self.csv_set.read_files([str(self.dir / name)])
+                self.assertEqual(self.csv_set.extension, "csv")
+                self.assertEqual(self.csv_set.available_columns, ["Col1", "Col2"])
+                self.assertEqual(self.csv_set.df["Col1"].tolist(), list(range(100)))
+
+                self.config.max_lines = 3
+                self.config.load_mode = "tail"
+                self.csv_set.read_files(progress=Progress())
+                self.assertEqual(self.csv_set.df["Col1"].tolist(), [97, 98, 99])
+                self.assertEqual(self.csv_set.read_appended(), 0)
+
+        self.config.virtual = True
+        with self.assertRaises(CsvReadError):
+            self.csv_set.read_files()
+
+    def test_read_appended(self):
+        file = self._write("follow.csv", "Titre\nCol1;Col2\n1;a\n")
+        self.csv_set.read_files([file])
+
+        with open(file, "a", encoding="latin_1") as f:
+            f.write("2;b\n3;")
+        self.assertEqual(self.csv_set.read_appended(), 1)
+        self.assertEqual(self.csv_set.read_appended(), 0)
+
+        # last line completed
+        with open(file, "a", encoding="latin_1") as f:
+            f.write("\n")
+        self.assertEqual(self.csv_set.read_appended(), 1)
+        self.assertEqual(self.csv_set.df["Col1"].tolist(), [1, 2, 3])
+        self.assertEqual(self.csv_set.df["Col2"].tolist(), ["a", "b", ""])
+
+        self._write("follow.csv", "Titre\nCol1;Col2\n")
+        with self.assertRaises(CsvReadError):
+            self.csv_set.read_appended()
+
+    def test_read_appended_part_read(self):
+        file = self._write("follow.csv", "Titre\nCol1;Col2\n" + "".join(f"{i};a\n" for i in range(100)))
+        self.config.max_lines = 10
+        self.csv_set.read_files([file])
+
+        # the rows 10 to 99 have not been read : the new ones are not displayed after the first ones
+        with open(file, "a", encoding="latin_1") as f:
+            f.write("100;b\n")
+        self.assertEqual(self.csv_set.read_appended(), 0)
+        self.assertEqual(self.csv_set.df["Col1"].tolist(), list(range(10)))
+
+    def test_read_appended_dtypes(self):
+        file = self._write("follow.csv", "Titre\nCol1;Col2;Col3\n" + "".join(f"{i};a;1.5\n" for i in range(10)))
+        self.config.categorical = True
+        self.config.downcast = True
+        self.csv_set.read_files([file])
+        df = self.csv_set.df
+        dtypes = df.dtypes.tolist()
+
+        with open(file, "a", encoding="latin_1") as f:
+            f.write("10;b;2.5\n")
+        self.assertEqual(self.csv_set.read_appended(), 1)
+
+        # the data displayed before is not modified
+        self.assertEqual(df["Col2"].cat.categories.tolist(), ["a"])
+        self.assertEqual(self.csv_set.df["Col2"].tolist()[-2:], ["a", "b"])
+        self.assertEqual(self.csv_set.df.dtypes.tolist()[0], dtypes[0])
+        self.assertEqual(self.csv_set.df.dtypes.tolist()[2], dtypes[2])
+
+        # the categories stay sorted, as the values sorted by them
+        with open(file, "a", encoding="latin_1") as f:
+            f.write("11;A;2.5\n12;0;2.5\n")
+        self.assertEqual(self.csv_set.read_appended(), 2)
+        self.assertEqual(self.csv_set.df["Col2"].cat.categories.tolist(), ["0", "A", "a", "b"])
+        self.assertEqual(self.csv_set.df["Col2"].sort_values().tolist()[:3], ["0", "A", "a"])
+
+    def test_read_files(self):
+        file = self._write("simple.csv", "Titre\nCol1;Col2\n1;a\n2;\n3;c\n")
+
+        self.csv_set.read_files([file])
+
+        df_expected = pd.DataFrame({
+            "Col1": [1, 2, 3],
+            "Col2": ["a", "", "c"]
+        })
+        pd.testing.assert_frame_equal(df_expected, self.csv_set.df)
+
+    def test_tracing(self):
+        tracer = Tracer()
+        self.assertIs(NULL_SPAN, tracer.span("parse"))
+        tracer.count("rows", 3)
+        self.assertEqual({}, tracer.counter_values())
+
+        tracer.enable()
+        with tracer.span("read", file="a.csv") as outer:
+            with tracer.span("parse") as inner:
+                tracer.count("rows", 3)
+            tracer.count("rows", 2)
+        self.assertEqual((0, 1), (outer.depth, inner.depth))
+        self.assertEqual({"rows": 5}, tracer.counter_values())
+        self.assertEqual(["read", "parse"], [name for name, *_ in tracer.summary()])
+
+        trace = tracer.chrome_trace()
+        self.assertEqual(["parse", "read", "rows"], [event["name"] for event in trace["traceEvents"]])
+        self.assertEqual("a.csv", trace["traceEvents"][1]["args"]["file"])
+
+        # the import is traced once the global tracer is enabled
+        file = self._write("traced.csv", "Titre\nCol1;Col2\n1;a\n2;b\n")
+        TRACER.enable()
+        try:
+            self.csv_set.read_files([file])
+            self.assertIn("CsvSet.import_data", [name for name, *_ in TRACER.summary()])
+            self.assertEqual(2, TRACER.counter_values()["rows parsed"])
+        finally:
+            TRACER.enable(False)
+            TRACER.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,23 @@
+import pathlib
+import tempfile
 import unittest
 
+import numpy as np
 import pandas as pd
-from PySide2 import QtWidgets
+from PySide2 import QtCore, QtGui, QtWidgets
 
+from package.api.config import Config
+from package.api.csv_set import CsvSet
+from package.api.dtypes import optimize_dtypes
+from package.api.export import export_rows
+from package.api.expression import parse_expression
 from package.api.filtering import FilterManager
-from package.main_table import MainTableModel
-from package.api.exceptions import FilterInvalidError
+from package.api.predicates import NumericCompare, Or, StringMatch
+from package.api.profiling import profile_columns, register_profiles
+from package.api.trigram_index import TrigramIndex
+from package.main_table import FETCH_ROWS, MainTableModel
+from package.api.exceptions import FilterInvalidError, OperationCancelledError
+from package.api.progress import Progress
 
 
 class TestStringMethods(unittest.TestCase):
@@ -20,7 +32,7 @@ class TestStringMethods(unittest.TestCase):
             "Col2": ["python", "rust", "javascript", "java", "c++"]
         })
 
-        self.filter_manager = FilterManager(None, None)
+        self.filter_manager = FilterManager(QtGui.QIcon(), QtGui.QIcon())
         self.table_model = MainTableModel(df, self.filter_manager)
         self.filter_manager.set_model(self.table_model)
         self.filter_manager.file_opened()
@@ -48,6 +60,27 @@ class TestStringMethods(unittest.TestCase):
         pd.testing.assert_frame_equal(df_expected, self.table_model.df)
         print(self.table_model.df)
 
+    def test_add_filter_string_fast_paths(self):
+        for text, expected in [("Col2 : *SCRIPT", [12]), ("Col2 : *a*", [12, 13]), ("Col2 : Rust", [11]),
+                               ("Col2 : j?va", [13]), ("Col2 : *", [10, 11, 12, 13, 14])]:
+            self.filter_manager.add(text=text, neg=False)
+            self.assertEqual(self.table_model.df["Col1"].tolist(), expected, text)
+            self.filter_manager.raz()
+
+    def test_add_filter_string_categorical(self):
+        df = pd.DataFrame({
+            "Col1": [10, 11, 12, 13, 14],
+            "Col2": pd.Categorical(["java", "rust", "javascript", "java", "c++"])
+        })
+        self.table_model = MainTableModel(df, self.filter_manager)
+        self.filter_manager.set_model(self.table_model)
+        self.filter_manager.file_opened()
+
+        self.filter_manager.add(text="Col2 : JAVA*", neg=False)
+
+        self.assertEqual(self.table_model.df["Col1"].tolist(), [10, 12, 13])
+        self.assertEqual(self.table_model.data(self.table_model.index(1, 1)), "javascript")
+
     def test_add_filter_int(self):
         self.filter_manager.add(text="Col1 < 12", neg=False)
 
@@ -59,6 +92,244 @@ class TestStringMethods(unittest.TestCase):
         pd.testing.assert_frame_equal(df_expected, self.table_model.df)
         print(self.table_model.df)
 
+    def test_toggle_and_delete_filter(self):
+        self.filter_manager.add(text="Col1 >= 11", neg=False)
+        self.filter_manager.add(text="Col2 : java*", neg=True)
+        self.assertEqual(self.table_model.df["Col1"].tolist(), [11, 14])
+
+        self.filter_manager.toggle_filter("Col1>= 11")
+        self.assertEqual(self.table_model.df["Col1"].tolist(), [10, 11, 14])
+
+        self.filter_manager.toggle_filter("Col1>= 11")
+        self.filter_manager.delete("not Col2: java*")
+        self.assertEqual(self.table_model.df["Col1"].tolist(), [11, 12, 13, 14])
+        self.assertEqual(self.table_model.hits, "4 / 5 lignes")
+
+    def test_sort_filtered(self):
+        self.table_model.sort(1, QtCore.Qt.AscendingOrder)
+        self.filter_manager.add(text="Col1 > 10", neg=False)
+        self.assertEqual(self.table_model.df["Col2"].tolist(), ["c++", "java", "javascript", "rust"])
+
+        self.filter_manager.delete("Col1> 10")
+        self.table_model.sort(1, QtCore.Qt.DescendingOrder)
+        self.assertEqual(self.table_model.df["Col2"].tolist(), ["rust", "python", "javascript", "java", "c++"])
+        self.assertEqual(self.table_model.data(self.table_model.index(0, 0)), "11")
+
+    def test_rows_appended_filtered(self):
+        self.filter_manager.add(text="Col2 : java*", neg=False)
+        df = pd.DataFrame({
+            "Col1": [10, 11, 12, 13, 14, 15, 16],
+            "Col2": ["python", "rust", "javascript", "java", "c++", "go", "java"]
+        })
+
+        self.table_model.rows_appended(df)
+        self.assertEqual(self.table_model.df["Col1"].tolist(), [12, 13, 16])
+        self.assertEqual(self.table_model.hits, "3 / 7 lignes")
+
+        self.filter_manager.delete("Col2: java*")
+        self.assertEqual(self.table_model.rowCount(), 7)
+
+    def test_append_rows_streaming(self):
+        table_model = MainTableModel(pd.DataFrame({"Col1": [1, 2], "Col2": [3, 4]}), self.filter_manager,
+                                     streaming=True)
+        # next file : a column of text where it was numeric, and a new column
+        table_model.append_rows(pd.DataFrame({"Col1": [5], "Col2": ["x"], "Col3": ["y"]}))
+
+        self.assertEqual(table_model.columnCount(), 2)
+        self.assertIsNone(table_model.data(table_model.index(2, 1), QtCore.Qt.BackgroundRole))
+        df = table_model.view()[0]
+        self.assertEqual(df["Col2"].tolist(), ["3", "4", "x"])
+
+        table_model = MainTableModel(df, self.filter_manager)
+        table_model.sort(1, QtCore.Qt.DescendingOrder)
+        self.assertEqual(table_model.data(table_model.index(0, 1)), "x")
+
+        # the chunks are concatenated when their rows are fetched
+        table_model = MainTableModel(pd.DataFrame({"Col1": range(FETCH_ROWS)}), self.filter_manager, streaming=True)
+        df = table_model.view()[0]
+        table_model.append_rows(pd.DataFrame({"Col1": [-1, -2]}))
+        self.assertIs(table_model._df, df)
+        self.assertEqual((table_model.rowCount(), table_model.hits), (FETCH_ROWS, f"{FETCH_ROWS + 2} lignes"))
+        self.assertTrue(table_model.canFetchMore())
+        table_model.fetchMore()
+        self.assertEqual(table_model.rowCount(), FETCH_ROWS + 2)
+        self.assertEqual(table_model.data(table_model.index(FETCH_ROWS + 1, 0)), "-2")
+
+    def test_string_match_as_regex(self):
+        # the string comparisons match the values of the case insensitive regex of the pattern
+        df = pd.DataFrame({"Col": ["ab\n", "a\nb", "Straße", "STRASSE", "İx", "ix", "a+b", "aab"]})
+        for pattern, expected in [("ab", ["ab\n"]), ("a*", ["ab\n", "a+b", "aab"]), ("*b", ["ab\n", "a+b", "aab"]),
+                                  ("straße", ["Straße"]), ("strasse", ["STRASSE"]), ("ix", ["İx", "ix"]),
+                                  ("a+b", ["ab\n", "aab"]), ("*", ["ab\n", "Straße", "STRASSE", "İx", "ix", "a+b", "aab"])]:
+            with self.subTest(pattern=pattern):
+                mask = StringMatch("Col", pattern).mask(df)
+                self.assertEqual(df["Col"][mask].tolist(), expected)
+                self.assertEqual(mask.tolist(), df["Col"].str.match(StringMatch("Col", pattern)._regex, case=False)
+                                 .tolist())
+
+    def test_search_any_column(self):
+        df = pd.DataFrame({
+            "Col1": [10, 11, 12, 13],
+            "Col2": ["python", "rust", "javascript", "java"],
+            "Col3": pd.Categorical(["web", "system", "web", "jvm"])
+        })
+        self.table_model = MainTableModel(df, self.filter_manager)
+        self.filter_manager.set_model(self.table_model)
+        self.filter_manager.file_opened()
+
+        # without index : the distinct values are scanned
+        self.filter_manager.add(text="* : ST", neg=False)
+        self.assertEqual(self.table_model.df["Col1"].tolist(), [11])
+        self.filter_manager.raz()
+
+        self.table_model.text_index = TrigramIndex(df, ["Col2", "Col3"])
+        self.filter_manager.add(text="* : j*v", neg=False)
+        self.assertEqual(self.table_model.df["Col1"].tolist(), [12, 13])
+        self.filter_manager.add(text="* : web", neg=True)
+        self.assertEqual(self.table_model.df["Col1"].tolist(), [13])
+
+    def test_trigram_index_wildcards(self):
+        # the rows found do not depend on whether the index has been built
+        df = pd.DataFrame({"Col1": ["v1x5", "1.5", "abc", "a(b)c"], "Col2": ["x", "ab|cd", "15", "y"]})
+        for pattern in ["1.5", "v1?x*", "ab|cd", "a(b)c", "a[b]c", "*c"]:
+            with self.subTest(pattern=pattern):
+                self.assertEqual(TrigramIndex(df, ["Col1", "Col2"]).mask(pattern).tolist(),
+                                 TrigramIndex(df, ["Col1", "Col2"], trigrams=False).mask(pattern).tolist())
+        self.assertEqual(TrigramIndex(df, ["Col1", "Col2"]).mask("1.5").tolist(), [True, True, False, False])
+
+    def test_add_filter_expression(self):
+        self.filter_manager.add(text="Col1 > 12 and (Col2 : java* or not Col2 : c*)", neg=False)
+        self.assertEqual(self.table_model.df["Col1"].tolist(), [13])
+
+        self.filter_manager.add(text="Col1 < 11 OR Col2 = rust", neg=True)
+        with self.assertRaises(FilterInvalidError):
+            self.filter_manager.add(text="not (Col1<11 or Col2=rust)", neg=False)
+
+        for text in ["Col1 > 12 and", "(Col1 > 12", "Col1 > 12 Col2", "Col1 > 12 or or Col2 : a"]:
+            with self.assertRaises(FilterInvalidError):
+                self.filter_manager.add(text=text, neg=False)
+
+    def test_add_filter_keywords_in_condition(self):
+        df = pd.DataFrame({"Poids (kg)": [3, 6, 8], "Genre": ["rock and roll", "jazz", "rock"],
+                           "Col2": ["Notebook", "note", "x"]})
+        self.table_model = MainTableModel(df, self.filter_manager)
+        self.filter_manager.set_model(self.table_model)
+        self.filter_manager.file_opened()
+
+        for text, expected in [("Poids (kg) > 5", [6, 8]), ("Genre : rock and roll", [3]), ("Col2 : Not*", [3, 6]),
+                               ("(Poids (kg) < 5 or Genre : rock) and not Col2 : note", [3, 8])]:
+            with self.subTest(text=text):
+                btn = self.filter_manager.add(text=text, neg=False)
+                self.assertEqual(self.table_model.df["Poids (kg)"].tolist(), expected)
+                self.filter_manager.delete(btn.text())
+
+    def test_expression_planner(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({"Col1": rng.integers(0, 100, 50000),
+                           "Col2": rng.choice(["python", "rust", "java", "c++"], 50000)})
+        predicate, _ = parse_expression("Col2 : *a* and (Col1 < 5 or Col1 > 90) and not Col2 = java",
+                                        self.filter_manager._condition)
+        self.table_model = MainTableModel(df, self.filter_manager)
+        self.filter_manager.set_model(self.table_model)
+
+        expected = df["Col2"].str.contains("a") & ((df["Col1"] < 5) | (df["Col1"] > 90)) & (df["Col2"] != "java")
+        np.testing.assert_array_equal(predicate.mask(df), expected.to_numpy())
+        self.assertIsInstance(predicate.plan(df)[0], Or)
+
+    def test_summary(self):
+        self.filter_manager.add(text="Col1 > 10", neg=False)
+        btn = self.filter_manager.add(text="Col2 : java*", neg=False)
+        summary = self.table_model.summary("Col2")
+        self.assertEqual((summary.nb_rows, summary.columns["Col1"].total), (2, 25))
+        self.assertEqual(summary.top_groups(10), [("javascript", 1), ("java", 1)])
+
+        # updated from the previous summary, then computed again when the maximum is removed
+        self.filter_manager.toggle_filter(btn.text())
+        summary = self.table_model.summary("Col2")
+        self.assertEqual((summary.nb_rows, summary.columns["Col1"].total), (4, 50))
+        self.assertEqual((summary.columns["Col1"].minimum, summary.columns["Col1"].maximum), (11, 14))
+        self.filter_manager.add(text="Col1 < 14", neg=False)
+        summary = self.table_model.summary("Col2")
+        self.assertEqual((summary.columns["Col1"].maximum, summary.columns["Col1"].mean), (13, 12))
+        self.assertEqual(dict(summary.top_groups(10)), {"rust": 1, "javascript": 1, "java": 1})
+
+    def test_profiles(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({"Col1": rng.integers(0, 100, 50000),
+                           "Col2": rng.choice(["Python", "rust", "java", "javascript", ""], 50000)})
+        profiles = profile_columns(df)
+        self.assertEqual(profiles.get("Col2").complete("JA"), ["java", "javascript"])
+        self.assertEqual(profiles.get("Col2").complete("p"), ["Python"])
+        self.assertEqual((profiles.get("Col1").minimum, profiles.get("Col1").maximum), (0, 99))
+        self.assertEqual(profiles.get("Col2").nb_nulls, np.count_nonzero(df["Col2"] == ""))
+
+        for predicate in [NumericCompare("Col1", "<", 20), NumericCompare("Col1", ">=", 90),
+                          StringMatch("Col2", "java*"), StringMatch("Col2", "RUST")]:
+            self.assertAlmostEqual(predicate.estimate(profiles), predicate.mask(df).mean(), delta=0.02)
+
+        # the planner uses the profiles of the df they have been computed on
+        register_profiles(profiles)
+        predicate, _ = parse_expression("Col1 < 95 and Col2 = rust", self.filter_manager._condition)
+        self.assertIsInstance(predicate.plan(df)[0], StringMatch)
+        np.testing.assert_array_equal(predicate.mask(df), ((df["Col1"] < 95) & (df["Col2"] == "rust")).to_numpy())
+        register_profiles(None)
+
+    def test_export_view(self):
+        self.filter_manager.add(text="Col1 > 10", neg=False)
+        self.table_model.sort(1, QtCore.Qt.AscendingOrder)
+        df, rows, columns = self.table_model.view()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = pathlib.Path(tmp_dir) / "view.csv"
+            progress = Progress()
+            self.assertEqual(export_rows(df, path, rows, columns[::-1], progress=progress), 4)
+            self.assertEqual(path.read_text().splitlines(), ["Col2;Col1", "c++;14", "java;13", "javascript;12",
+                                                            "rust;11"])
+            self.assertEqual((progress.rows, progress.rows_total), (4, 4))
+
+            # a separator of the reading only
+            self.assertEqual(export_rows(df, path, rows, columns, separator=r"\s*;;"), 4)
+            self.assertEqual(path.read_text().splitlines()[:2], ["Col1;Col2", "14;c++"])
+
+            path = pathlib.Path(tmp_dir) / "view.feather"
+            export_rows(df, path, rows, columns)
+            pd.testing.assert_frame_equal(pd.read_feather(path), self.table_model.df.reset_index(drop=True))
+
+            progress = Progress()
+            progress.cancel()
+            with self.assertRaises(OperationCancelledError):
+                export_rows(df, pathlib.Path(tmp_dir) / "cancelled.parquet", rows, columns, progress=progress)
+            self.assertEqual(sorted(p.name for p in pathlib.Path(tmp_dir).iterdir()), ["view.csv", "view.feather"])
+
+    def test_export_downcast(self):
+        df = pd.DataFrame({"A": np.arange(20), "B": [1.5] + [np.nan] * 19})
+        optimize_dtypes(df)
+        self.assertIsInstance(df["B"].dtype, pd.SparseDtype)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name in ["downcast.parquet", "downcast.feather"]:
+                with self.subTest(name=name):
+                    path = pathlib.Path(tmp_dir) / name
+                    self.assertEqual(export_rows(df, path), 20)
+                    exported = pd.read_parquet(path) if name.endswith("parquet") else pd.read_feather(path)
+                    np.testing.assert_array_equal(exported["B"].to_numpy(), df["B"].to_numpy())
+
+    def test_sort_mixed_types(self):
+        # more rows than a block of the C parser, a text at the end of a column of numbers
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file = pathlib.Path(tmp_dir) / "mixed.csv"
+            file.write_text("Titre\nA;B\n" + "".join(f"{i};{i}\n" for i in range(300000)) + "1;x\n")
+            config = Config()
+            config.csv_extension = "csv"
+            config.set_config(header=1, separator=";", max_lines=500000)
+            csv_set = CsvSet(config=config)
+            csv_set.read_files([str(file)])
+
+        self.assertEqual({type(value) for value in csv_set.df["B"]}, {str})
+        table_model = MainTableModel(csv_set.df, self.filter_manager)
+        table_model.sort(1, QtCore.Qt.DescendingOrder)
+        self.assertEqual(table_model.data(table_model.index(0, 1)), "x")
+
     def test_filter_column_not_existing(self):
         with self.assertRaises(FilterInvalidError):
             self.filter_manager.add(text="Col3 < 12", neg=False)
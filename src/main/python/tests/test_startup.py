@@ -0,0 +1,24 @@
+import json
+import pathlib
+import subprocess
+import sys
+import unittest
+
+MAX_PAINT_TIME = 5  # s from the start of the process to the first paint of the window, far above the usual time
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_startup(self):
+        result = subprocess.run([sys.executable, "-m", "benchmarks.startup"], capture_output=True, text=True,
+                                cwd=pathlib.Path(__file__).resolve().parent.parent, timeout=60)
+        times = json.loads(result.stdout)
+
+        # pandas and the dialogs are imported after the window is shown
+        self.assertEqual(times["deferred_imported"], [])
+        self.assertIsNotNone(times["paint"])
+        self.assertLess(times["paint"], MAX_PAINT_TIME)
+
+
+if __name__ == '__main__':
+    unittest.main()